@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PrismaAvaliacoesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "Prisma_avaliacoes"
+
+    def ready(self):
+        """Importar signals quando o app estiver pronto"""
+        import Prisma_avaliacoes.signals  # noqa F401
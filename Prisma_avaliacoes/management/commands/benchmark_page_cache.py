@@ -0,0 +1,170 @@
+"""
+Teste de carga do cache de páginas: requisições por segundo com e sem
+o cache (Prisma_avaliacoes/middleware.py)
+"""
+import statistics
+import threading
+import time
+import urllib.request
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from artigos.models import Artigo, Tag
+
+
+# Cookie que tira a requisição do cache (mesma regra dos usuários logados)
+BYPASS_COOKIE = 'csrftoken=benchmark'
+
+
+class Command(BaseCommand):
+    help = 'Mede requisições/s das páginas públicas com e sem o cache de páginas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            type=str,
+            help='Servidor em execução (ex.: http://127.0.0.1:8000 com o gunicorn de '
+                 'config/gunicorn.service); sem ele, as requisições rodam neste processo',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=6,
+            help='Requisições simultâneas (padrão: 6 = 3 workers x 2 threads)',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10.0,
+            help='Segundos de carga em cada modo (padrão: 10)',
+        )
+        parser.add_argument(
+            '--host',
+            type=str,
+            default='localhost',
+            help='Host usado nas requisições (deve estar em ALLOWED_HOSTS)',
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.local = threading.local()
+        paths = self.get_paths()
+        destino = options['url'] or 'neste processo'
+        self.stdout.write(self.style.SUCCESS(
+            f'🚀 Carga em {len(paths)} páginas, {options["concurrency"]} simultâneas, {destino}'
+        ))
+        for path in paths:
+            self.stdout.write(f'   {path}')
+
+        if options['url']:
+            resultados = self.comparar(paths)
+        else:
+            # Neste processo o cache é ligado mesmo com DEBUG
+            with override_settings(PAGE_CACHE_ENABLED=True):
+                resultados = self.comparar(paths)
+
+        self.stdout.write(f'\n   {"Modo":<12} {"req/s":>9} {"p50":>9} {"p95":>9} {"cache":>8} {"erros":>6}')
+        for modo, r in resultados.items():
+            self.stdout.write(
+                f'   {modo:<12} {r["rps"]:9.1f} {r["p50"]:7.1f}ms {r["p95"]:7.1f}ms'
+                f' {r["hit_ratio"]:7.0%} {r["errors"]:>6}'
+            )
+
+        sem, com = resultados['sem cache'], resultados['com cache']
+        if sem['rps']:
+            self.stdout.write(self.style.SUCCESS(f'\n✅ Ganho: {com["rps"] / sem["rps"]:.1f}x requisições/s'))
+        if com['hit_ratio'] < 0.5:
+            self.stdout.write('   ⚠️ Poucos acertos: confira PAGE_CACHE_ENABLED no servidor')
+        if not options['url']:
+            self.stdout.write('   (neste processo as threads dividem o GIL; com --url a carga vai para os workers)')
+
+    def get_paths(self):
+        paths = ['/', '/blog/', '/blog/?page=2']
+        artigo = Artigo.objects.filter(
+            publicado=True, data_publicacao__lte=timezone.now()
+        ).order_by('-data_publicacao').first()
+        tag = Tag.objects.filter(artigos__publicado=True).first()
+        if artigo:
+            paths.append(artigo.get_absolute_url())
+        if tag:
+            paths.append(tag.get_absolute_url())
+        return paths
+
+    def comparar(self, paths):
+        resultados = {}
+        for modo, cookie in (('sem cache', BYPASS_COOKIE), ('com cache', None)):
+            # Aquecimento: preenche o cache (e os caches das views)
+            for path in paths:
+                self.request(path, cookie)
+            resultados[modo] = self.carga(paths, cookie)
+        return resultados
+
+    def carga(self, paths, cookie):
+        latencias = []
+        hits = []
+        errors = []
+        fim = time.perf_counter() + self.options['duration']
+
+        def worker(offset):
+            i = offset
+            while time.perf_counter() < fim:
+                inicio = time.perf_counter()
+                try:
+                    status, hit = self.request(paths[i % len(paths)], cookie)
+                except Exception:
+                    errors.append(1)
+                    continue
+                latencias.append((time.perf_counter() - inicio) * 1000)
+                hits.append(hit)
+                if status != 200:
+                    errors.append(status)
+                i += 1
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(self.options['concurrency'])]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+
+        if not latencias:
+            raise CommandError('Nenhuma requisição completou')
+        latencias.sort()
+        return {
+            'rps': len(latencias) / duracao,
+            'p50': statistics.median(latencias),
+            'p95': latencias[int(len(latencias) * 0.95) - 1],
+            'hit_ratio': sum(hits) / len(hits),
+            'errors': len(errors),
+        }
+
+    def request(self, path, cookie):
+        """Retorna (status, veio do cache)"""
+        headers = {'Accept-Encoding': 'gzip'}
+        if cookie:
+            headers['Cookie'] = cookie
+
+        if self.options['url']:
+            req = urllib.request.Request(self.options['url'].rstrip('/') + path, headers=headers)
+            with urllib.request.urlopen(req, timeout=30) as response:
+                response.read()
+                return response.status, response.headers.get('X-Page-Cache') == 'HIT'
+
+        # Um Client por thread
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = Client(HTTP_HOST=self.options['host'])
+        extra = {'HTTP_ACCEPT_ENCODING': 'gzip'}
+        if cookie:
+            extra['HTTP_COOKIE'] = cookie
+        response = client.get(path, **extra)
+        return response.status_code, response.get('X-Page-Cache') == 'HIT'
+
+
+# Uso do comando:
+# python manage.py benchmark_page_cache
+# python manage.py benchmark_page_cache --url http://127.0.0.1:8000 --concurrency 6 --duration 20
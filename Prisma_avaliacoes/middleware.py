@@ -0,0 +1,230 @@
+"""
+Cache de página inteira para visitantes anônimos
+
+As páginas públicas (landing page, listagens e artigos do blog) são
+iguais para todo visitante sem login. A resposta da view vai para o
+cache comprimida com gzip; os próximos GETs anônimos da mesma URL saem
+do cache sem passar pela view nem pelos templates.
+
+- Chave: esquema, host, caminho, os parâmetros que as views leem
+  (page, busca), um carimbo de versão do conteúdo e a versão dos
+  templates. Salvar ou excluir Artigo, Tag, SEOMeta ou SEOConfig troca o
+  carimbo no cache compartilhado (todos os workers), assim como novas
+  listas de relacionados (ver Prisma_avaliacoes/signals.py).
+- Outros parâmetros (utm_*, fbclid, ...) não criam entradas: a página
+  sai do cache da URL sem eles, e se ainda não estiver lá a resposta da
+  view não é guardada (o HTML dela repete a query string).
+- Fica de fora quem tem cookie de sessão, CSRF ou mensagens: a página
+  pode depender do usuário, de um token ou de uma mensagem pendente.
+- Só respostas 200, sem cookies e sem Cache-Control private/no-store.
+- Quem aceita gzip recebe o corpo comprimido direto do cache.
+- Um artigo agendado limita o timeout até a data de publicação dele.
+- Respostas do cache com ETag respondem 304 a If-None-Match.
+
+Configuração (settings.py):
+    PAGE_CACHE_ENABLED  padrão: fora do DEBUG
+    PAGE_CACHE_VIEWS    nomes das URLs cacheadas
+    PAGE_CACHE_QUERY_PARAMS  parâmetros da query string que mudam a página
+    PAGE_CACHE_TIMEOUT  segundos (padrão: 10 minutos)
+"""
+import functools
+import gzip
+import hashlib
+import os
+import re
+import time
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template import engines
+from django.utils.cache import cc_delim_re, get_conditional_response, patch_vary_headers
+from django.utils.http import urlencode
+
+
+PAGE_VERSION_KEY = 'paginas:versao'
+
+DEFAULT_PAGE_CACHE_VIEWS = (
+    'Prisma_avaliacoes:home',
+    'artigos:lista',
+    'artigos:por_tag',
+    'artigos:detalhe',
+)
+DEFAULT_PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Parâmetros lidos pelas views cacheadas (paginação e busca da listagem)
+DEFAULT_PAGE_CACHE_QUERY_PARAMS = ('page', 'busca')
+
+# Cabeçalhos recalculados a cada resposta servida do cache
+SKIP_HEADERS = {'content-length', 'content-encoding', 'vary'}
+
+accepts_gzip_re = re.compile(r'\bgzip\b')
+
+
+def page_cache_enabled():
+    return getattr(settings, 'PAGE_CACHE_ENABLED', not settings.DEBUG)
+
+
+def get_page_version():
+    """Carimbo de versão atual do conteúdo das páginas"""
+    version = cache.get(PAGE_VERSION_KEY)
+    if version is None:
+        # add() não sobrescreve um carimbo criado por outro worker
+        cache.add(PAGE_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(PAGE_VERSION_KEY)
+    return version
+
+
+def bump_page_version():
+    """Invalida todas as páginas em cache"""
+    cache.set(PAGE_VERSION_KEY, time.time_ns(), None)
+
+
+def _template_files():
+    """Templates do projeto (pastas de templates dentro de BASE_DIR)"""
+    base_dir = str(settings.BASE_DIR)
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            directory = str(directory)
+            if not directory.startswith(base_dir):
+                continue
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    yield os.path.join(root, name)
+
+
+def _template_version():
+    digest = hashlib.md5()
+    for path in sorted(_template_files()):
+        stat = os.stat(path)
+        digest.update(f'{path}:{stat.st_mtime_ns}:{stat.st_size}'.encode())
+    return digest.hexdigest()[:12]
+
+
+_cached_template_version = functools.cache(_template_version)
+
+
+def get_template_version():
+    """
+    Versão dos templates (data e tamanho dos arquivos)
+
+    Calculada uma vez por processo: um deploy reinicia os workers. Com
+    DEBUG, a cada chamada, para refletir edições na hora.
+    """
+    if settings.DEBUG:
+        return _template_version()
+    return _cached_template_version()
+
+
+def bypass_cookies():
+    """Cookies que tiram a requisição do cache"""
+    return (settings.SESSION_COOKIE_NAME, settings.CSRF_COOKIE_NAME, CookieStorage.cookie_name)
+
+
+def get_query_params():
+    return getattr(settings, 'PAGE_CACHE_QUERY_PARAMS', DEFAULT_PAGE_CACHE_QUERY_PARAMS)
+
+
+def page_cache_key(request):
+    params = sorted(
+        (name, request.GET[name]) for name in get_query_params() if request.GET.get(name)
+    )
+    url = f'{request.scheme}://{request.get_host()}{request.path}?{urlencode(params)}'
+    digest = hashlib.md5(url.encode()).hexdigest()
+    return f'paginas:{get_page_version()}:{get_template_version()}:{digest}'
+
+
+def storable_query(request):
+    """
+    A resposta da view pode ir para o cache: só parâmetros conhecidos,
+    uma vez cada e com valor (a query string é igual à da chave)
+    """
+    allowed = set(get_query_params())
+    return all(
+        name in allowed and len(values) == 1 and values[0]
+        for name, values in request.GET.lists()
+    )
+
+
+def get_page_timeout():
+    from artigos.pagination import get_timeout
+    return get_timeout(getattr(settings, 'PAGE_CACHE_TIMEOUT', DEFAULT_PAGE_CACHE_TIMEOUT))
+
+
+class PageCacheMiddleware:
+    """
+    Deve ser o último middleware: a resposta guardada é a da view, e os
+    cabeçalhos dos middlewares anteriores (segurança, sessão, frames)
+    são aplicados de novo a cada resposta do cache.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        key = getattr(request, '_page_cache_key', None)
+        if key is not None:
+            if self.can_store(response):
+                self.store(key, response)
+                response['X-Page-Cache'] = 'MISS'
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.can_serve(request):
+            return None
+        key = page_cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            if storable_query(request):
+                request._page_cache_key = key
+            return None
+        return self.build_response(request, entry)
+
+    def can_serve(self, request):
+        if request.method not in ('GET', 'HEAD') or not page_cache_enabled():
+            return False
+        views = getattr(settings, 'PAGE_CACHE_VIEWS', DEFAULT_PAGE_CACHE_VIEWS)
+        if request.resolver_match is None or request.resolver_match.view_name not in views:
+            return False
+        return not any(name in request.COOKIES for name in bypass_cookies())
+
+    def can_store(self, response):
+        if response.status_code != 200 or response.streaming or response.cookies:
+            return False
+        cache_control = response.get('Cache-Control', '').lower()
+        if 'private' in cache_control or 'no-store' in cache_control:
+            return False
+        # Variação por outro cabeçalho que não Cookie/Accept-Encoding não
+        # cabe em uma chave só da URL
+        vary = {h.strip().lower() for h in cc_delim_re.split(response.get('Vary', '')) if h.strip()}
+        return vary <= {'cookie', 'accept-encoding'}
+
+    def store(self, key, response):
+        headers = [(k, v) for k, v in response.items() if k.lower() not in SKIP_HEADERS]
+        body = gzip.compress(response.content, compresslevel=6, mtime=0)
+        cache.set(key, (response.status_code, headers, body), get_page_timeout())
+
+    def build_response(self, request, entry):
+        status, headers, body = entry
+        gzipped = accepts_gzip_re.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if gzipped:
+            response = HttpResponse(body, status=status)
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(gzip.decompress(body), status=status)
+        for name, value in headers:
+            response[name] = value
+        response['Content-Length'] = str(len(response.content))
+        response['X-Page-Cache'] = 'HIT'
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        etag = response.get('ETag')
+        if etag is None:
+            return response
+        if gzipped and not etag.startswith('W/'):
+            # O corpo comprimido é outra representação (como no GZipMiddleware)
+            etag = response['ETag'] = f'W/{etag}'
+        return get_conditional_response(request, etag=etag, response=response)
@@ -0,0 +1,54 @@
+"""
+Signals do app Prisma_avaliacoes: invalidam o cache de páginas quando o
+conteúdo delas muda
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from artigos.images import variants_updated
+from artigos.models import Artigo, Tag
+from artigos.related import related_updated
+from seo.models import SEOConfig, SEOMeta
+
+from .middleware import bump_page_version
+
+
+@receiver(post_save, sender=Artigo)
+@receiver(post_delete, sender=Artigo)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=SEOMeta)
+@receiver(post_delete, sender=SEOMeta)
+@receiver(post_save, sender=SEOConfig)
+@receiver(post_delete, sender=SEOConfig)
+def invalidar_paginas(sender, raw=False, **kwargs):
+    """
+    Troca a versão das páginas em cache (depois do commit, para não
+    guardar de novo o estado anterior)
+    """
+    if raw:
+        return
+    transaction.on_commit(bump_page_version)
+
+
+@receiver(m2m_changed, sender=Artigo.tags.through)
+def invalidar_paginas_tags(sender, action, **kwargs):
+    """As tags são gravadas depois do save() do artigo (ex.: no admin)"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(bump_page_version)
+
+
+@receiver(related_updated)
+def invalidar_paginas_relacionados(sender, **kwargs):
+    """
+    As listas de relacionados são recalculadas depois do commit do artigo;
+    sem isso, uma página guardada nesse intervalo ficaria com as antigas
+    """
+    bump_page_version()
+
+
+@receiver(variants_updated)
+def invalidar_paginas_variantes(sender, **kwargs):
+    """As variantes da imagem são gravadas com update(), sem post_save"""
+    bump_page_version()
@@ -3,10 +3,12 @@ Configuração do Django Admin para o app de artigos
 """
 
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils import timezone
-from .models import Artigo, Categoria
+from .models import Artigo, Categoria, Tag
+from .search import fts_available, search_artigos
 
 # Importar inline do SEO
 from seo.admin import SEOMetaInline
@@ -41,7 +43,7 @@ class ArtigoAdmin(admin.ModelAdmin):
         'titulo',
         'resumo',
         'conteudo',
-        'tags'
+        'tags__nome'
     ]
     
     # Campos ordenáveis
@@ -78,6 +80,9 @@ class ArtigoAdmin(admin.ModelAdmin):
     # Preenchimento automático do slug
     prepopulated_fields = {'slug': ('titulo',)}
     
+    # Seleção das tags (o "+" permite criar uma tag nova)
+    filter_horizontal = ['tags']
+    
     # Adicionar inline do SEO
     inlines = [SEOMetaInline]
     
@@ -133,10 +138,14 @@ class ArtigoAdmin(admin.ModelAdmin):
         """
         Ação para despublicar artigos selecionados
         """
-        count = queryset.filter(publicado=True).update(
-            publicado=False,
-            data_publicacao=None
-        )
+        # save() em cada artigo (e não update()) para disparar os signals
+        # que mantêm sitemap e caches em dia
+        count = 0
+        for artigo in queryset.filter(publicado=True):
+            artigo.publicado = False
+            artigo.data_publicacao = None
+            artigo.save()
+            count += 1
         
         self.message_user(
             request,
@@ -144,6 +153,15 @@ class ArtigoAdmin(admin.ModelAdmin):
         )
     despublicar_artigos.short_description = 'Despublicar artigos selecionados'
     
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Usa o índice full-text (FTS5) quando disponível, em vez de LIKE
+        em todos os search_fields
+        """
+        if search_term and fts_available():
+            return search_artigos(queryset, search_term, ranked=False), False
+        return super().get_search_results(request, queryset, search_term)
+    
     def get_form(self, request, obj=None, **kwargs):
         """
         Personaliza o formulário baseado no usuário
@@ -167,6 +185,30 @@ class ArtigoAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    """
+    Configuração do admin para model Tag
+    """
+    
+    list_display = ['nome', 'slug', 'numero_artigos']
+    search_fields = ['nome']
+    ordering = ['nome']
+    prepopulated_fields = {'slug': ('nome',)}
+    
+    def get_queryset(self, request):
+        # Contagem de artigos de todas as tags em uma única consulta
+        return super().get_queryset(request).annotate(total_artigos=Count('artigos'))
+    
+    def numero_artigos(self, obj):
+        """
+        Número de artigos com a tag
+        """
+        return obj.total_artigos
+    numero_artigos.short_description = 'Artigos'
+    numero_artigos.admin_order_field = 'total_artigos'
+
+
 @admin.register(Categoria)
 class CategoriaAdmin(admin.ModelAdmin):
     """
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ArtigosConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "artigos"
+
+    def ready(self):
+        """Importar signals quando o app estiver pronto"""
+        import artigos.signals  # noqa F401
@@ -0,0 +1,281 @@
+"""
+Processamento do conteúdo dos artigos
+
+Executado em Artigo.save(): o HTML processado, o sumário, a contagem de
+palavras e o tempo de leitura ficam gravados no próprio artigo, e a view
+de detalhe não processa nada por requisição.
+
+O conteúdo é percorrido uma única vez por ArticleHTMLTransformer, que
+reescreve as tags e coleta o sumário e as palavras no mesmo passo. Os ids
+dos cabeçalhos vêm do texto (slug), então são os mesmos em qualquer
+processo e em qualquer save.
+
+Reprocessar todos os artigos: python manage.py processar_artigos
+"""
+import math
+from html import escape, unescape
+from html.parser import HTMLParser
+
+from django.utils.text import slugify
+
+
+DEFAULT_IMAGE_ALT = 'Imagem ilustrativa do artigo'
+
+HEADING_TAGS = {'h2', 'h3', 'h4'}
+
+# Fim destas tags separa palavras ("<p>a</p><p>b</p>" são duas palavras)
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl',
+    'dt', 'figcaption', 'figure', 'footer', 'h1', 'h2', 'h3', 'h4', 'h5',
+    'h6', 'header', 'hr', 'li', 'ol', 'p', 'pre', 'section', 'table',
+    'td', 'th', 'tr', 'ul',
+}
+
+# Conteúdo que não é texto do artigo
+SKIP_TEXT_TAGS = {'script', 'style'}
+
+
+def _format_attrs(attrs):
+    return ''.join(
+        f' {name}' if value is None else f' {name}="{escape(value)}"'
+        for name, value in attrs
+    )
+
+
+class ArticleHTMLTransformer(HTMLParser):
+    """
+    Reescreve o HTML do artigo em um único passo
+
+    - h2/h3/h4 sem id recebem um id a partir do texto (slug, único no
+      artigo); os ids são definidos no close(), depois de conhecer todos
+      os ids que o autor escreveu, inclusive os que vêm depois
+    - img recebe loading="lazy", decoding="async" e alt, quando não têm
+    - coleta (nível, texto, id) dos cabeçalhos e o texto para contar palavras
+
+    Tags e atributos que não precisam mudar são copiados como estão.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.out = []
+        self.text = []
+        self.headings = []
+        self._ids = set()
+        # (posição em out, posição em headings, cabeçalho) sem id do autor
+        self._pending_ids = []
+        self._heading = None
+        self._skip_text = 0
+
+    # Saída
+
+    def _emit(self, chunk):
+        if self._heading is not None:
+            self._heading['html'].append(chunk)
+        else:
+            self.out.append(chunk)
+
+    def _emit_text(self, chunk):
+        if self._skip_text:
+            return
+        self.text.append(chunk)
+        if self._heading is not None:
+            self._heading['text'].append(chunk)
+
+    # Tags
+
+    def _rewrite_img(self, attrs):
+        names = {name for name, _ in attrs}
+        extra = []
+        if 'loading' not in names:
+            extra.append(('loading', 'lazy'))
+        if 'decoding' not in names:
+            extra.append(('decoding', 'async'))
+        if 'alt' not in names:
+            extra.append(('alt', DEFAULT_IMAGE_ALT))
+        return extra
+
+    def _start(self, tag, attrs, self_closing):
+        raw = self.get_starttag_text()
+        for name, value in attrs:
+            if name == 'id' and value:
+                self._ids.add(value)
+
+        if tag == 'img':
+            extra = self._rewrite_img(attrs)
+            if extra:
+                end = ' />' if self_closing else '>'
+                raw = f'<{tag}{_format_attrs(attrs + extra)}{end}'
+        elif tag in HEADING_TAGS and self._heading is None and not self_closing:
+            # O id depende do texto, então o cabeçalho é guardado até fechar
+            self.text.append(' ')
+            self._heading = {
+                'tag': tag,
+                'attrs': attrs,
+                'raw': raw,
+                'html': [],
+                'text': [],
+            }
+            return
+
+        if tag in SKIP_TEXT_TAGS and not self_closing:
+            self._skip_text += 1
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+        self._emit(raw)
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, self_closing=False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs, self_closing=True)
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TEXT_TAGS and self._skip_text:
+            self._skip_text -= 1
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+
+        if self._heading is not None and tag == self._heading['tag']:
+            self._close_heading(f'</{tag}>')
+        else:
+            self._emit(f'</{tag}>')
+
+    def _unique_id(self, text):
+        base = slugify(text) or 'secao'
+        anchor = base
+        n = 2
+        while anchor in self._ids:
+            anchor = f'{base}-{n}'
+            n += 1
+        self._ids.add(anchor)
+        return anchor
+
+    def _close_heading(self, end_tag):
+        heading, self._heading = self._heading, None
+        text = ' '.join(unescape(''.join(heading['text'])).split())
+        existing = dict(heading['attrs']).get('id')
+
+        if existing:
+            self.headings.append((int(heading['tag'][1]), text, existing))
+            self.out.append(heading['raw'])
+        else:
+            # Tag de abertura e id ficam para o close()
+            heading['text'] = text
+            self._pending_ids.append((len(self.out), len(self.headings), heading))
+            self.headings.append(None)
+            self.out.append(None)
+        self.out.extend(heading['html'])
+        self.out.append(end_tag)
+
+    # Texto e demais marcações
+
+    def handle_data(self, data):
+        self._emit(data)
+        self._emit_text(data)
+
+    def handle_entityref(self, name):
+        self._emit(f'&{name};')
+        self._emit_text(f'&{name};')
+
+    def handle_charref(self, name):
+        self._emit(f'&#{name};')
+        self._emit_text(f'&#{name};')
+
+    def handle_comment(self, data):
+        self._emit(f'<!--{data}-->')
+
+    def handle_decl(self, decl):
+        self._emit(f'<!{decl}>')
+
+    def handle_pi(self, data):
+        self._emit(f'<?{data}>')
+
+    def unknown_decl(self, data):
+        self._emit(f'<![{data}]>')
+
+    def close(self):
+        super().close()
+        # Cabeçalho sem tag de fechamento: mantém o conteúdo sem fechar
+        if self._heading is not None:
+            heading, self._heading = self._heading, None
+            self.out.append(heading['raw'])
+            self.out.extend(heading['html'])
+
+        # Ids gerados na ordem do texto, sem repetir os do autor
+        for out_index, heading_index, heading in self._pending_ids:
+            anchor = self._unique_id(heading['text'])
+            self.out[out_index] = f'<{heading["tag"]}{_format_attrs(heading["attrs"] + [("id", anchor)])}>'
+            self.headings[heading_index] = (int(heading['tag'][1]), heading['text'], anchor)
+        self._pending_ids = []
+
+    # Resultado
+
+    def get_html(self):
+        return ''.join(self.out)
+
+    def get_word_count(self):
+        return len(unescape(''.join(self.text)).split())
+
+
+def transform_article_html(content):
+    """
+    Processa o conteúdo em um único passo
+
+    Retorna o transformer já fechado (get_html(), headings e
+    get_word_count()).
+    """
+    transformer = ArticleHTMLTransformer()
+    transformer.feed(content or '')
+    transformer.close()
+    return transformer
+
+
+def build_table_of_contents(headings):
+    """
+    Gera o HTML do sumário a partir de [(nível, texto, id)]
+    """
+    if not headings:
+        return ''
+
+    toc_html = '<ul>'
+    current_level = 2
+
+    for level, text, anchor in headings:
+        if level > current_level:
+            toc_html += '<ul>' * (level - current_level)
+        elif level < current_level:
+            toc_html += '</ul>' * (current_level - level)
+
+        toc_html += f'<li><a href="#{escape(anchor)}">{escape(text)}</a></li>'
+        current_level = level
+
+    # Fechar tags abertas
+    toc_html += '</ul>' * (current_level - 1)
+
+    return toc_html
+
+
+def calculate_reading_time(word_count):
+    """
+    Calcula o tempo estimado de leitura (assumindo 200 palavras por minuto)
+    """
+    words_per_minute = 200
+    minutes = math.ceil(word_count / words_per_minute)
+    return max(1, minutes)  # Mínimo de 1 minuto
+
+
+def render_article(content):
+    """
+    Processa o conteúdo de uma vez só
+
+    Retorna {campo do Artigo: valor} com conteudo_renderizado, sumario_html,
+    contagem_palavras e tempo_leitura.
+    """
+    transformer = transform_article_html(content)
+    word_count = transformer.get_word_count()
+    return {
+        'conteudo_renderizado': transformer.get_html(),
+        'sumario_html': build_table_of_contents(transformer.headings),
+        'contagem_palavras': word_count,
+        'tempo_leitura': calculate_reading_time(word_count),
+    }
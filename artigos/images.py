@@ -0,0 +1,184 @@
+"""
+Variantes responsivas da imagem destacada dos artigos
+
+Depois do upload, a imagem é reduzida para algumas larguras em WebP (e
+em AVIF, se o Pillow instalado suportar). As variantes ficam ao lado do
+original, com o hash do conteúdo no nome:
+
+    artigos/imagens/fachada.jpg
+    artigos/imagens/fachada.3f9a1c2b7e4d.640w.webp
+
+Artigo.imagem_variantes guarda o que foi gerado, e a template tag
+{% responsive_image %} (artigos/templatetags/artigos_tags.py) monta o
+<picture> com srcset/sizes a partir disso, sem acessar os arquivos.
+
+O processamento roda depois do commit, em um thread separado (um job
+por vez), fora da requisição; imagens antigas ou que ficaram sem
+variantes (ex.: o worker reiniciou no meio) são cobertas pelo comando:
+
+    python manage.py gerar_variantes_imagens
+
+Configuração (settings.py, opcional):
+    ARTIGOS_IMAGE_WIDTHS   larguras em px (padrão: 320, 640, 960, 1280)
+"""
+import hashlib
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Q
+from django.dispatch import Signal
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import Artigo
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IMAGE_WIDTHS = (320, 640, 960, 1280)
+
+# (formato do Pillow, extensão, tipo MIME, opções de save), do mais
+# eficiente para o mais compatível: é a ordem dos <source>
+IMAGE_FORMATS = (
+    ('AVIF', 'avif', 'image/avif', {'quality': 60}),
+    ('WEBP', 'webp', 'image/webp', {'quality': 80, 'method': 4}),
+)
+
+HASH_LENGTH = 12
+
+# Enviado quando as variantes de um artigo mudam (cache de páginas)
+variants_updated = Signal()
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='imagens')
+
+
+def get_widths():
+    return tuple(sorted(getattr(settings, 'ARTIGOS_IMAGE_WIDTHS', DEFAULT_IMAGE_WIDTHS)))
+
+
+def get_formats():
+    """Formatos que o Pillow instalado grava (AVIF só a partir do 11.3)"""
+    Image.init()
+    return [fmt for fmt in IMAGE_FORMATS if fmt[0] in Image.SAVE]
+
+
+def variant_name(original, digest, width, extension):
+    """artigos/imagens/foto.jpg -> artigos/imagens/foto.<hash>.<largura>w.<ext>"""
+    stem = os.path.splitext(original)[0]
+    return f'{stem}.{digest}.{width}w.{extension}'
+
+
+def variant_names(variants):
+    """Nomes de todos os arquivos de variantes registrados"""
+    return {name for sources in variants.get('formatos', {}).values() for _, name in sources}
+
+
+def _target_widths(width):
+    """Larguras menores que o original, mais o original (até a maior)"""
+    widths = get_widths()
+    targets = [w for w in widths if w < width]
+    if width <= widths[-1]:
+        targets.append(width)
+    return targets or [widths[-1]]
+
+
+def _encode(image, fmt, options):
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def build_variants(name, storage=default_storage):
+    """
+    Gera (ou reaproveita) as variantes do arquivo name
+
+    Retorna o dicionário guardado em Artigo.imagem_variantes:
+    {'original', 'hash', 'largura', 'altura', 'formatos': {ext: [[w, nome], ...]}}
+    """
+    with storage.open(name, 'rb') as file:
+        content = file.read()
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+
+    with Image.open(io.BytesIO(content)) as source:
+        image = ImageOps.exif_transpose(source)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    formats = {}
+    for width in _target_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt, extension, _, options in get_formats():
+            path = variant_name(name, digest, width, extension)
+            # Nome com hash do conteúdo: se existe, é a mesma imagem
+            if not storage.exists(path):
+                path = storage.save(path, ContentFile(_encode(resized, fmt, options)))
+            formats.setdefault(extension, []).append([width, path])
+
+    return {
+        'original': name,
+        'hash': digest,
+        'largura': image.width,
+        'altura': image.height,
+        'formatos': formats,
+    }
+
+
+def process_artigo(pk, force=False):
+    """
+    Atualiza as variantes do artigo pk; retorna True se algo mudou
+
+    Sem imagem, as variantes são removidas. Com force=False, variantes
+    do mesmo arquivo não são refeitas.
+    """
+    row = Artigo.objects.filter(pk=pk).values_list('imagem_destacada', 'imagem_variantes').first()
+    if row is None:
+        return False
+    name, old = row[0] or '', row[1] or {}
+
+    if not name:
+        if not old:
+            return False
+        variants = {}
+    elif not force and old.get('original') == name and old.get('formatos'):
+        return False
+    else:
+        variants = build_variants(name)
+
+    # Só grava se a imagem não mudou de novo enquanto processava
+    same_image = Q(imagem_destacada=name) if name else Q(imagem_destacada='') | Q(imagem_destacada__isnull=True)
+    updated = Artigo.objects.filter(same_image, pk=pk).update(
+        imagem_variantes=variants, data_atualizacao=timezone.now()
+    )
+    if not updated:
+        return False
+
+    for stale in variant_names(old) - variant_names(variants):
+        try:
+            default_storage.delete(stale)
+        except OSError:
+            logger.warning('Não foi possível remover a variante %s', stale)
+    variants_updated.send(sender=Artigo, pk=pk)
+    return True
+
+
+def _run(pk):
+    try:
+        process_artigo(pk)
+    except Exception:
+        logger.exception('Erro ao gerar as variantes da imagem do artigo %s', pk)
+    finally:
+        # O thread não passa pelo ciclo de requisição do Django
+        connection.close()
+
+
+def schedule_variants(pk):
+    """Processa a imagem do artigo depois do commit, fora da requisição"""
+    transaction.on_commit(lambda: _executor.submit(_run, pk))
@@ -0,0 +1,134 @@
+"""
+Benchmark da busca: icontains (LIKE) x índice full-text (FTS5) x FTS5
+com os resultados em cache (cached_search)
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from artigos.models import Artigo, Tag
+from artigos.search import (
+    FTS_TABLE, attach_snippets, cached_search, filter_icontains, fts_available,
+    rebuild_index, result_cache, search_artigos,
+)
+
+
+VOCABULARIO = (
+    'avaliação imóvel imóveis laudo técnico mercado imobiliário perícia '
+    'terreno apartamento comercial residencial financiamento garantia '
+    'norma método comparativo depreciação vistoria documentação cartório '
+    'inventário partilha desapropriação aluguel locação valor venal ITBI '
+    'IPTU engenharia patologia construção reforma loteamento condomínio'
+).split()
+
+BUSCAS = ['avaliacao', 'imóveis comerciais', 'laudo técnico', 'Desapropriação', 'xyzabc']
+
+
+class Command(BaseCommand):
+    help = 'Compara a busca com icontains e com FTS5 em artigos gerados (revertidos no final)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--artigos',
+            type=int,
+            default=5000,
+            help='Quantidade de artigos gerados para o teste (padrão: 5000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Repetições de cada busca (padrão: 5)',
+        )
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError(f'Tabela {FTS_TABLE} não encontrada (somente SQLite; rode as migrations)')
+
+        total = options['artigos']
+        self.repeat = options['repeat']
+        self.stdout.write(self.style.SUCCESS(f'⏱️ Benchmark da busca com {total} artigos gerados'))
+
+        with transaction.atomic():
+            self.gerar_artigos(total)
+            inicio = time.perf_counter()
+            indexados = rebuild_index(Artigo.objects.all())
+            self.stdout.write(f'   Índice recriado: {indexados} artigos em {time.perf_counter() - inicio:.2f} s\n')
+
+            publicados = Artigo.objects.filter(publicado=True, data_publicacao__lte=timezone.now())
+            result_cache.clear()
+            self.stdout.write(f'   {"Busca":<22} {"icontains":>18} {"FTS5":>18} {"FTS5 + cache":>18}')
+            for busca in BUSCAS:
+                antigo = self.medir(lambda: filter_icontains(publicados, busca).order_by('-data_publicacao'))
+                novo = self.medir(lambda: search_artigos(publicados, busca), busca)
+                # Mesma busca digitada de outro jeito: acerta o cache
+                cache = self.medir(lambda: cached_search(publicados, f' {busca.upper()} de '), busca)
+                self.stdout.write(
+                    f'   {busca:<22} {antigo[1]:7.1f} ms ({antigo[0]:>5})'
+                    f' {novo[1]:7.1f} ms ({novo[0]:>5})'
+                    f' {cache[1]:7.1f} ms ({cache[0]:>5})'
+                )
+            stats = result_cache.stats()
+            self.stdout.write(f'\n   Cache: {stats["hits"]} acertos, {stats["misses"]} faltas')
+
+            # Nada do que foi gerado fica no banco (nem no índice)
+            transaction.set_rollback(True)
+
+        self.stdout.write('\n   ms = contagem + primeira página de 6 (com trechos no FTS5)')
+
+    def gerar_artigos(self, total):
+        rng = random.Random(42)
+        # Texto de preenchimento + alguns termos do vocabulário por artigo,
+        # para que cada busca encontre só parte dos artigos
+        preenchimento = [f'palavra{i}' for i in range(3000)]
+        agora = timezone.now()
+        tags = {nome: Tag.objects.get_or_create(nome=nome)[0] for nome in VOCABULARIO}
+        ArtigoTag = Artigo.tags.through
+        lote = []
+        lote_tags = []
+        for i in range(total):
+            termos = rng.sample(VOCABULARIO, 4)
+            paragrafos = ''.join(
+                f'<p>{" ".join(rng.choices(preenchimento, k=60))} {termos[p % 4]}</p>' for p in range(15)
+            )
+            lote.append(Artigo(
+                titulo=f'{termos[0].capitalize()} e {termos[1]} {i}',
+                slug=f'benchmark-busca-{i}',
+                autor='Benchmark',
+                resumo=' '.join(rng.choices(preenchimento, k=30)),
+                conteudo=paragrafos,
+                publicado=True,
+                data_publicacao=agora,
+            ))
+            lote_tags.append(termos[2:])
+            if len(lote) == 1000:
+                self.gravar_lote(lote, lote_tags, tags, ArtigoTag)
+                lote, lote_tags = [], []
+        if lote:
+            self.gravar_lote(lote, lote_tags, tags, ArtigoTag)
+
+    def gravar_lote(self, lote, lote_tags, tags, ArtigoTag):
+        # bulk_create no SQLite preenche as pks, usadas na tabela M2M
+        Artigo.objects.bulk_create(lote)
+        ArtigoTag.objects.bulk_create([
+            ArtigoTag(artigo_id=artigo.pk, tag_id=tags[nome].pk)
+            for artigo, nomes in zip(lote, lote_tags)
+            for nome in nomes
+        ])
+
+    def medir(self, build_queryset, busca=None):
+        inicio = time.perf_counter()
+        for _ in range(self.repeat):
+            queryset = build_queryset()
+            count = queryset.count() if hasattr(queryset, 'count') else len(queryset)
+            pagina = list(queryset[:6])
+            if busca:
+                attach_snippets(pagina, busca)
+        return count, (time.perf_counter() - inicio) / self.repeat * 1000
+
+
+# Uso do comando:
+# python manage.py benchmark_busca --artigos 5000
@@ -0,0 +1,158 @@
+"""
+Benchmark de memória das listagens: artigos completos x cards
+(Artigo.objects.cards())
+"""
+import re
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from artigos.models import Artigo, Tag
+from artigos.search import rebuild_index, search_artigos
+from artigos.views import get_related_articles
+
+
+# Termo presente só nos artigos gerados
+BUSCA = 'cardsbenchmark'
+
+# Colunas que as listagens nunca devem ler
+BODY_COLUMNS_RE = re.compile(r'"artigos_artigo"\."(conteudo|conteudo_renderizado|sumario_html)"')
+
+
+class Command(BaseCommand):
+    help = 'Compara a memória das listagens com artigos completos e com cards (revertido no final)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--artigos',
+            type=int,
+            default=300,
+            help='Quantidade de artigos gerados para o teste (padrão: 300)',
+        )
+        parser.add_argument(
+            '--kb',
+            type=int,
+            default=40,
+            help='Tamanho aproximado do conteúdo de cada artigo em KB (padrão: 40)',
+        )
+        parser.add_argument(
+            '--host',
+            type=str,
+            default='localhost',
+            help='Host usado nas requisições (deve estar em ALLOWED_HOSTS)',
+        )
+
+    def handle(self, *args, **options):
+        total = options['artigos']
+        self.stdout.write(self.style.SUCCESS(
+            f'📊 Memória das listagens com {total} artigos gerados de ~{options["kb"]} KB'
+        ))
+
+        with transaction.atomic():
+            self.gerar_artigos(total, options['kb'])
+            rebuild_index(Artigo.objects.all())
+
+            publicados = Artigo.objects.filter(
+                publicado=True, data_publicacao__lte=timezone.now()
+            ).order_by('-data_publicacao')
+            cenarios = (
+                ('Página de 6', lambda qs: qs[:6]),
+                ('Busca (10 primeiros)', lambda qs: search_artigos(qs, BUSCA)[:10]),
+                ('Busca (todos)', lambda qs: search_artigos(qs, BUSCA)),
+            )
+
+            self.stdout.write(f'   {"Cenário":<22} {"Completo":>22} {"Cards":>22}')
+            for label, build in cenarios:
+                completo = self.medir(lambda: list(build(publicados)))
+                cards = self.medir(lambda: list(build(publicados.cards())))
+                self.stdout.write(
+                    f'   {label:<22} {completo[0]:9.1f} KB {completo[1]:7.1f} ms'
+                    f' {cards[0]:9.1f} KB {cards[1]:7.1f} ms'
+                )
+
+            # Sem o cache de páginas, para que as views consultem o banco
+            with override_settings(PAGE_CACHE_ENABLED=False):
+                erros = self.verificar_paginas(options['host'])
+
+            # Nada do que foi gerado fica no banco (nem no índice)
+            transaction.set_rollback(True)
+
+        self.stdout.write('\n   KB = pico de memória (tracemalloc) para montar os objetos')
+        if erros:
+            raise CommandError(f'{erros} página(s) leram o conteúdo dos artigos')
+        self.stdout.write(self.style.SUCCESS('✅ Nenhuma listagem leu o conteúdo dos artigos'))
+
+    def gerar_artigos(self, total, kb):
+        agora = timezone.now()
+        paragrafo = (
+            '<p>A avaliação de imóveis urbanos segue a NBR 14653, com pesquisa '
+            'de mercado e tratamento estatístico dos dados comparativos.</p>'
+        )
+        conteudo = paragrafo * (kb * 1024 // len(paragrafo) + 1)
+        Artigo.objects.bulk_create([
+            Artigo(
+                titulo=f'Avaliação {BUSCA} {i}',
+                slug=f'benchmark-cards-{i}',
+                autor='Benchmark',
+                resumo=f'Resumo do artigo {i} sobre avaliação de imóveis ({BUSCA}).',
+                conteudo=conteudo,
+                conteudo_renderizado=conteudo,
+                publicado=True,
+                data_publicacao=agora,
+            )
+            for i in range(total)
+        ], batch_size=200)
+
+    def medir(self, load):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        load()
+        duracao = (time.perf_counter() - inicio) * 1000
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return pico / 1024, duracao
+
+    def verificar_paginas(self, host):
+        """Confere que as listagens não selecionam o conteúdo"""
+        self.stdout.write('\n🔍 Colunas lidas pelas listagens')
+        client = Client(HTTP_HOST=host)
+        artigo = Artigo.objects.filter(slug='benchmark-cards-0').first()
+        urls = [
+            '/blog/',
+            f'/blog/?busca={BUSCA}',
+            f'/blog/buscar/?q={BUSCA}',
+        ]
+        tag = Tag.objects.filter(artigos__publicado=True).first()
+        if tag:
+            urls.append(tag.get_absolute_url())
+
+        erros = 0
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            lidas = [q['sql'] for q in queries if BODY_COLUMNS_RE.search(q['sql'])]
+            if lidas:
+                erros += 1
+                self.stdout.write(f'   ❌ {url} ({response.status_code}): {len(lidas)} consulta(s) com o conteúdo')
+            else:
+                self.stdout.write(f'   ✅ {url} ({response.status_code}): {len(queries)} consultas, sem o conteúdo')
+
+        # Relacionados do detalhe (o próprio artigo é carregado inteiro)
+        if artigo:
+            with CaptureQueriesContext(connection) as queries:
+                get_related_articles(artigo)
+            if any(BODY_COLUMNS_RE.search(q['sql']) for q in queries):
+                erros += 1
+                self.stdout.write('   ❌ artigos relacionados leram o conteúdo')
+            else:
+                self.stdout.write('   ✅ artigos relacionados sem o conteúdo')
+        return erros
+
+
+# Uso do comando:
+# python manage.py benchmark_cards --artigos 300 --kb 40
@@ -0,0 +1,169 @@
+"""
+Comando para comparar o processamento do conteúdo em um passo com a
+cadeia de regex anterior
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.html import strip_tags
+
+from artigos.content import render_article
+
+
+# Cadeia de regex usada antes de artigos/content.py (referência)
+
+def legacy_process_article_content(content):
+    content = re.sub(
+        r'<h([2-4])>(.*?)</h[2-4]>',
+        lambda m: f'<h{m.group(1)} id="heading-{hash(m.group(2)) % 10000}">{m.group(2)}</h{m.group(1)}>',
+        content
+    )
+    content = re.sub(r'<img([^>]*?)>', r'<img\1 loading="lazy">', content)
+    content = re.sub(
+        r'<img([^>]*?)(?!.*alt=)([^>]*?)>',
+        r'<img\1\2 alt="Imagem ilustrativa do artigo">',
+        content
+    )
+    return content
+
+
+def legacy_generate_table_of_contents(content):
+    headings = re.findall(r'<h([2-4]).*?>(.*?)</h[2-4]>', content, re.IGNORECASE)
+    if not headings:
+        return None
+    toc_html = '<ul>'
+    current_level = 2
+    for level, text in headings:
+        level = int(level)
+        clean_text = strip_tags(text)
+        anchor = f"heading-{hash(clean_text) % 10000}"
+        if level > current_level:
+            toc_html += '<ul>' * (level - current_level)
+        elif level < current_level:
+            toc_html += '</ul>' * (current_level - level)
+        toc_html += f'<li><a href="#{anchor}">{clean_text}</a></li>'
+        current_level = level
+    toc_html += '</ul>' * (current_level - 1)
+    return toc_html
+
+
+def legacy_render(content):
+    return {
+        'conteudo_renderizado': legacy_process_article_content(content),
+        'sumario_html': legacy_generate_table_of_contents(content) or '',
+        'contagem_palavras': len(strip_tags(content).split()),
+    }
+
+
+def build_article(sections):
+    """Artigo sintético com cabeçalhos, parágrafos, listas e imagens"""
+    paragraph = (
+        '<p>A avaliação de <strong>imóveis urbanos</strong> segue a NBR 14653, '
+        'com pesquisa de mercado, tratamento de dados &amp; análise estatística '
+        'dos elementos comparativos.</p>'
+    )
+    parts = []
+    for i in range(sections):
+        parts.append(f'<h2>Seção {i}: método comparativo</h2>')
+        # Id escrito pelo autor, igual ao slug do cabeçalho anterior
+        parts.append(f'<p id="secao-{i}-metodo-comparativo">Referência da seção.</p>')
+        parts.append(paragraph * 4)
+        parts.append(f'<img src="/media/artigos/foto-{i}.jpg" width="800" height="400">')
+        parts.append(f'<h3>Detalhes da <em>seção</em> {i}</h3>')
+        parts.append('<ul>' + '<li>Item da lista de verificação</li>' * 5 + '</ul>')
+        parts.append(paragraph * 2)
+    return ''.join(parts)
+
+
+def anchors_match(rendered):
+    """Todos os links do sumário apontam para um id existente no conteúdo?"""
+    ids = set(re.findall(r'<h[2-4][^>]*\sid="([^"]+)"', rendered['conteudo_renderizado']))
+    links = re.findall(r'href="#([^"]+)"', rendered['sumario_html'])
+    return bool(links) and all(link in ids for link in links)
+
+
+def ids_unique(rendered):
+    """Nenhum id repetido no conteúdo (gerados e escritos pelo autor)"""
+    ids = re.findall(r'\sid="([^"]+)"', rendered['conteudo_renderizado'])
+    return len(ids) == len(set(ids))
+
+
+HASH_SEED_SCRIPT = """
+import json, sys
+sys.path.insert(0, {base_dir!r})
+from {module} import {func}
+print(json.dumps({func}({content!r})))
+"""
+
+
+class Command(BaseCommand):
+    help = 'Compara tempo e resultado do processamento em um passo com a cadeia de regex anterior'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sections',
+            type=int,
+            default=200,
+            help='Seções no artigo sintético (padrão: 200)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Repetições por implementação (padrão: 20)'
+        )
+
+    def handle(self, *args, **options):
+        content = build_article(options['sections'])
+        repeat = options['repeat']
+
+        self.stdout.write(self.style.SUCCESS('📊 Benchmark do processamento de conteúdo'))
+        self.stdout.write(f'   Artigo: {len(content) / 1024:.0f} KB, {options["sections"] * 2} cabeçalhos')
+
+        for label, func in (('Regex (anterior)', legacy_render), ('Um passo (html.parser)', render_article)):
+            inicio = time.perf_counter()
+            for _ in range(repeat):
+                rendered = func(content)
+            media = (time.perf_counter() - inicio) / repeat * 1000
+            self.stdout.write(f'   {label:<24} {media:8.2f} ms/artigo')
+            self.stdout.write(
+                f'      sumário aponta para ids existentes: {"sim" if anchors_match(rendered) else "NÃO"}'
+            )
+            self.stdout.write(f'      ids únicos: {"sim" if ids_unique(rendered) else "NÃO"}')
+
+        self.stdout.write('\n🔁 Ids em processos com PYTHONHASHSEED diferentes (como os workers)')
+        sample = build_article(3)
+        implementations = (
+            ('Regex (anterior)', __name__, 'legacy_render'),
+            ('Um passo (html.parser)', 'artigos.content', 'render_article'),
+        )
+        for label, module, func in implementations:
+            outputs = {
+                self.run_with_seed(seed, module, func, sample)['conteudo_renderizado']
+                for seed in ('1', '2')
+            }
+            status = 'iguais' if len(outputs) == 1 else 'DIFERENTES'
+            self.stdout.write(f'   {label:<24} {status}')
+
+    def run_with_seed(self, seed, module, func, content):
+        script = HASH_SEED_SCRIPT.format(
+            base_dir=str(settings.BASE_DIR), module=module, func=func, content=content
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, 'PYTHONHASHSEED': seed},
+        )
+        return json.loads(result.stdout)
+
+
+# Uso do comando:
+# python manage.py benchmark_conteudo --sections 500
@@ -0,0 +1,167 @@
+"""
+Benchmark das sugestões da busca (artigos/typeahead.py): tempo de
+montagem do índice, latência das consultas e atualização incremental
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from artigos import typeahead
+from artigos.models import Artigo
+
+
+# Limite de latência (p95) de uma consulta ao índice
+MAX_P95_MS = 1.0
+
+
+class Command(BaseCommand):
+    help = 'Mede a latência das sugestões da busca e confere a atualização incremental'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--artigos',
+            type=int,
+            default=2000,
+            help='Artigos gerados para o teste, além dos existentes (padrão: 2000; revertidos no final)',
+        )
+        parser.add_argument(
+            '--consultas',
+            type=int,
+            default=5000,
+            help='Quantidade de consultas medidas (padrão: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.gerar_artigos(options['artigos'])
+
+            inicio = time.perf_counter()
+            index = typeahead.TypeaheadIndex()
+            index.load()
+            montagem = (time.perf_counter() - inicio) * 1000
+            self.stdout.write(self.style.SUCCESS(
+                f'🌳 Índice com {len(index.artigo_docs)} artigos e {len(index.tag_docs)} tags '
+                f'montado em {montagem:.0f} ms'
+            ))
+
+            latencias = self.medir(index, options['consultas'])
+            p95 = latencias[int(len(latencias) * 0.95) - 1]
+            self.stdout.write(
+                f'   {len(latencias)} consultas: p50 {statistics.median(latencias):.3f} ms, '
+                f'p95 {p95:.3f} ms, máx {latencias[-1]:.3f} ms'
+            )
+
+            erros = self.verificar_incremental()
+            transaction.set_rollback(True)
+
+        if p95 > MAX_P95_MS:
+            raise CommandError(f'p95 de {p95:.3f} ms acima de {MAX_P95_MS} ms')
+        if erros:
+            raise CommandError(f'{erros} verificação(ões) da atualização incremental falharam')
+        self.stdout.write(self.style.SUCCESS('✅ Sugestões abaixo de 1 ms e atualizadas incrementalmente'))
+
+    def gerar_artigos(self, total):
+        palavras = (
+            'avaliação imóvel urbano rural mercado laudo perícia aluguel terreno '
+            'apartamento garantia bancária inventário partilha desapropriação norma'
+        ).split()
+        rng = random.Random(42)
+        agora = timezone.now()
+        Artigo.objects.bulk_create([
+            Artigo(
+                titulo=' '.join(rng.sample(palavras, 5)).capitalize() + f' {i}',
+                slug=f'benchmark-sugestoes-{i}',
+                autor='Benchmark',
+                resumo='Artigo gerado para o benchmark das sugestões.',
+                conteudo='<p>Benchmark</p>',
+                publicado=True,
+                data_publicacao=agora,
+            )
+            for i in range(total)
+        ], batch_size=500)
+
+    def medir(self, index, total):
+        """Latência de consultas com prefixos de 2 a 8 letras das palavras indexadas"""
+        titulos = [doc[1]['titulo'] for doc in index.artigo_docs.values()]
+        if not titulos:
+            raise CommandError('Nenhum artigo publicado para consultar')
+        rng = random.Random(7)
+        consultas = []
+        for _ in range(total):
+            termos = rng.choice(titulos).split()[:rng.randint(1, 2)]
+            consultas.append(' '.join(termo[:rng.randint(2, 8)] for termo in termos))
+
+        latencias = []
+        for consulta in consultas:
+            inicio = time.perf_counter()
+            index.suggest(consulta)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        latencias.sort()
+        return latencias
+
+    def verificar_incremental(self):
+        """Salvar e excluir um artigo chega ao índice do processo pelo cache"""
+        self.stdout.write('\n🔁 Atualização incremental')
+        erros = 0
+        typeahead.suggest('xx')  # sincroniza o índice deste processo
+
+        artigo = Artigo.objects.create(
+            titulo='Zeugma incremental das sugestões',
+            slug='benchmark-sugestoes-incremental',
+            autor='Benchmark',
+            resumo='Artigo gerado para o benchmark das sugestões.',
+            conteudo='<p>Benchmark</p>',
+            publicado=True,
+            data_publicacao=timezone.now(),
+        )
+        # Dentro da transação o on_commit dos signals não roda
+        typeahead.record_change('artigo', artigo.pk)
+        erros += self.conferir('novo artigo aparece', 'zeug incr', artigo.titulo)
+
+        artigo.titulo = 'Zircônio renomeado das sugestões'
+        artigo.save()
+        typeahead.record_change('artigo', artigo.pk)
+        erros += self.conferir('título novo aparece', 'zirc', artigo.titulo)
+        erros += self.conferir('título antigo some', 'zeug', None)
+
+        pk = artigo.pk
+        artigo.delete()
+        typeahead.record_change('artigo', pk)
+        erros += self.conferir('artigo excluído some', 'zirc', None)
+
+        # Mudança sem registro no cache (ex.: entrada perdida): a
+        # conferência com o banco refaz o índice
+        self.stdout.write('\n🗄️ Conferência com o banco')
+        outro = Artigo.objects.create(
+            titulo='Zeugma sem registro das sugestões',
+            slug='benchmark-sugestoes-sem-registro',
+            autor='Benchmark',
+            resumo='Artigo gerado para o benchmark das sugestões.',
+            conteudo='<p>Benchmark</p>',
+            publicado=True,
+            data_publicacao=timezone.now(),
+        )
+        typeahead.record_change('artigo', outro.pk)
+        erros += self.conferir('artigo registrado aparece', 'zeug', outro.titulo)
+        Artigo.objects.filter(pk=outro.pk).update(publicado=False, data_atualizacao=timezone.now())
+        typeahead._db_checked_at = 0.0
+        erros += self.conferir('despublicado sem registro some', 'zeug', None)
+        return erros
+
+    def conferir(self, label, consulta, titulo):
+        inicio = time.perf_counter()
+        titulos = [artigo['titulo'] for artigo in typeahead.suggest(consulta)['artigos']]
+        duracao = (time.perf_counter() - inicio) * 1000
+        ok = titulo in titulos if titulo else not titulos
+        marca = '✅' if ok else '❌'
+        self.stdout.write(f'   {marca} {label} ("{consulta}": {titulos}, {duracao:.2f} ms)')
+        return 0 if ok else 1
+
+
+# Uso do comando:
+# python manage.py benchmark_sugestoes
+# python manage.py benchmark_sugestoes --artigos 10000 --consultas 20000
@@ -0,0 +1,44 @@
+"""
+Management command para recalcular todos os artigos relacionados
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from artigos.models import ArtigoRelacionado
+from artigos.related import RELATED_LIMIT, recompute_all, scheduled_since_last_compute
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os artigos relacionados (tags + TF-IDF) de todos os artigos publicados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=RELATED_LIMIT,
+            help=f'Relacionados guardados por artigo (padrão: {RELATED_LIMIT})'
+        )
+        parser.add_argument(
+            '--agendados',
+            action='store_true',
+            help='Só recalcula se algum artigo entrou no ar desde o último cálculo (cron)',
+        )
+
+    def handle(self, *args, **options):
+        if options['agendados'] and not scheduled_since_last_compute():
+            self.stdout.write('Nenhum artigo publicado desde o último cálculo')
+            return
+
+        inicio = time.perf_counter()
+        total = recompute_all(limit=options['limit'])
+        duracao = time.perf_counter() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total} artigo(s), {ArtigoRelacionado.objects.count()} relação(ões) em {duracao:.2f} s'
+        ))
+
+
+# Uso do comando (após a migration ou periodicamente, para atualizar os pesos IDF):
+# python manage.py calcular_relacionados
+# python manage.py calcular_relacionados --agendados  # cron, ver config/crontab
@@ -0,0 +1,56 @@
+"""
+Management command para gerar as variantes responsivas (WebP/AVIF) das
+imagens destacadas já enviadas
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from artigos.images import get_formats, get_widths, process_artigo
+from artigos.models import Artigo
+
+
+class Command(BaseCommand):
+    help = 'Gera as variantes das imagens destacadas que ainda não têm (ou de todas, com --force)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Refaz as variantes mesmo das imagens já processadas',
+        )
+
+    def handle(self, *args, **options):
+        formatos = [extensao for _, extensao, _, _ in get_formats()]
+        if not formatos:
+            raise CommandError('O Pillow instalado não grava WebP nem AVIF')
+        self.stdout.write(self.style.SUCCESS(
+            f'🖼️ Variantes em {", ".join(formatos)} nas larguras {", ".join(map(str, get_widths()))}'
+        ))
+
+        # Com imagem, ou sem imagem mas com variantes antigas para remover
+        pks = Artigo.objects.filter(
+            Q(imagem_destacada__gt='') | ~Q(imagem_variantes={})
+        ).order_by('pk').values_list('pk', flat=True)
+
+        processados = erros = 0
+        inicio = time.perf_counter()
+        for pk in pks:
+            try:
+                if process_artigo(pk, force=options['force']):
+                    processados += 1
+            except Exception as e:
+                erros += 1
+                self.stdout.write(f'   ❌ Artigo {pk}: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {processados} artigo(s) atualizado(s) em {time.perf_counter() - inicio:.1f} s'
+        ))
+        if erros:
+            raise CommandError(f'{erros} imagem(ns) não puderam ser processadas')
+
+
+# Uso do comando:
+# python manage.py gerar_variantes_imagens
+# python manage.py gerar_variantes_imagens --force  # depois de mudar ARTIGOS_IMAGE_WIDTHS
@@ -0,0 +1,59 @@
+"""
+Management command para reprocessar o conteúdo dos artigos
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from artigos.content import render_article
+from artigos.models import Artigo
+from Prisma_avaliacoes.middleware import bump_page_version
+from seo.static_sitemaps import static_sitemaps_enabled, write_all_sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Regrava conteúdo renderizado, sumário, contagem de palavras e tempo de leitura dos artigos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Artigos gravados por consulta (padrão: 200)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fields = None
+        batch = []
+        total = 0
+
+        for artigo in Artigo.objects.only('id', 'conteudo').iterator(chunk_size=batch_size):
+            rendered = render_article(artigo.conteudo)
+            for field, value in rendered.items():
+                setattr(artigo, field, value)
+            fields = list(rendered)
+            batch.append(artigo)
+
+            if len(batch) >= batch_size:
+                # bulk_update não altera data_atualizacao
+                Artigo.objects.bulk_update(batch, fields)
+                total += len(batch)
+                batch = []
+
+        if batch:
+            Artigo.objects.bulk_update(batch, fields)
+            total += len(batch)
+
+        # bulk_update não envia signals: trocar a versão das páginas em
+        # cache (e do ETag dos artigos, que a inclui) uma vez, no final
+        if total:
+            transaction.on_commit(bump_page_version)
+            # Nem os sitemaps estáticos (regravados uma vez, não por artigo)
+            if static_sitemaps_enabled():
+                transaction.on_commit(write_all_sitemaps)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} artigo(s) processado(s)'))
+
+
+# Uso do comando (depois de mudar o processamento em artigos/content.py):
+# python manage.py processar_artigos
@@ -0,0 +1,24 @@
+"""
+Management command para reconstruir o índice de busca (FTS5) dos artigos
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from artigos.models import Artigo
+from artigos.search import FTS_TABLE, fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Recria o índice full-text dos artigos (necessário após bulk_create/update)'
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError(
+                f'Tabela {FTS_TABLE} não encontrada (somente SQLite; rode as migrations)'
+            )
+
+        total = rebuild_index(Artigo.objects.all())
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} artigo(s) indexado(s)'))
+
+
+# Uso do comando:
+# python manage.py rebuild_search_index
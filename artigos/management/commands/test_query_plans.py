@@ -0,0 +1,162 @@
+"""
+Comando para verificar os planos (EXPLAIN QUERY PLAN) das consultas das
+páginas do blog e dos sitemaps
+"""
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from artigos.models import Artigo, Tag
+from artigos.navigation import load_neighbours
+from artigos.pagination import bump_list_version
+from seo.sitemaps import (
+    ArtigosSection, ArtigosSitemap, get_sitemap_validators, sitemap_page_path,
+)
+
+
+# Ordenações em tabela temporária aceitas, com o motivo
+ALLOWED_SORTS = (
+    # O bm25 é calculado na busca; não existe índice com essa ordem
+    ('bm25(', 'busca ordenada por relevância'),
+    # Ordem alfabética das tags dos poucos artigos da página
+    ('_prefetch_related_val_artigo_id', 'tags dos artigos da página'),
+    # Ordenação pela contagem agregada das tags populares
+    ('"num_artigos"', 'contagem de artigos por tag'),
+)
+
+SCAN_RE = re.compile(r'^SCAN (\S+)(.*)$')
+
+
+class Command(BaseCommand):
+    help = 'Falha se alguma consulta do blog ou dos sitemaps varre uma tabela ou ordena em tabela temporária'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--host',
+            type=str,
+            default='localhost',
+            help='Host usado nas requisições (deve estar em ALLOWED_HOSTS)',
+        )
+        parser.add_argument(
+            '--busca',
+            type=str,
+            default='avaliação',
+            help='Termo usado nas páginas de busca (padrão: avaliação)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN só existe no SQLite')
+
+        self.stdout.write(self.style.SUCCESS('🔍 Verificando planos das consultas'))
+        self.queries = {}
+
+        # Descartar as chaves das páginas em cache para que a leitura
+        # delas também apareça
+        bump_list_version()
+
+        client = Client(HTTP_HOST=options['host'])
+        busca = options['busca']
+        urls = [
+            '/blog/',
+            '/blog/?page=2',
+            f'/blog/?busca={busca}',
+            f'/blog/buscar/?q={busca}',
+            '/sitemap.xml',
+            sitemap_page_path('artigos', 1),
+        ]
+
+        artigo = Artigo.objects.filter(
+            publicado=True, data_publicacao__lte=timezone.now()
+        ).order_by('-data_publicacao').first()
+        tag = Tag.objects.filter(artigos__publicado=True).first()
+        if artigo:
+            urls.append(artigo.get_absolute_url())
+        if tag:
+            urls.append(tag.get_absolute_url())
+        if not (artigo and tag):
+            self.stdout.write('   ⚠️ Sem artigo publicado com tag: detalhe e/ou página da tag ficam de fora')
+
+        # Sem o cache de páginas, para que as views consultem o banco
+        with override_settings(PAGE_CACHE_ENABLED=False):
+            for url in urls:
+                with connection.execute_wrapper(self.capture(url)):
+                    response = client.get(url)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+
+        # Consultas cujo resultado fica em cache nas views
+        with connection.execute_wrapper(self.capture('seo.sitemaps')):
+            ArtigosSection().pages()
+            get_sitemap_validators()
+            ArtigosSitemap().items()
+        if artigo:
+            with connection.execute_wrapper(self.capture('artigos.navigation')):
+                load_neighbours(artigo.pk)
+
+        total_errors = 0
+        for (sql, origin), params in self.queries.items():
+            plan = self.explain(sql, params)
+            problems = self.check_plan(sql, plan)
+            summary = ' '.join(sql.split())[:100]
+            if problems:
+                total_errors += 1
+                self.stdout.write(f'   ❌ [{origin}] {summary}')
+                for line in plan:
+                    self.stdout.write(f'        {line}')
+            else:
+                self.stdout.write(f'   ✅ [{origin}] {summary}')
+                if options['verbosity'] > 1:
+                    for line in plan:
+                        self.stdout.write(f'        {line}')
+
+        if total_errors:
+            raise CommandError(f'{total_errors} consulta(s) com varredura de tabela ou ordenação temporária')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {len(self.queries)} consultas usando índices'))
+
+    def capture(self, origin):
+        """execute_wrapper que guarda cada SELECT (sql, origem) -> parâmetros"""
+        def wrapper(execute, sql, params, many, context):
+            if not many and sql.lstrip().upper().startswith('SELECT'):
+                self.queries.setdefault((sql, origin), params)
+            return execute(sql, params, many, context)
+        return wrapper
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def check_plan(self, sql, plan):
+        """Retorna os passos problemáticos do plano"""
+        # Subconsultas e CTEs aparecem como CO-ROUTINE/MATERIALIZE <nome>
+        derived = {
+            line.split(' ', 1)[1] for line in plan
+            if line.startswith(('CO-ROUTINE ', 'MATERIALIZE '))
+        }
+        sort_allowed = any(marker in sql for marker, _ in ALLOWED_SORTS)
+
+        problems = []
+        for line in plan:
+            match = SCAN_RE.match(line)
+            if match:
+                name, rest = match.groups()
+                if (
+                    'USING' not in rest and 'VIRTUAL TABLE' not in rest
+                    and name not in derived and not name.startswith(('(', 'sqlite_'))
+                    and name != 'CONSTANT'
+                ):
+                    problems.append(line)
+            elif line.startswith('USE TEMP B-TREE') and not sort_allowed:
+                problems.append(line)
+        return problems
+
+
+# Uso do comando:
+# python manage.py test_query_plans
+# python manage.py test_query_plans -v 2  # mostra o plano de todas as consultas
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("artigos", "0004_auto_20250901_1453"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="artigo",
+            name="contagem_palavras",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Palavras"
+            ),
+        ),
+        migrations.AddField(
+            model_name="artigo",
+            name="conteudo_renderizado",
+            field=models.TextField(
+                blank=True, editable=False, verbose_name="Conteúdo renderizado"
+            ),
+        ),
+        migrations.AddField(
+            model_name="artigo",
+            name="sumario_html",
+            field=models.TextField(blank=True, editable=False, verbose_name="Sumário"),
+        ),
+        migrations.AddField(
+            model_name="artigo",
+            name="tempo_leitura",
+            field=models.PositiveIntegerField(
+                default=1, editable=False, verbose_name="Tempo de leitura (min)"
+            ),
+        ),
+        # Os artigos existentes são processados por
+        # "python manage.py processar_artigos" (o processamento muda com o
+        # código; a migração não depende de artigos/content.py)
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:02
+
+from html import unescape
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+
+# Cópia do estado de artigos/search.py nesta migração
+FTS_TABLE = "artigos_artigo_fts"
+
+
+def criar_indice_fts(apps, schema_editor):
+    """Cria a tabela FTS5 (somente SQLite) e indexa os artigos existentes"""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "titulo, resumo, conteudo, tags, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+    )
+
+    Artigo = apps.get_model("artigos", "Artigo")
+    rows = Artigo.objects.values_list("pk", "titulo", "resumo", "conteudo", "tags")
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, titulo, resumo, conteudo, tags) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            # O conteúdo entra sem HTML e sem entidades
+            [
+                [pk, titulo, resumo, unescape(strip_tags(conteudo or "")), tags]
+                for pk, titulo, resumo, conteudo, tags in rows.iterator()
+            ],
+        )
+
+
+def remover_indice_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("artigos", "0005_artigo_conteudo_renderizado"),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_fts, remover_indice_fts),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:40
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def migrar_tags(apps, schema_editor):
+    """Cria as tags a partir do texto separado por vírgulas de cada artigo"""
+    Artigo = apps.get_model("artigos", "Artigo")
+    Tag = apps.get_model("artigos", "Tag")
+
+    # "Imóveis" e "imóveis" viram a mesma tag (mesmo slug); vale o primeiro nome
+    tags_por_slug = {}
+    for artigo in Artigo.objects.exclude(tags_texto="").only("id", "tags_texto"):
+        tag_ids = []
+        for nome in artigo.tags_texto.split(","):
+            nome = nome.strip()[:50]
+            slug = slugify(nome)
+            if not slug:
+                continue
+            if slug not in tags_por_slug:
+                tag = Tag.objects.filter(slug=slug).first()
+                if tag is None:
+                    tag = Tag.objects.create(nome=nome, slug=slug)
+                tags_por_slug[slug] = tag
+            tag_ids.append(tags_por_slug[slug].pk)
+        artigo.tags.set(tag_ids)
+
+
+def restaurar_tags(apps, schema_editor):
+    """Volta as tags para o texto separado por vírgulas"""
+    Artigo = apps.get_model("artigos", "Artigo")
+    for artigo in Artigo.objects.prefetch_related("tags"):
+        artigo.tags_texto = ", ".join(tag.nome for tag in artigo.tags.all())[:200]
+        artigo.save(update_fields=["tags_texto"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("artigos", "0006_artigo_fts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "nome",
+                    models.CharField(max_length=50, unique=True, verbose_name="Nome"),
+                ),
+                (
+                    "slug",
+                    models.SlugField(
+                        blank=True,
+                        max_length=60,
+                        unique=True,
+                        verbose_name="URL amigável",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Tag",
+                "verbose_name_plural": "Tags",
+                "ordering": ["nome"],
+            },
+        ),
+        migrations.RenameField(
+            model_name="artigo",
+            old_name="tags",
+            new_name="tags_texto",
+        ),
+        migrations.AddField(
+            model_name="artigo",
+            name="tags",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Tags do artigo (ex: avaliação, imóveis, mercado)",
+                related_name="artigos",
+                to="artigos.tag",
+                verbose_name="Tags",
+            ),
+        ),
+        migrations.RunPython(migrar_tags, restaurar_tags),
+        migrations.RemoveField(
+            model_name="artigo",
+            name="tags_texto",
+        ),
+    ]
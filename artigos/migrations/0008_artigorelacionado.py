@@ -0,0 +1,64 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("artigos", "0007_tag"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArtigoRelacionado",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField(verbose_name="Similaridade")),
+                ("posicao", models.PositiveSmallIntegerField(verbose_name="Posição")),
+                (
+                    "artigo",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="relacionados",
+                        to="artigos.artigo",
+                        verbose_name="Artigo",
+                    ),
+                ),
+                (
+                    "relacionado",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="relacionado_em",
+                        to="artigos.artigo",
+                        verbose_name="Artigo relacionado",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Artigo relacionado",
+                "verbose_name_plural": "Artigos relacionados",
+                "ordering": ["artigo", "posicao"],
+                "indexes": [
+                    models.Index(
+                        fields=["artigo", "posicao"], name="artigos_relacionado_pos_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("artigo", "relacionado"),
+                        name="artigos_relacionado_unico",
+                    )
+                ],
+            },
+        ),
+    ]
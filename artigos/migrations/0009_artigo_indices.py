@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("artigos", "0008_artigorelacionado"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="artigo",
+            index=models.Index(
+                condition=models.Q(("publicado", True)),
+                fields=["data_publicacao", "id"],
+                name="artigos_publicados_data_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="artigo",
+            index=models.Index(
+                fields=["-data_publicacao", "-data_criacao"],
+                name="artigos_artigo_ordem_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("artigos", "0009_artigo_indices"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="artigo",
+            name="imagem_variantes",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Variantes da imagem",
+            ),
+        ),
+    ]
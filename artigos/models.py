@@ -3,10 +3,47 @@ Models para o app de artigos/blog da Prisma Avaliações Imobiliárias
 """
 
 from django.db import models
+from django.contrib.contenttypes.fields import GenericRelation
 from django.urls import reverse
 from django.utils.text import slugify
 from django.utils import timezone
 
+from .content import render_article
+
+
+class ArtigoQuerySet(models.QuerySet):
+    """
+    QuerySet dos artigos
+    """
+    
+    # Campos usados nos cards das listagens (lista, tag, busca, relacionados);
+    # o tempo de leitura já vem calculado de save()
+    CARD_FIELDS = (
+        'id', 'titulo', 'slug', 'autor', 'resumo', 'imagem_destacada', 'imagem_variantes',
+        'data_publicacao', 'tempo_leitura',
+    )
+    
+    def cards(self):
+        """
+        Carrega só os campos dos cards, sem o conteúdo (nem o renderizado)
+        
+        Acessar outro campo em um card faz uma consulta por artigo; se o
+        template precisar de mais um campo, ele entra em CARD_FIELDS.
+        """
+        return self.only(*self.CARD_FIELDS)
+    
+    def proxima_publicacao(self):
+        """
+        Data de publicação do próximo artigo agendado (ou None)
+        
+        Caches que dependem da lista de publicados usam essa data para
+        limitar o timeout.
+        """
+        return self.filter(
+            publicado=True,
+            data_publicacao__gt=timezone.now()
+        ).aggregate(proxima=models.Min('data_publicacao'))['proxima']
+
 
 class Artigo(models.Model):
     """
@@ -53,6 +90,14 @@ class Artigo(models.Model):
         help_text="Imagem principal do artigo (opcional)"
     )
     
+    # Larguras em WebP/AVIF geradas depois do upload (ver artigos/images.py)
+    imagem_variantes = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="Variantes da imagem"
+    )
+    
     # Campos de controle
     publicado = models.BooleanField(
         default=False,
@@ -92,11 +137,12 @@ class Artigo(models.Model):
         help_text="Palavras-chave separadas por vírgula para SEO"
     )
     
-    tags = models.CharField(
-        max_length=200,
+    tags = models.ManyToManyField(
+        'Tag',
         blank=True,
+        related_name='artigos',
         verbose_name="Tags",
-        help_text="Tags separadas por vírgula (ex: avaliação, imóveis, mercado)"
+        help_text="Tags do artigo (ex: avaliação, imóveis, mercado)"
     )
     
     canonical_url = models.URLField(
@@ -105,18 +151,66 @@ class Artigo(models.Model):
         help_text="URL canônica se diferente da padrão (opcional)"
     )
     
+    # Conteúdo processado (preenchido em save(), ver artigos/content.py)
+    conteudo_renderizado = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Conteúdo renderizado"
+    )
+    
+    sumario_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Sumário"
+    )
+    
+    contagem_palavras = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Palavras"
+    )
+    
+    tempo_leitura = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        verbose_name="Tempo de leitura (min)"
+    )
+    
+    # Relação reversa com o SEO Meta (permite prefetch em listagens)
+    seo_meta = GenericRelation(
+        'seo.SEOMeta',
+        related_query_name='artigo'
+    )
+    
+    objects = ArtigoQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Artigo"
         verbose_name_plural = "Artigos"
         ordering = ['-data_publicacao', '-data_criacao']
+        indexes = [
+            # Listagens, contagens, navegação e sitemap filtram publicado=True
+            # (o Django gera só WHERE "publicado", a mesma condição do índice)
+            # e ordenam pela data; o id desempata
+            models.Index(
+                fields=['data_publicacao', 'id'],
+                condition=models.Q(publicado=True),
+                name='artigos_publicados_data_idx'
+            ),
+            # Ordenação padrão (admin e consultas sem order_by)
+            models.Index(
+                fields=['-data_publicacao', '-data_criacao'],
+                name='artigos_artigo_ordem_idx'
+            ),
+        ]
         
     def __str__(self):
         return self.titulo
     
     def save(self, *args, **kwargs):
         """
-        Sobrescreve o save para gerar o slug automaticamente
-        e definir a data de publicação
+        Sobrescreve o save para gerar o slug automaticamente,
+        definir a data de publicação e processar o conteúdo
         """
         if not self.slug:
             self.slug = slugify(self.titulo)
@@ -128,9 +222,26 @@ class Artigo(models.Model):
         # Se o artigo foi despublicado, remove a data de publicação
         if not self.publicado:
             self.data_publicacao = None
+        
+        # Processar o conteúdo, exceto em saves parciais que não o alteram
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'conteudo' in update_fields:
+            rendered = self.render_conteudo()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(rendered)
             
         super().save(*args, **kwargs)
     
+    def render_conteudo(self):
+        """
+        Preenche os campos de conteúdo processado a partir de conteudo
+        Retorna os nomes dos campos preenchidos
+        """
+        rendered = render_article(self.conteudo)
+        for field, value in rendered.items():
+            setattr(self, field, value)
+        return list(rendered)
+    
     def get_absolute_url(self):
         """
         Retorna a URL absoluta do artigo
@@ -148,20 +259,102 @@ class Artigo(models.Model):
     
     def get_tags_list(self):
         """
-        Retorna as tags como uma lista
+        Retorna os nomes das tags como uma lista
+        (usa o prefetch_related('tags') das listagens, quando houver)
         """
-        if self.tags:
-            return [tag.strip() for tag in self.tags.split(',')]
-        return []
+        return [tag.nome for tag in self.tags.all()]
     
     def get_tempo_leitura(self):
         """
-        Estima o tempo de leitura baseado no conteúdo
+        Tempo de leitura calculado em save()
         Média de 200 palavras por minuto
         """
-        palavras = len(self.conteudo.split())
-        minutos = max(1, round(palavras / 200))
-        return f"{minutos} min de leitura"
+        return f"{max(1, self.tempo_leitura)} min de leitura"
+
+
+class Tag(models.Model):
+    """
+    Model para as tags dos artigos
+    """
+    
+    nome = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name="Nome"
+    )
+    
+    slug = models.SlugField(
+        max_length=60,
+        unique=True,
+        blank=True,
+        verbose_name="URL amigável"
+    )
+    
+    class Meta:
+        verbose_name = "Tag"
+        verbose_name_plural = "Tags"
+        ordering = ['nome']
+        
+    def __str__(self):
+        return self.nome
+    
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = slugify(self.nome)
+        super().save(*args, **kwargs)
+    
+    def get_absolute_url(self):
+        """
+        Retorna a URL da página da tag
+        """
+        return reverse('artigos:por_tag', kwargs={'tag': self.slug})
+
+
+class ArtigoRelacionado(models.Model):
+    """
+    Artigos relacionados pré-calculados (ver artigos/related.py)
+    
+    Para cada artigo publicado, os N mais parecidos em ordem de posição.
+    """
+    
+    artigo = models.ForeignKey(
+        Artigo,
+        on_delete=models.CASCADE,
+        related_name='relacionados',
+        verbose_name="Artigo"
+    )
+    
+    relacionado = models.ForeignKey(
+        Artigo,
+        on_delete=models.CASCADE,
+        related_name='relacionado_em',
+        verbose_name="Artigo relacionado"
+    )
+    
+    score = models.FloatField(
+        verbose_name="Similaridade"
+    )
+    
+    posicao = models.PositiveSmallIntegerField(
+        verbose_name="Posição"
+    )
+    
+    class Meta:
+        verbose_name = "Artigo relacionado"
+        verbose_name_plural = "Artigos relacionados"
+        ordering = ['artigo', 'posicao']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['artigo', 'relacionado'],
+                name='artigos_relacionado_unico'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['artigo', 'posicao'], name='artigos_relacionado_pos_idx'),
+        ]
+        
+    def __str__(self):
+        return f"{self.artigo} → {self.relacionado} ({self.score:.3f})"
 
 
 class Categoria(models.Model):
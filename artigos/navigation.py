@@ -0,0 +1,99 @@
+"""
+Navegação anterior/próximo entre artigos
+
+Os vizinhos de um artigo na ordem de publicação saem de uma única
+consulta com LAG/LEAD sobre os artigos publicados, e o resultado (id,
+título e slug dos vizinhos) fica no cache. A chave leva um carimbo de
+versão trocado sempre que um artigo é salvo ou excluído (ver
+artigos/signals.py), então publicar, despublicar ou mudar a data de
+publicação invalida a navegação de todos os artigos de uma vez.
+
+O timeout vai no máximo até a próxima publicação agendada (get_timeout,
+como na paginação), então um artigo agendado entra na navegação assim
+que chega a data de publicação.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from .models import Artigo
+from .pagination import get_timeout
+
+
+NAV_VERSION_KEY = 'artigos:navegacao:versao'
+NAV_TIMEOUT = 60 * 60
+
+
+def get_nav_version():
+    """Carimbo de versão atual da navegação"""
+    version = cache.get(NAV_VERSION_KEY)
+    if version is None:
+        # add() não sobrescreve um carimbo criado por outro worker
+        cache.add(NAV_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(NAV_VERSION_KEY)
+    return version
+
+
+def bump_nav_version():
+    """Invalida a navegação de todos os artigos"""
+    cache.set(NAV_VERSION_KEY, time.time_ns(), None)
+
+
+def _neighbours_sql():
+    # "WHERE publicado" (sem parâmetro) é a condição do índice parcial
+    # artigos_publicados_data_idx, que já entrega a ordem da janela
+    table = connection.ops.quote_name(Artigo._meta.db_table)
+    return f"""
+        SELECT v.anterior_id, a.titulo, a.slug, v.proximo_id, p.titulo, p.slug
+        FROM (
+            SELECT id,
+                   LAG(id) OVER janela AS anterior_id,
+                   LEAD(id) OVER janela AS proximo_id
+            FROM {table}
+            WHERE publicado AND data_publicacao <= %s
+            WINDOW janela AS (ORDER BY data_publicacao, id)
+        ) v
+        LEFT JOIN {table} a ON a.id = v.anterior_id
+        LEFT JOIN {table} p ON p.id = v.proximo_id
+        WHERE v.id = %s
+    """
+
+
+def load_neighbours(pk):
+    """
+    Consulta os vizinhos do artigo (uma consulta)
+
+    Retorna {'anterior': {...} ou None, 'proximo': {...} ou None}, com
+    id, titulo e slug de cada vizinho.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(_neighbours_sql(), [timezone.now(), pk])
+        row = cursor.fetchone()
+
+    result = {'anterior': None, 'proximo': None}
+    if row:
+        for name, (id_, titulo, slug) in (('anterior', row[0:3]), ('proximo', row[3:6])):
+            if id_ is not None:
+                result[name] = {'id': id_, 'titulo': titulo, 'slug': slug}
+    return result
+
+
+def get_neighbours(artigo):
+    """
+    Retorna (artigo anterior, próximo artigo), cada um ou None
+
+    Os vizinhos são instâncias parciais de Artigo (id, titulo e slug),
+    suficientes para o título e get_absolute_url() na navegação.
+    """
+    key = f'artigos:navegacao:{get_nav_version()}:{artigo.pk}'
+    data = cache.get(key)
+    if data is None:
+        data = load_neighbours(artigo.pk)
+        cache.set(key, data, get_timeout(NAV_TIMEOUT))
+
+    return tuple(
+        Artigo(**data[name]) if data[name] else None
+        for name in ('anterior', 'proximo')
+    )
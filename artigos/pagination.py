@@ -0,0 +1,119 @@
+"""
+Paginação por chave (keyset) das listagens do blog
+
+As URLs continuam ?page=N (estáveis para buscadores e compatíveis com o
+page_obj dos templates), mas a página N não usa OFFSET: cada página
+começa em uma chave (data_publicacao, id), e a consulta busca os artigos
+a partir dela no índice artigos_publicados_data_idx.
+
+As chaves de início de todas as páginas e o total saem de uma leitura só
+do índice (sem as linhas) e ficam no cache. A chave do cache leva um
+carimbo de versão trocado sempre que um artigo é salvo ou excluído ou
+muda de tags (ver artigos/signals.py); um artigo agendado limita o
+timeout até a data de publicação dele.
+"""
+import time
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .models import Artigo
+
+
+LIST_VERSION_KEY = 'artigos:listagem:versao'
+LIST_TIMEOUT = 60 * 60
+
+# Ordem das listagens: mais recentes primeiro, id desempata
+KEYSET_ORDERING = ('-data_publicacao', '-id')
+
+
+def get_list_version():
+    """Carimbo de versão atual das listagens"""
+    version = cache.get(LIST_VERSION_KEY)
+    if version is None:
+        # add() não sobrescreve um carimbo criado por outro worker
+        cache.add(LIST_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(LIST_VERSION_KEY)
+    return version
+
+
+def bump_list_version():
+    """Invalida as chaves e os totais de todas as listagens"""
+    cache.set(LIST_VERSION_KEY, time.time_ns(), None)
+
+
+def get_timeout(timeout=LIST_TIMEOUT):
+    """timeout, ou menos se um artigo agendado entra no ar antes"""
+    proxima = Artigo.objects.proxima_publicacao()
+    if proxima is None:
+        return timeout
+    return max(1, min(timeout, int((proxima - timezone.now()).total_seconds()) + 1))
+
+
+def load_boundaries(queryset, per_page):
+    """
+    Retorna (chaves de início de cada página, total) do queryset
+
+    Lê só (data_publicacao, id), o que o índice parcial cobre.
+    """
+    boundaries = []
+    total = 0
+    keys = queryset.order_by(*KEYSET_ORDERING).values_list('data_publicacao', 'id')
+    for total, key in enumerate(keys.iterator(chunk_size=2000), start=1):
+        if (total - 1) % per_page == 0:
+            boundaries.append(key)
+    return boundaries, total
+
+
+class KeysetPaginator(Paginator):
+    """
+    Paginator com o mesmo contrato do Django (page_obj, page_range,
+    num_pages), mas que busca cada página a partir da chave dela
+
+    queryset: artigos publicados, sem o filtro data_publicacao <= agora.
+    O paginator aplica esse filtro nas chaves e na primeira página; nas
+    outras a chave já é o limite (com os dois, o SQLite percorre o índice
+    a partir de agora, e não a partir da chave).
+
+    name identifica a listagem no cache (ex.: 'lista', 'tag:3'): querysets
+    diferentes precisam de nomes diferentes.
+    """
+
+    def __init__(self, queryset, per_page, name, **kwargs):
+        super().__init__(queryset.order_by(*KEYSET_ORDERING), per_page, **kwargs)
+        self.name = name
+
+    def published(self):
+        """Artigos já no ar (data de publicação até agora)"""
+        return self.object_list.filter(data_publicacao__lte=timezone.now())
+
+    @cached_property
+    def _keyset(self):
+        key = f'artigos:listagem:{get_list_version()}:{self.name}:{self.per_page}'
+        data = cache.get(key)
+        if data is None:
+            data = load_boundaries(self.published(), self.per_page)
+            cache.set(key, data, get_timeout())
+        return data
+
+    @cached_property
+    def count(self):
+        """Total em cache (sem COUNT(*))"""
+        return self._keyset[1]
+
+    def page(self, number):
+        number = self.validate_number(number)
+        boundaries = self._keyset[0]
+        if number == 1:
+            queryset = self.published()
+        else:
+            data_publicacao, pk = boundaries[number - 1]
+            # O lte redundante dá ao banco o intervalo do índice
+            queryset = self.object_list.filter(
+                Q(data_publicacao__lt=data_publicacao) | Q(data_publicacao=data_publicacao, id__lte=pk),
+                data_publicacao__lte=data_publicacao,
+            )
+        return self._get_page(list(queryset[:self.per_page]), number, self)
@@ -0,0 +1,309 @@
+"""
+Artigos relacionados pré-calculados
+
+A similaridade entre dois artigos publicados combina:
+- sobreposição das tags (Jaccard), peso TAG_WEIGHT
+- cosseno entre os vetores TF-IDF do título e do resumo, peso TEXT_WEIGHT
+
+Os vetores são esparsos (dicionários termo -> peso) e os candidatos saem
+de índices invertidos por termo e por tag, então só são comparados pares
+que têm algo em comum. Os RELATED_LIMIT mais parecidos de cada artigo
+ficam em ArtigoRelacionado; a view de detalhe lê essas linhas.
+
+Ao salvar um artigo (ver artigos/signals.py), update_related() recalcula
+a lista dele e, como a similaridade é simétrica, só mexe na lista dos
+outros artigos em que ele entra, sai ou muda de posição. Os pesos IDF
+mudam um pouco a cada artigo novo; a recomputação completa corrige isso:
+
+    python manage.py calcular_relacionados
+
+Artigos agendados não passam por nenhum save quando entram no ar; o cron
+roda calcular_relacionados --agendados, que só recalcula se algum entrou
+desde a última recomputação (ver config/crontab).
+
+Depois de gravar listas novas, o carimbo de versão dos relacionados é
+trocado e o signal related_updated é enviado (ETag do artigo e cache de
+páginas).
+"""
+import heapq
+import math
+import re
+import time
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Artigo, ArtigoRelacionado
+from .search import STOPWORDS, fold, stem
+
+
+RELATED_LIMIT = 6
+
+TAG_WEIGHT = 0.6
+TEXT_WEIGHT = 0.4
+
+# Termos presentes em mais da metade dos artigos não geram candidatos
+# (continuam no cálculo do cosseno)
+COMMON_TERM_RATIO = 0.5
+
+# Diferença de score considerada igual
+SCORE_EPSILON = 1e-9
+
+RELATED_VERSION_KEY = 'artigos:relacionados:versao'
+
+# Início da última recomputação completa (ver scheduled_since_last_compute)
+RELATED_COMPUTED_KEY = 'artigos:relacionados:calculado'
+
+# Enviado depois do commit de listas novas
+related_updated = Signal()
+
+
+def get_related_version():
+    """Carimbo de versão atual das listas de relacionados"""
+    version = cache.get(RELATED_VERSION_KEY)
+    if version is None:
+        # add() não sobrescreve um carimbo criado por outro worker
+        cache.add(RELATED_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(RELATED_VERSION_KEY)
+    return version
+
+
+def bump_related_version():
+    cache.set(RELATED_VERSION_KEY, time.time_ns(), None)
+    related_updated.send(sender=ArtigoRelacionado)
+
+
+def tokenize(text):
+    """Termos normalizados (sem acento, sem stopwords, radical aproximado)"""
+    return [
+        stem(term) for term in re.findall(r'\w+', fold(text or ''))
+        if len(term) > 2 and not term.isdigit() and term not in STOPWORDS
+    ]
+
+
+class RelatedCorpus:
+    """
+    Vetores TF-IDF, tags e índices invertidos dos artigos publicados
+    """
+
+    def __init__(self, rows):
+        """rows: [(pk, titulo, resumo, data_publicacao, tag_ids)]"""
+        self.dates = {}
+        self.tags = {}
+        self.vectors = {}
+        self.term_index = defaultdict(set)
+        self.tag_index = defaultdict(set)
+
+        counts = {}
+        document_frequency = Counter()
+        for pk, titulo, resumo, data_publicacao, tag_ids in rows:
+            # O título pesa o dobro do resumo
+            counts[pk] = Counter(tokenize(titulo) * 2 + tokenize(resumo))
+            document_frequency.update(counts[pk].keys())
+            self.dates[pk] = data_publicacao.timestamp() if data_publicacao else 0
+            self.tags[pk] = frozenset(tag_ids)
+            for tag_id in tag_ids:
+                self.tag_index[tag_id].add(pk)
+
+        total = len(counts)
+        common = max(2, total * COMMON_TERM_RATIO)
+        for pk, term_counts in counts.items():
+            vector = {
+                term: (1 + math.log(count)) * (math.log((1 + total) / (1 + document_frequency[term])) + 1)
+                for term, count in term_counts.items()
+            }
+            norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+            self.vectors[pk] = {term: weight / norm for term, weight in vector.items()}
+            for term in term_counts:
+                if document_frequency[term] <= common:
+                    self.term_index[term].add(pk)
+
+    def __contains__(self, pk):
+        return pk in self.vectors
+
+    def __iter__(self):
+        return iter(self.vectors)
+
+    def similarity(self, a, b):
+        tags_a, tags_b = self.tags[a], self.tags[b]
+        tag_score = len(tags_a & tags_b) / len(tags_a | tags_b) if tags_a and tags_b else 0.0
+
+        vector_a, vector_b = self.vectors[a], self.vectors[b]
+        if len(vector_a) > len(vector_b):
+            vector_a, vector_b = vector_b, vector_a
+        text_score = sum(weight * vector_b.get(term, 0.0) for term, weight in vector_a.items())
+
+        return TAG_WEIGHT * tag_score + TEXT_WEIGHT * text_score
+
+    def candidates(self, pk):
+        found = set()
+        for term in self.vectors[pk]:
+            found |= self.term_index.get(term, set())
+        for tag_id in self.tags[pk]:
+            found |= self.tag_index[tag_id]
+        found.discard(pk)
+        return found
+
+    def scores(self, pk):
+        """{outro pk: score} de todos os candidatos com score > 0"""
+        result = {}
+        for other in self.candidates(pk):
+            score = self.similarity(pk, other)
+            if score > 0:
+                result[other] = score
+        return result
+
+    def top(self, scores, limit=RELATED_LIMIT):
+        """[(pk, score)] mais parecidos; empate -> mais recente primeiro"""
+        return heapq.nsmallest(
+            limit, scores.items(), key=lambda item: (-item[1], -self.dates[item[0]])
+        )
+
+    def neighbours(self, pk, limit=RELATED_LIMIT):
+        return self.top(self.scores(pk), limit)
+
+
+def load_corpus():
+    """Monta o corpus com os artigos publicados (duas consultas)"""
+    publicados = Artigo.objects.filter(publicado=True, data_publicacao__lte=timezone.now())
+    tag_ids = defaultdict(list)
+    for artigo_id, tag_id in Artigo.tags.through.objects.filter(
+        artigo__in=publicados
+    ).values_list('artigo_id', 'tag_id'):
+        tag_ids[artigo_id].append(tag_id)
+
+    rows = (
+        (pk, titulo, resumo, data_publicacao, tag_ids[pk])
+        for pk, titulo, resumo, data_publicacao in publicados.values_list(
+            'pk', 'titulo', 'resumo', 'data_publicacao'
+        )
+    )
+    return RelatedCorpus(rows)
+
+
+def _rows(pk, neighbours):
+    return [
+        ArtigoRelacionado(artigo_id=pk, relacionado_id=other, score=score, posicao=position)
+        for position, (other, score) in enumerate(neighbours, start=1)
+    ]
+
+
+def _replace_lists(lists):
+    """Troca as listas {pk: [(pk, score)]} no banco"""
+    ArtigoRelacionado.objects.filter(artigo_id__in=list(lists)).delete()
+    rows = []
+    for pk, neighbours in lists.items():
+        rows.extend(_rows(pk, neighbours))
+    ArtigoRelacionado.objects.bulk_create(rows, batch_size=1000)
+    transaction.on_commit(bump_related_version)
+
+
+def recompute_all(limit=RELATED_LIMIT):
+    """Recalcula todas as listas; retorna o número de artigos"""
+    started = timezone.now()
+    corpus = load_corpus()
+    with transaction.atomic():
+        ArtigoRelacionado.objects.all().delete()
+        rows = []
+        for pk in corpus:
+            rows.extend(_rows(pk, corpus.neighbours(pk, limit)))
+            if len(rows) >= 1000:
+                ArtigoRelacionado.objects.bulk_create(rows)
+                rows = []
+        ArtigoRelacionado.objects.bulk_create(rows)
+        transaction.on_commit(bump_related_version)
+        transaction.on_commit(lambda: cache.set(RELATED_COMPUTED_KEY, started, None))
+    return len(corpus.vectors)
+
+
+def scheduled_since_last_compute():
+    """
+    True se algum artigo entrou no ar depois do início da última
+    recomputação completa (ou se não há registro dela)
+
+    Artigos publicados na hora também contam: já têm a lista, mas a
+    recomputação corrige os pesos IDF.
+    """
+    computed_at = cache.get(RELATED_COMPUTED_KEY)
+    if computed_at is None:
+        return True
+    return Artigo.objects.filter(
+        publicado=True,
+        data_publicacao__gt=computed_at,
+        data_publicacao__lte=timezone.now(),
+    ).exists()
+
+
+def _load_lists(pks):
+    """Listas atuais {pk: [(pk, score)]} dos artigos informados"""
+    lists = defaultdict(list)
+    pks = list(pks)
+    for i in range(0, len(pks), 500):
+        for artigo_id, other, score in ArtigoRelacionado.objects.filter(
+            artigo_id__in=pks[i:i + 500]
+        ).order_by('artigo_id', 'posicao').values_list('artigo_id', 'relacionado_id', 'score'):
+            lists[artigo_id].append((other, score))
+    return lists
+
+
+def _same_list(a, b):
+    return len(a) == len(b) and all(
+        item_a == item_b and abs(score_a - score_b) <= SCORE_EPSILON
+        for (item_a, score_a), (item_b, score_b) in zip(a, b)
+    )
+
+
+def update_related(pk, listed_in=None, limit=RELATED_LIMIT):
+    """
+    Atualiza as listas afetadas por uma mudança no artigo pk
+
+    - a lista do próprio artigo é recalculada (ou removida, se ele não
+      está mais publicado)
+    - nas listas dos outros, o artigo entra, sai ou muda de score; só as
+      listas em que ele perdeu score são recalculadas inteiras (pode haver
+      outro artigo que volta a caber)
+
+    listed_in: artigos que listavam pk quando as linhas já foram removidas
+    (exclusão em cascata); essas listas são recalculadas.
+    Retorna {pk: nova lista} dos artigos alterados.
+    """
+    corpus = load_corpus()
+
+    with transaction.atomic():
+        listed_in = set(listed_in or ()) | set(
+            ArtigoRelacionado.objects.filter(relacionado_id=pk).values_list('artigo_id', flat=True)
+        )
+        scores = corpus.scores(pk) if pk in corpus else {}
+        affected = (listed_in | set(scores)) & set(corpus.vectors)
+        current = _load_lists(affected)
+
+        changed = {}
+        if pk in corpus:
+            changed[pk] = corpus.top(scores, limit)
+        else:
+            ArtigoRelacionado.objects.filter(artigo_id=pk).delete()
+
+        for other in affected:
+            old_list = current.get(other, [])
+            old_score = dict(old_list).get(pk)
+            new_score = scores.get(other, 0.0)
+
+            if other in listed_in and (old_score is None or new_score < old_score - SCORE_EPSILON):
+                # Perdeu posição: outro artigo pode ocupar a vaga
+                new_list = corpus.neighbours(other, limit)
+            else:
+                merged = {item: score for item, score in old_list if item != pk}
+                if new_score > 0:
+                    merged[pk] = new_score
+                new_list = corpus.top(merged, limit)
+
+            if not _same_list(new_list, old_list):
+                changed[other] = new_list
+
+        if changed:
+            _replace_lists(changed)
+
+    return changed
@@ -0,0 +1,425 @@
+"""
+Busca de artigos com o índice full-text do SQLite (FTS5)
+
+A tabela artigos_artigo_fts guarda, com rowid = id do artigo, o título,
+o resumo, o texto do conteúdo (sem HTML) e os nomes das tags. Ela é criada pela
+migration 0006 e mantida pelos signals em artigos/signals.py.
+
+- Acentos são ignorados (tokenizer unicode61 com remove_diacritics 2):
+  "avaliacao" encontra "avaliação"
+- Cada termo da busca vira um prefixo com o plural/sufixo comum do
+  português removido: "imóveis" busca imov*, que encontra "imóvel"
+- Resultados ordenados por bm25, com peso maior para título e tags
+- A busca pode ficar restrita a alguns campos (fields): vira um filtro
+  de colunas do FTS5, {titulo resumo tags} : (...)
+- snippet() gera o trecho com os termos destacados em <mark>
+- A busca é normalizada (minúsculas, sem acentos, sem stopwords, espaços
+  únicos): "Avaliação  de IMÓVEIS" e "avaliacao imoveis" são a mesma busca
+- cached_search() guarda os ids dos resultados (com a data de
+  publicação) em um LRU com TTL por processo; a chave leva o carimbo de
+  versão do índice (no cache compartilhado), trocado depois do commit de
+  toda alteração nele
+
+Em outros bancos (ou se a tabela não existir) a busca volta para
+icontains, como antes.
+
+Reconstruir o índice: python manage.py rebuild_search_index
+"""
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+from html import unescape
+
+from django.core.cache import cache
+from django.db import connection, transaction, DatabaseError
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.html import escape, strip_tags
+
+
+FTS_TABLE = 'artigos_artigo_fts'
+
+# Colunas do índice, na ordem da tabela, e pesos do bm25
+FTS_COLUMNS = ('titulo', 'resumo', 'conteudo', 'tags')
+FTS_WEIGHTS = (10.0, 4.0, 1.0, 6.0)
+
+# Campos buscados por padrão e a coluna do índice de cada um
+SEARCH_FIELDS = ('titulo', 'resumo', 'conteudo', 'tags__nome')
+FIELD_COLUMNS = dict(zip(SEARCH_FIELDS, FTS_COLUMNS))
+
+SNIPPET_TOKENS = 24
+
+SEARCH_VERSION_KEY = 'artigos:busca:versao'
+
+# Buscas guardadas por processo e por quanto tempo (segundos)
+RESULT_CACHE_SIZE = 256
+RESULT_CACHE_TTL = 60 * 10
+
+# Marcadores trocados por <mark> depois de escapar o trecho
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+# Sufixos removidos dos termos da busca (do mais longo para o mais curto)
+_SUFFIXES = (
+    'coes', 'soes', 'cao', 'sao', 'oes', 'aes', 'eis', 'ais', 'ns', 'es', 's',
+)
+
+_INSERT_SQL = (
+    f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FTS_COLUMNS)}) '
+    f'VALUES (%s, %s, %s, %s, %s)'
+)
+
+_fts_available = None
+
+
+def fold(text):
+    """Minúsculas e sem acentos ("Avaliação" -> "avaliacao")"""
+    normalized = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in normalized if not unicodedata.combining(c))
+
+
+STOPWORDS = frozenset(fold(word) for word in (
+    'a o os as um uma uns umas de do da dos das em no na nos nas por pelo '
+    'pela pelos pelas para com sem sob sobre e ou que se como mais menos '
+    'muito muita muitos muitas seu sua seus suas ao aos à às é ser são foi '
+    'ter tem têm este esta estes estas esse essa esses essas isso isto '
+    'entre quando onde qual quais também já não sim nosso nossa você'
+).split())
+
+
+def normalize_query(query):
+    """
+    Termos da busca sem acento, em minúsculas e sem stopwords
+
+    "  Avaliação de IMÓVEIS " -> "avaliacao imoveis". Se só houver
+    stopwords, elas ficam (a busca não pode ficar vazia).
+    """
+    terms = re.findall(r'\w+', fold(query))
+    return ' '.join([term for term in terms if term not in STOPWORDS] or terms)
+
+
+def stem(term):
+    """
+    Radical aproximado de um termo já sem acentos
+
+    Não é um stemmer completo: remove um sufixo de plural/derivação comum
+    ou, sem sufixo, a última vogal (ou l) de palavras longas, para que a
+    busca por prefixo encontre singular e plural.
+    """
+    for suffix in _SUFFIXES:
+        if term.endswith(suffix) and len(term) - len(suffix) >= 4:
+            return term[:-len(suffix)]
+    if len(term) > 5 and term[-1] in 'aeiol':
+        return term[:-1]
+    return term
+
+
+def fts_columns(fields):
+    """Colunas do índice dos campos buscados (None se algum não está no índice)"""
+    columns = [FIELD_COLUMNS.get(field) for field in fields]
+    if not columns or None in columns:
+        return None
+    return tuple(column for column in FTS_COLUMNS if column in columns)
+
+
+def build_match_query(query, fields=None):
+    """
+    Converte o texto digitado em uma expressão MATCH do FTS5
+
+    Só letras e números passam (nada de sintaxe FTS do usuário); todos os
+    termos precisam aparecer, nas colunas dos campos em fields (todas, se
+    não informado). Retorna '' se não sobrar nenhum termo.
+    """
+    match = ' '.join(f'"{stem(term)}"*' for term in normalize_query(query).split())
+    columns = fts_columns(fields) if fields else FTS_COLUMNS
+    if match and columns != FTS_COLUMNS:
+        # Filtro de colunas: {titulo resumo tags} : ("avali"* "imov"*)
+        match = f'{{{" ".join(columns)}}} : ({match})'
+    return match
+
+
+def fts_available():
+    """True se o banco é SQLite e a tabela FTS5 existe"""
+    global _fts_available
+    if connection.vendor != 'sqlite':
+        return False
+    if _fts_available is None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [FTS_TABLE],
+            )
+            _fts_available = cursor.fetchone() is not None
+    return _fts_available
+
+
+def get_index_values(titulo, resumo, conteudo, tags):
+    """Valores indexados: o conteúdo entra sem HTML e sem entidades"""
+    return [titulo, resumo, unescape(strip_tags(conteudo or '')), tags]
+
+
+def get_search_version():
+    """Carimbo de versão atual do índice de busca"""
+    version = cache.get(SEARCH_VERSION_KEY)
+    if version is None:
+        # add() não sobrescreve um carimbo criado por outro worker
+        cache.add(SEARCH_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(SEARCH_VERSION_KEY)
+    return version
+
+
+def bump_search_version():
+    """
+    Invalida os resultados de busca em cache
+
+    O carimbo fica no cache compartilhado (settings.CACHES): os workers
+    passam a usar chaves novas na próxima busca.
+    """
+    cache.set(SEARCH_VERSION_KEY, time.time_ns(), None)
+
+
+def index_artigo(artigo):
+    """Insere ou atualiza o artigo no índice"""
+    transaction.on_commit(bump_search_version)
+    if not fts_available():
+        return
+    values = get_index_values(
+        artigo.titulo, artigo.resumo, artigo.conteudo, ', '.join(artigo.get_tags_list())
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [artigo.pk])
+        cursor.execute(_INSERT_SQL, [artigo.pk, *values])
+
+
+def unindex_artigo(pk):
+    """Remove o artigo do índice"""
+    transaction.on_commit(bump_search_version)
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [pk])
+
+
+def rebuild_index(queryset, batch_size=500):
+    """Recria o índice a partir do queryset de artigos; retorna o total"""
+    transaction.on_commit(bump_search_version)
+    total = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        artigos = queryset.only('pk', 'titulo', 'resumo', 'conteudo').prefetch_related('tags')
+        batch = []
+        for artigo in artigos.iterator(chunk_size=batch_size):
+            batch.append([artigo.pk, *get_index_values(
+                artigo.titulo, artigo.resumo, artigo.conteudo, ', '.join(artigo.get_tags_list())
+            )])
+            if len(batch) >= batch_size:
+                cursor.executemany(_INSERT_SQL, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(_INSERT_SQL, batch)
+            total += len(batch)
+    return total
+
+
+def _bm25():
+    return f'bm25({FTS_TABLE}, {", ".join(str(w) for w in FTS_WEIGHTS)})'
+
+
+def filter_icontains(queryset, query, fields=SEARCH_FIELDS):
+    """Busca antiga (LIKE), usada quando não há índice FTS"""
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f'{field}__icontains': query})
+    # O join com as tags pode repetir artigos
+    return queryset.filter(condition).distinct()
+
+
+def search_artigos(queryset, query, fields=SEARCH_FIELDS, ranked=True):
+    """
+    Filtra o queryset pela busca
+
+    Com FTS5 e ranked=True, os artigos recebem a anotação search_rank
+    (bm25, menor é melhor) e saem ordenados por ela; ranked=False só
+    filtra (o admin aplica a própria ordenação). fields limita a busca às
+    colunas correspondentes do índice; com um campo que não está no
+    índice, a busca usa icontains.
+    """
+    if not fts_available() or fts_columns(fields) is None:
+        return filter_icontains(queryset, query, fields)
+
+    match = build_match_query(query, fields)
+    if not match:
+        return queryset.none()
+
+    if not ranked:
+        matching = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        return queryset.filter(pk__in=matching)
+
+    # Join com a tabela FTS: o SQLite percorre os resultados do MATCH e
+    # busca cada artigo pela pk; bm25() só funciona nesse contexto
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = "{table}"."id"', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        select={'search_rank': _bm25()},
+    ).order_by('search_rank', '-data_publicacao')
+
+
+class ResultCache:
+    """
+    LRU com TTL, por processo, com contadores de acertos e das buscas
+    mais frequentes (estatísticas do próprio processo)
+    """
+
+    # Buscas distintas contadas antes de descartar as menos frequentes
+    MAX_COUNTED_QUERIES = 1000
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.queries = Counter()
+
+    def get(self, key, query):
+        """Valor guardado em key (ou None); query entra nas estatísticas"""
+        with self._lock:
+            self.queries[query] += 1
+            if len(self.queries) > self.MAX_COUNTED_QUERIES:
+                self.queries = Counter(dict(self.queries.most_common(self.MAX_COUNTED_QUERIES // 2)))
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+            self.queries.clear()
+
+    def stats(self, top=10):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'top_queries': self.queries.most_common(top),
+            }
+
+
+result_cache = ResultCache()
+
+
+class SearchResults:
+    """
+    Resultados em cache como sequência para o Paginator: len() sem
+    consulta, e cada fatia busca só os artigos dela, na ordem da busca
+    """
+
+    def __init__(self, queryset, ids):
+        self.queryset = queryset
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        pks = self.ids[index]
+        # A ordem é a da lista de ids: sem ORDER BY na consulta
+        artigos = {artigo.pk: artigo for artigo in self.queryset.filter(pk__in=pks).order_by()}
+        return [artigos[pk] for pk in pks if pk in artigos]
+
+
+def cached_search(queryset, query, fields=SEARCH_FIELDS):
+    """
+    search_artigos() com os ids dos resultados em cache
+
+    O cache guarda (id, data de publicação) de todos os artigos publicados
+    que casam com a busca normalizada, em ordem de relevância. A data é
+    filtrada em memória a cada requisição, então um artigo agendado
+    aparece assim que entra no ar sem consulta nenhuma; edições,
+    despublicações e exclusões trocam o carimbo de versão. Retorna um
+    SearchResults sobre o queryset (que define os campos e os prefetches):
+    só os artigos da página são buscados, e um que saiu do queryset no
+    intervalo some da página. Sem FTS, volta para search_artigos() sem cache.
+    """
+    columns = fts_columns(fields) if fts_available() else None
+    if columns is None:
+        return search_artigos(queryset, query, fields)
+
+    normalized = normalize_query(query)
+    key = (get_search_version(), columns, normalized)
+    results = result_cache.get(key, normalized)
+    if results is None:
+        published = queryset.model.objects.filter(publicado=True)
+        results = list(
+            search_artigos(published, normalized, fields).values_list('pk', 'data_publicacao')
+        )
+        result_cache.set(key, results)
+
+    now = timezone.now()
+    ids = [pk for pk, published_at in results if published_at is not None and published_at <= now]
+    return SearchResults(queryset, ids)
+
+
+def attach_snippets(artigos, query, fields=SEARCH_FIELDS):
+    """
+    Define artigo.search_snippet (HTML com <mark>) nos artigos da página
+
+    Uma consulta para a página inteira, com os mesmos campos da busca;
+    sem FTS, os artigos ficam sem trecho e os templates mostram o resumo.
+    """
+    artigos = list(artigos)
+    match = build_match_query(query, fields) if fts_available() and fts_columns(fields) else ''
+    snippets = {}
+
+    if match and artigos:
+        pks = [artigo.pk for artigo in artigos]
+        placeholders = ', '.join(['%s'] * len(pks))
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT rowid, snippet({FTS_TABLE}, -1, %s, %s, '…', %s) FROM {FTS_TABLE} "
+                    f"WHERE {FTS_TABLE} MATCH %s AND rowid IN ({placeholders})",
+                    [_MARK_START, _MARK_END, SNIPPET_TOKENS, match, *pks],
+                )
+                snippets = dict(cursor.fetchall())
+        except DatabaseError:
+            snippets = {}
+
+    for artigo in artigos:
+        snippet = snippets.get(artigo.pk)
+        if snippet:
+            # O texto indexado não é HTML confiável: escapar antes de marcar
+            artigo.search_snippet = (
+                escape(snippet).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+            )
+        else:
+            artigo.search_snippet = ''
+    return artigos
@@ -0,0 +1,196 @@
+"""
+Signals do app de artigos: mantém o índice de busca (FTS5), os artigos
+relacionados, a navegação anterior/próximo, a paginação, as sugestões
+da busca e as variantes da imagem destacada atualizados
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .images import schedule_variants
+from .models import Artigo, ArtigoRelacionado, Tag
+from .navigation import bump_nav_version
+from .pagination import bump_list_version
+from .related import update_related
+from .search import index_artigo, unindex_artigo
+from .typeahead import record_change
+
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Artigo)
+def indexar_artigo(sender, instance, raw=False, **kwargs):
+    """Atualiza o artigo no índice de busca (na mesma transação do save)"""
+    if raw:
+        return
+    index_artigo(instance)
+
+
+@receiver(post_delete, sender=Artigo)
+def remover_artigo_do_indice(sender, instance, **kwargs):
+    """Remove o artigo excluído do índice de busca"""
+    unindex_artigo(instance.pk)
+
+
+@receiver(m2m_changed, sender=Artigo.tags.through)
+def reindexar_tags_do_artigo(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    As tags são gravadas depois do save() do artigo (ex.: no admin), então
+    o índice é atualizado de novo quando elas mudam
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        index_artigo(instance)
+    elif pk_set:
+        for artigo in Artigo.objects.filter(pk__in=pk_set).prefetch_related('tags'):
+            index_artigo(artigo)
+
+
+@receiver(post_save, sender=Tag)
+def reindexar_artigos_da_tag(sender, instance, created, raw=False, **kwargs):
+    """Tag renomeada: atualiza o nome no índice dos artigos dela"""
+    if raw or created:
+        return
+    for artigo in instance.artigos.prefetch_related('tags'):
+        index_artigo(artigo)
+
+
+@receiver(pre_delete, sender=Tag)
+def guardar_artigos_da_tag(sender, instance, **kwargs):
+    """As ligações com os artigos somem em cascata; guardar quais eram"""
+    instance._artigos_indexados = list(instance.artigos.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def reindexar_artigos_tag_excluida(sender, instance, **kwargs):
+    """Tag excluída: tira o nome dela do índice dos artigos que a tinham"""
+    pks = getattr(instance, '_artigos_indexados', None)
+    if not pks:
+        return
+    for artigo in Artigo.objects.filter(pk__in=pks).prefetch_related('tags'):
+        index_artigo(artigo)
+
+
+# Artigos relacionados (recalculados depois do commit, uma vez por
+# transação mesmo que save() e as tags disparem vários signals)
+
+def agendar_relacionados(instance, listed_in=None):
+    if getattr(instance, '_related_update_scheduled', False):
+        return
+    instance._related_update_scheduled = True
+    pk = instance.pk
+
+    def atualizar():
+        instance._related_update_scheduled = False
+        try:
+            update_related(pk, listed_in=listed_in)
+        except Exception:
+            logger.exception('Erro ao atualizar artigos relacionados do artigo %s', pk)
+
+    transaction.on_commit(atualizar)
+
+
+@receiver(post_save, sender=Artigo)
+def atualizar_relacionados(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    agendar_relacionados(instance)
+
+
+@receiver(m2m_changed, sender=Artigo.tags.through)
+def atualizar_relacionados_tags(sender, instance, action, reverse, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear') and not reverse:
+        agendar_relacionados(instance)
+
+
+@receiver(pre_delete, sender=Artigo)
+def guardar_listas_com_artigo(sender, instance, **kwargs):
+    """As linhas que apontam para o artigo somem em cascata; guardar quem o listava"""
+    instance._related_listed_in = list(
+        ArtigoRelacionado.objects.filter(relacionado=instance).values_list('artigo_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Artigo)
+def atualizar_relacionados_exclusao(sender, instance, **kwargs):
+    agendar_relacionados(instance, listed_in=getattr(instance, '_related_listed_in', None))
+
+
+@receiver(post_save, sender=Artigo)
+@receiver(post_delete, sender=Artigo)
+def invalidar_navegacao(sender, raw=False, **kwargs):
+    """
+    Publicação, data, título ou slug podem ter mudado: a navegação de
+    todos os artigos é refeita (depois do commit, para não guardar no
+    cache o estado anterior)
+    """
+    if raw:
+        return
+    transaction.on_commit(bump_nav_version)
+
+
+@receiver(post_save, sender=Artigo)
+@receiver(post_delete, sender=Artigo)
+def invalidar_listagens(sender, raw=False, **kwargs):
+    """Chaves das páginas e totais das listagens (depois do commit)"""
+    if raw:
+        return
+    transaction.on_commit(bump_list_version)
+
+
+@receiver(m2m_changed, sender=Artigo.tags.through)
+def invalidar_listagens_tags(sender, action, **kwargs):
+    """Páginas das tags mudam quando um artigo ganha ou perde tags"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(bump_list_version)
+
+
+# Sugestões da busca: cada processo aplica as mudanças registradas no
+# cache na próxima consulta (ver artigos/typeahead.py)
+
+@receiver(post_save, sender=Artigo)
+@receiver(post_delete, sender=Artigo)
+def registrar_mudanca_sugestoes(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: record_change('artigo', pk))
+
+
+@receiver(m2m_changed, sender=Artigo.tags.through)
+def registrar_mudanca_sugestoes_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        changes = [('artigo', instance.pk)]
+    else:
+        # tag.artigos.add(...): a tag e os artigos que entraram ou saíram
+        changes = [('tag', instance.pk)] + [('artigo', pk) for pk in pk_set or ()]
+    for change in changes:
+        transaction.on_commit(lambda change=change: record_change(*change))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def registrar_mudanca_sugestoes_tag(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: record_change('tag', pk))
+
+
+@receiver(post_save, sender=Artigo)
+def agendar_variantes_imagem(sender, instance, raw=False, **kwargs):
+    """
+    Imagem destacada nova (ou removida): as variantes são geradas depois
+    do commit, fora da requisição (ver artigos/images.py)
+    """
+    if raw:
+        return
+    nome = instance.imagem_destacada.name or ''
+    if nome != (instance.imagem_variantes or {}).get('original', ''):
+        schedule_variants(instance.pk)
@@ -0,0 +1 @@
+# Template tags do blog
@@ -0,0 +1,84 @@
+"""
+Template tags do blog
+"""
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from ..images import IMAGE_FORMATS
+
+register = template.Library()
+
+
+def _sources(artigo):
+    """
+    [(tipo MIME, srcset)] das variantes da imagem destacada, do formato
+    mais eficiente para o mais compatível; [] se ainda não foram geradas
+    (ou são de uma imagem anterior)
+    """
+    imagem = artigo.imagem_destacada
+    variantes = artigo.imagem_variantes or {}
+    if not imagem or variantes.get('original') != imagem.name:
+        return []
+    formatos = variantes.get('formatos', {})
+    return [
+        (mime, ', '.join(f'{imagem.storage.url(nome)} {largura}w' for largura, nome in formatos[extensao]))
+        for _, extensao, mime, _ in IMAGE_FORMATS
+        if formatos.get(extensao)
+    ]
+
+
+@register.simple_tag
+def responsive_image(artigo, sizes='100vw', **attrs):
+    """
+    Imagem destacada do artigo em um <picture> com srcset/sizes das
+    variantes WebP/AVIF (ver artigos/images.py)
+    
+    Uso: {% responsive_image artigo sizes="(min-width: 992px) 350px, 100vw" class="card-img-top" %}
+    
+    Os outros argumentos viram atributos do <img> (alt padrão: título do
+    artigo). Sem variantes, só o <img> com o original.
+    """
+    imagem = artigo.imagem_destacada
+    if not imagem:
+        return ''
+    attrs = {'alt': artigo.titulo, 'decoding': 'async', **attrs}
+    sources = _sources(artigo)
+    if not sources:
+        return format_html('<img src="{}"{}>', imagem.url, flatatt(attrs))
+
+    # Proporção do original: o navegador reserva o espaço antes de carregar
+    variantes = artigo.imagem_variantes
+    attrs.setdefault('width', variantes['largura'])
+    attrs.setdefault('height', variantes['altura'])
+    return format_html(
+        '<picture>{}<img src="{}"{}></picture>',
+        format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', (
+            (mime, srcset, sizes) for mime, srcset in sources
+        )),
+        imagem.url,
+        flatatt(attrs),
+    )
+
+
+@register.simple_tag
+def responsive_image_preload(artigo, sizes='100vw'):
+    """
+    <link rel="preload"> da imagem destacada, com o mesmo srcset/sizes
+    do primeiro formato do <picture>
+    
+    Uso (no <head>): {% responsive_image_preload artigo sizes="100vw" %}
+    
+    O type faz o navegador sem suporte ao formato ignorar o preload.
+    """
+    imagem = artigo.imagem_destacada
+    if not imagem:
+        return ''
+    sources = _sources(artigo)
+    if not sources:
+        return format_html('<link rel="preload" as="image" href="{}">', imagem.url)
+    mime, srcset = sources[0]
+    return format_html(
+        '<link rel="preload" as="image" type="{}" imagesrcset="{}" imagesizes="{}">',
+        mime, srcset, sizes,
+    )
@@ -0,0 +1,367 @@
+"""
+Sugestões da busca (typeahead) com um índice de prefixos em memória
+
+Cada processo guarda uma trie com as palavras (sem acento, minúsculas)
+dos títulos e das tags dos artigos publicados, e outra com os nomes das
+tags. Uma consulta percorre só os caracteres digitados: cada nó tem os
+ids dos documentos com alguma palavra começando naquele prefixo, e com
+mais de uma palavra os conjuntos são intersectados.
+
+Sincronização entre os workers pelo cache:
+
+- salvar/excluir um artigo (ou mudar as tags dele) ou uma tag grava uma
+  mudança numerada (artigos:sugestoes:mudanca:<n>) e incrementa o
+  contador (ver artigos/signals.py)
+- a cada consulta o processo compara o contador com o dele e recarrega
+  do banco só os artigos/tags das mudanças que ainda não aplicou
+- se alguma mudança sumiu do cache (expirou, o cache foi limpo) ou são
+  muitas, o índice é refeito inteiro
+- a cada DB_CHECK_INTERVAL segundos o índice é conferido com o banco
+  (quantidade e última atualização dos artigos publicados e quantidade
+  de ligações com tags): uma mudança que não chegou pelo cache (ex.: o
+  contador foi incrementado por dois saves ao mesmo tempo) também faz o
+  índice ser refeito, e artigos excluídos ou despublicados não ficam nas
+  sugestões
+
+Artigos agendados entram no índice com a data de publicação e só
+aparecem nas sugestões depois dela.
+"""
+import bisect
+import heapq
+import re
+import threading
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Min, Q
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Artigo, Tag
+from .search import fold
+
+
+EPOCH_KEY = 'artigos:sugestoes:epoca'
+COUNTER_KEY = 'artigos:sugestoes:contador'
+CHANGE_KEY = 'artigos:sugestoes:mudanca:{}'
+CHANGE_TIMEOUT = 60 * 60 * 24
+
+# Mais mudanças pendentes que isso: refazer o índice inteiro
+MAX_PENDING_CHANGES = 200
+
+# Intervalo (segundos) entre as conferências do índice com o banco
+DB_CHECK_INTERVAL = 5.0
+
+MIN_QUERY_LENGTH = 2
+ARTIGOS_LIMIT = 6
+TAGS_LIMIT = 4
+
+_word_re = re.compile(r'\w+')
+
+
+def words(text):
+    """Palavras sem acento e em minúsculas"""
+    return set(_word_re.findall(fold(text or '')))
+
+
+def normalize(text):
+    """Texto sem acento, em minúsculas e só com palavras ("Laudo - NBR" -> "laudo nbr")"""
+    return ' '.join(_word_re.findall(fold(text or '')))
+
+
+class PrefixTrie:
+    """Trie de palavras; cada nó guarda os ids com alguma palavra no prefixo"""
+
+    __slots__ = ('root',)
+
+    def __init__(self):
+        self.root = ({}, set())
+
+    def add(self, doc_id, doc_words):
+        for word in doc_words:
+            children, ids = self.root
+            for char in word:
+                node = children.get(char)
+                if node is None:
+                    node = children[char] = ({}, set())
+                children, ids = node
+                ids.add(doc_id)
+
+    def remove(self, doc_id, doc_words):
+        for word in doc_words:
+            path = []
+            children = self.root[0]
+            for char in word:
+                node = children.get(char)
+                if node is None:
+                    break
+                node[1].discard(doc_id)
+                path.append((children, char, node))
+                children = node[0]
+            # Poda os nós que ficaram vazios (de baixo para cima)
+            for parent, char, node in reversed(path):
+                if node[0] or node[1]:
+                    break
+                del parent[char]
+
+    def find(self, prefix):
+        """Ids com alguma palavra começando em prefix"""
+        children, ids = self.root
+        for char in prefix:
+            node = children.get(char)
+            if node is None:
+                return set()
+            children, ids = node
+        return ids
+
+
+class TypeaheadIndex:
+    """Tries de artigos e de tags, com os dados exibidos nas sugestões"""
+
+    def __init__(self):
+        self.artigos = PrefixTrie()
+        self.tags = PrefixTrie()
+        # Título inteiro normalizado, para "título começa com o texto"
+        self.titulos = PrefixTrie()
+        # id -> (palavras, dados, data de publicação, título normalizado)
+        self.artigo_docs = {}
+        self.tag_docs = {}
+        # (-timestamp, id) dos artigos, do mais recente para o mais antigo
+        self.recentes = []
+
+    def load(self):
+        """Carrega todos os artigos publicados e as tags com artigos"""
+        self._load_artigos(Q())
+        self._load_tags(Q())
+
+    def apply(self, changes):
+        """Recarrega os artigos/tags das mudanças [(tipo, pk), ...]"""
+        artigo_ids = {pk for kind, pk in changes if kind == 'artigo'}
+        tag_ids = {pk for kind, pk in changes if kind == 'tag'}
+        if tag_ids:
+            # Tag renomeada ou excluída muda as palavras dos artigos dela
+            artigo_ids.update(pk for pk, doc in self.artigo_docs.items() if doc[1]['tag_ids'] & tag_ids)
+
+        # As tags dos artigos alterados (antes e depois) podem ganhar ou
+        # perder o primeiro artigo publicado
+        tag_ids.update(self._tag_ids(artigo_ids))
+        for pk in artigo_ids:
+            self._remove_artigo(pk)
+        self._load_artigos(Q(pk__in=artigo_ids))
+        tag_ids.update(self._tag_ids(artigo_ids))
+
+        for pk in tag_ids:
+            doc = self.tag_docs.pop(pk, None)
+            if doc is not None:
+                self.tags.remove(pk, doc[0])
+        self._load_tags(Q(pk__in=tag_ids))
+
+    def _tag_ids(self, artigo_ids):
+        return {
+            tag_id for pk in artigo_ids if pk in self.artigo_docs
+            for tag_id in self.artigo_docs[pk][1]['tag_ids']
+        }
+
+    def stamp(self):
+        """(artigos, última atualização, ligações com tags) do índice; ver db_stamp()"""
+        docs = self.artigo_docs.values()
+        return (
+            len(self.artigo_docs),
+            max((doc[1]['atualizado'] for doc in docs), default=None),
+            sum(len(doc[1]['tag_ids']) for doc in docs),
+        )
+
+    def _remove_artigo(self, pk):
+        doc = self.artigo_docs.pop(pk, None)
+        if doc is None:
+            return
+        self.artigos.remove(pk, doc[0])
+        self.titulos.remove(pk, (doc[3],))
+        entry = (-doc[2].timestamp(), pk)
+        position = bisect.bisect_left(self.recentes, entry)
+        if position < len(self.recentes) and self.recentes[position] == entry:
+            del self.recentes[position]
+
+    def _load_artigos(self, q):
+        artigos = {}
+        for pk, titulo, slug, data_publicacao, atualizado in Artigo.objects.filter(
+            q, publicado=True
+        ).order_by().values_list('pk', 'titulo', 'slug', 'data_publicacao', 'data_atualizacao'):
+            artigos[pk] = ({
+                'titulo': titulo,
+                'url': reverse('artigos:detalhe', kwargs={'slug': slug}),
+                'tag_ids': set(),
+                'atualizado': atualizado,
+            }, data_publicacao, words(titulo))
+        for artigo_id, tag_id, nome in Artigo.tags.through.objects.filter(
+            artigo_id__in=artigos
+        ).values_list('artigo_id', 'tag_id', 'tag__nome'):
+            data, _, doc_words = artigos[artigo_id]
+            data['tag_ids'].add(tag_id)
+            doc_words |= words(nome)
+
+        for pk, (data, data_publicacao, doc_words) in artigos.items():
+            titulo = normalize(data['titulo'])
+            self.artigo_docs[pk] = (doc_words, data, data_publicacao, titulo)
+            self.artigos.add(pk, doc_words)
+            self.titulos.add(pk, (titulo,))
+            self.recentes.append((-data_publicacao.timestamp(), pk))
+        # Quase ordenada: o sort só encaixa os novos
+        self.recentes.sort()
+
+    def _load_tags(self, q):
+        # Data do primeiro artigo publicado da tag: antes dela, a tag não
+        # tem página com artigos
+        for pk, nome, slug, primeira in Tag.objects.filter(q).annotate(
+            primeira=Min('artigos__data_publicacao', filter=Q(artigos__publicado=True))
+        ).filter(primeira__isnull=False).values_list('pk', 'nome', 'slug', 'primeira'):
+            doc_words = words(nome)
+            data = {'nome': nome, 'url': reverse('artigos:por_tag', kwargs={'tag': slug})}
+            self.tag_docs[pk] = (doc_words, data, primeira, normalize(nome))
+            self.tags.add(pk, doc_words)
+
+    def _recentes(self, ids, limit, agora):
+        """Os limit ids mais recentes já publicados"""
+        if len(ids) * 8 < len(self.recentes):
+            # Poucos candidatos: ordenar só eles
+            ordered = sorted((-self.artigo_docs[pk][2].timestamp(), pk) for pk in ids)
+        else:
+            # Muitos: percorrer a ordem global até completar o limite
+            ordered = self.recentes
+        result = []
+        for _, pk in ordered:
+            if pk in ids and self.artigo_docs[pk][2] <= agora:
+                result.append(pk)
+                if len(result) == limit:
+                    break
+        return result
+
+    def suggest(self, query, artigos_limit=ARTIGOS_LIMIT, tags_limit=TAGS_LIMIT):
+        """
+        Sugestões para o texto digitado: todas as palavras precisam
+        aparecer como prefixo de alguma palavra do documento
+
+        Artigos cujo título começa com o texto vêm primeiro, depois os
+        mais recentes; tags em ordem alfabética.
+        """
+        # Do termo mais longo (menos ids) para o mais curto
+        terms = sorted(words(query), key=len, reverse=True)
+        if not terms:
+            return {'artigos': [], 'tags': []}
+        agora = timezone.now()
+
+        def matches(trie):
+            ids = None
+            for term in terms:
+                found = trie.find(term)
+                ids = found if ids is None else ids & found
+                if not ids:
+                    return set()
+            return ids
+
+        ids = matches(self.artigos)
+        pks = self._recentes(self.titulos.find(normalize(query)) & ids, artigos_limit, agora)
+        if len(pks) < artigos_limit:
+            pks += self._recentes(ids.difference(pks), artigos_limit - len(pks), agora)
+
+        tags = heapq.nsmallest(tags_limit, (
+            self.tag_docs[pk] for pk in matches(self.tags) if self.tag_docs[pk][2] <= agora
+        ), key=lambda doc: doc[3])
+        return {
+            'artigos': [
+                {'titulo': self.artigo_docs[pk][1]['titulo'], 'url': self.artigo_docs[pk][1]['url']}
+                for pk in pks
+            ],
+            'tags': [dict(doc[1]) for doc in tags],
+        }
+
+
+def _get_counter():
+    """(época, contador) atuais; cria os dois se o contador sumiu"""
+    values = cache.get_many([EPOCH_KEY, COUNTER_KEY])
+    if COUNTER_KEY not in values or EPOCH_KEY not in values:
+        if cache.add(COUNTER_KEY, 0, None):
+            # Contador novo: a numeração recomeça, os índices são refeitos
+            cache.set(EPOCH_KEY, time.time_ns(), None)
+        else:
+            cache.add(EPOCH_KEY, time.time_ns(), None)
+        values = cache.get_many([EPOCH_KEY, COUNTER_KEY])
+    return values.get(EPOCH_KEY), values.get(COUNTER_KEY, 0)
+
+
+def record_change(kind, pk):
+    """Registra a mudança de um artigo ou tag ('artigo' ou 'tag', pk)"""
+    _get_counter()
+    try:
+        number = cache.incr(COUNTER_KEY)
+    except ValueError:
+        # Contador expulso do cache entre as duas chamadas
+        cache.add(COUNTER_KEY, 0, None)
+        cache.set(EPOCH_KEY, time.time_ns(), None)
+        return
+    cache.set(CHANGE_KEY.format(number), (kind, pk), CHANGE_TIMEOUT)
+
+
+def db_stamp():
+    """
+    (artigos, última atualização, ligações com tags) dos artigos
+    publicados, tirado do banco em uma consulta; igual ao
+    TypeaheadIndex.stamp() de um índice em dia
+    """
+    values = Artigo.objects.filter(publicado=True).aggregate(
+        artigos=Count('pk', distinct=True),
+        atualizado=Max('data_atualizacao'),
+        ligacoes=Count('tags'),
+    )
+    return values['artigos'], values['atualizado'], values['ligacoes']
+
+
+_lock = threading.Lock()
+_index = None
+_index_version = None
+_db_checked_at = 0.0
+
+
+def _sync_index():
+    """
+    Índice deste processo, em dia com as mudanças registradas no cache
+    e conferido com o banco (chamar com _lock: as threads do worker
+    dividem o índice)
+    """
+    global _index, _index_version, _db_checked_at
+    epoch, counter = _get_counter()
+    now = time.monotonic()
+    changes = None
+
+    if _index is not None and _index_version == (epoch, counter):
+        if now - _db_checked_at < DB_CHECK_INTERVAL:
+            return _index
+        _db_checked_at = now
+        if _index.stamp() == db_stamp():
+            return _index
+        # O banco tem mudanças que não chegaram pelo cache: refazer
+    elif _index is not None and _index_version[0] == epoch:
+        applied = _index_version[1]
+        if 0 <= counter - applied <= MAX_PENDING_CHANGES:
+            keys = [CHANGE_KEY.format(n) for n in range(applied + 1, counter + 1)]
+            found = cache.get_many(keys)
+            if len(found) == len(keys):
+                changes = list(found.values())
+
+    if changes is None:
+        index = TypeaheadIndex()
+        index.load()
+        _index = index
+        _db_checked_at = now
+    else:
+        _index.apply(changes)
+    _index_version = (epoch, counter)
+    return _index
+
+
+def suggest(query):
+    """Sugestões ({'artigos': [...], 'tags': [...]}) para o texto digitado"""
+    if len(query.strip()) < MIN_QUERY_LENGTH:
+        return {'artigos': [], 'tags': []}
+    with _lock:
+        return _sync_index().suggest(query)
@@ -14,6 +14,12 @@ urlpatterns = [
     # Busca de artigos - /blog/buscar/
     path('buscar/', views.buscar_artigos, name='buscar'),
     
+    # Sugestões da busca (JSON) - /blog/buscar/sugestoes/
+    path('buscar/sugestoes/', views.sugestoes_busca, name='sugestoes'),
+    
+    # Estatísticas do cache da busca (equipe) - /blog/buscar/estatisticas/
+    path('buscar/estatisticas/', views.estatisticas_busca, name='estatisticas_busca'),
+    
     # Artigos por tag - /blog/tag/<tag>/
     path('tag/<str:tag>/', views.artigos_por_tag, name='por_tag'),
     
@@ -1,15 +1,24 @@
 """
 Views para o app de artigos/blog da Prisma Avaliações Imobiliárias
 """
+import hashlib
+import os
 
-import re
-import math
-from django.shortcuts import render, get_object_or_404
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import render, get_object_or_404, redirect
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
+from django.utils.text import slugify
 from django.utils import timezone
-from django.utils.html import strip_tags
-from .models import Artigo
+from django.views.decorators.http import condition
+from Prisma_avaliacoes.middleware import get_page_version, get_template_version
+from seo.utils import prefetch_seo
+from .models import Artigo, Tag
+from .navigation import get_neighbours, get_nav_version
+from .pagination import KeysetPaginator
+from .related import get_related_version
+from .search import attach_snippets, cached_search, result_cache
+from .typeahead import suggest
 
 
 def lista_artigos(request):
@@ -18,29 +27,33 @@ def lista_artigos(request):
     URL: /blog/
     """
     
-    # Busca apenas artigos publicados
-    artigos = Artigo.objects.filter(
-        publicado=True,
-        data_publicacao__lte=timezone.now()
-    ).order_by('-data_publicacao')
+    # Busca apenas artigos publicados (só os campos dos cards)
+    artigos = Artigo.objects.cards().filter(publicado=True)
+    
+    # Listagem completa paginada por chave (data_publicacao, id), com as
+    # chaves das páginas e o total em cache; o paginator aplica a data de
+    # publicação (ver artigos/pagination.py)
+    listagem = KeysetPaginator(
+        prefetch_seo(artigos).prefetch_related('tags'), 6, name='lista'  # 6 artigos por página
+    )
     
     # Sistema de busca
     busca = request.GET.get('busca', '')
     if busca:
-        artigos = artigos.filter(
-            Q(titulo__icontains=busca) |
-            Q(resumo__icontains=busca) |
-            Q(conteudo__icontains=busca) |
-            Q(tags__icontains=busca)
-        )
-    
-    # Paginação
-    paginator = Paginator(artigos, 6)  # 6 artigos por página
+        # Índice full-text, ordenado por relevância; ids dos resultados
+        # em cache por busca normalizada (ver artigos/search.py)
+        resultados = cached_search(listagem.published(), busca)
+        paginator = Paginator(resultados, 6)
+    else:
+        paginator = listagem
+    
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    if busca:
+        page_obj.object_list = attach_snippets(page_obj.object_list, busca)
     
     # Estatísticas para o template
-    total_artigos = Artigo.objects.filter(publicado=True).count()
+    total_artigos = listagem.count
     
     context = {
         'page_obj': page_obj,
@@ -54,6 +67,43 @@ def lista_artigos(request):
     return render(request, 'artigos/lista_artigos.html', context)
 
 
+def _artigo_etag(request, slug):
+    """
+    ETag da página do artigo, calculada antes de qualquer trabalho da view
+
+    Uma consulta pelo slug (índice único) traz id e data_atualizacao do
+    artigo e a data do último artigo no ar (índice parcial: muda quando
+    um agendado entra no ar, o que altera vizinhos e relacionados). O
+    resto são carimbos em cache: navegação, relacionados, conteúdo do
+    site (SEO, tags) e templates.
+    """
+    agora = timezone.now()
+    ultimo_publicado = Artigo.objects.filter(
+        publicado=True, data_publicacao__lte=agora
+    ).order_by('-data_publicacao').values('data_publicacao')[:1]
+    row = Artigo.objects.filter(
+        slug=slug, publicado=True, data_publicacao__lte=agora
+    ).order_by().annotate(
+        ultimo_publicado=Subquery(ultimo_publicado)
+    ).values_list('pk', 'data_atualizacao', 'ultimo_publicado').first()
+    if row is None:
+        # Sem ETag: a view responde 404
+        return None
+    pk, data_atualizacao, ultimo_publicado = row
+    parts = (
+        pk,
+        data_atualizacao.timestamp() if data_atualizacao else 0,
+        ultimo_publicado.timestamp() if ultimo_publicado else 0,
+        get_nav_version(),
+        get_related_version(),
+        get_page_version(),
+        get_template_version(),
+    )
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+# Revalidação (If-None-Match) custa uma consulta e um 304, sem renderização
+@condition(etag_func=_artigo_etag)
 def detalhe_artigo(request, slug):
     """
     View para exibição detalhada de um artigo
@@ -63,22 +113,12 @@ def detalhe_artigo(request, slug):
     
     # Buscar o artigo
     artigo = get_object_or_404(
-        Artigo,
+        Artigo.objects.prefetch_related('tags'),
         slug=slug,
         publicado=True,
         data_publicacao__lte=timezone.now()
     )
     
-    # Processar conteúdo para SEO
-    processed_content = process_article_content(artigo.conteudo)
-    
-    # Gerar sumário automático
-    table_of_contents = generate_table_of_contents(artigo.conteudo)
-    
-    # Calcular tempo de leitura
-    word_count = count_words(artigo.conteudo)
-    reading_time = calculate_reading_time(word_count)
-    
     # Meta tags SEO
     meta_description = artigo.meta_description or artigo.resumo[:160]
     meta_keywords = artigo.meta_keywords or generate_keywords_from_content(artigo)
@@ -92,19 +132,19 @@ def detalhe_artigo(request, slug):
     # Buscar artigos relacionados (por tags)
     artigos_relacionados = get_related_articles(artigo)
     
-    # Navegação entre artigos
-    artigo_anterior = get_previous_article(artigo)
-    proximo_artigo = get_next_article(artigo)
+    # Navegação entre artigos (LAG/LEAD em cache, ver artigos/navigation.py)
+    artigo_anterior, proximo_artigo = get_neighbours(artigo)
     
-    # Tags processadas
-    tags = artigo.get_tags_list()
+    # Tags do artigo (objetos Tag, com slug para os links)
+    tags = list(artigo.tags.all())
     
     context = {
         'artigo': artigo,
-        'processed_content': processed_content,
-        'table_of_contents': table_of_contents,
-        'word_count': word_count,
-        'reading_time': reading_time,
+        # Conteúdo processado em Artigo.save() (ver artigos/content.py)
+        'processed_content': artigo.conteudo_renderizado,
+        'table_of_contents': artigo.sumario_html,
+        'word_count': artigo.contagem_palavras,
+        'reading_time': artigo.tempo_leitura,
         'meta_description': meta_description,
         'meta_keywords': meta_keywords,
         'canonical_url': canonical_url,
@@ -118,85 +158,6 @@ def detalhe_artigo(request, slug):
     return render(request, 'artigos/detalhe_artigo_seo.html', context)
 
 
-def process_article_content(content):
-    """
-    Processa o conteúdo do artigo para otimização SEO
-    """
-    # Adicionar IDs aos cabeçalhos para navegação
-    content = re.sub(
-        r'<h([2-4])>(.*?)</h[2-4]>',
-        lambda m: f'<h{m.group(1)} id="heading-{hash(m.group(2)) % 10000}">{m.group(2)}</h{m.group(1)}>',
-        content
-    )
-    
-    # Adicionar loading lazy às imagens
-    content = re.sub(
-        r'<img([^>]*?)>',
-        r'<img\1 loading="lazy">',
-        content
-    )
-    
-    # Adicionar alt text se não existir (versão corrigida)
-    content = re.sub(
-        r'<img([^>]*?)(?!.*alt=)([^>]*?)>',
-        r'<img\1\2 alt="Imagem ilustrativa do artigo">',
-        content
-    )
-    
-    return content
-
-
-def generate_table_of_contents(content):
-    """
-    Gera um sumário automático baseado nos cabeçalhos do conteúdo
-    """
-    # Extrair cabeçalhos H2, H3, H4
-    headings = re.findall(r'<h([2-4]).*?>(.*?)</h[2-4]>', content, re.IGNORECASE)
-    
-    if not headings:
-        return None
-    
-    toc_html = '<ul>'
-    current_level = 2
-    
-    for level, text in headings:
-        level = int(level)
-        clean_text = strip_tags(text)
-        anchor = f"heading-{hash(clean_text) % 10000}"
-        
-        if level > current_level:
-            toc_html += '<ul>' * (level - current_level)
-        elif level < current_level:
-            toc_html += '</ul>' * (current_level - level)
-        
-        toc_html += f'<li><a href="#{anchor}">{clean_text}</a></li>'
-        current_level = level
-    
-    # Fechar tags abertas
-    toc_html += '</ul>' * (current_level - 1)
-    
-    return toc_html
-
-
-def count_words(content):
-    """
-    Conta o número de palavras no conteúdo
-    """
-    # Remove HTML tags e conta palavras
-    clean_text = strip_tags(content)
-    words = clean_text.split()
-    return len(words)
-
-
-def calculate_reading_time(word_count):
-    """
-    Calcula o tempo estimado de leitura (assumindo 200 palavras por minuto)
-    """
-    words_per_minute = 200
-    minutes = math.ceil(word_count / words_per_minute)
-    return max(1, minutes)  # Mínimo de 1 minuto
-
-
 def generate_keywords_from_content(artigo):
     """
     Gera palavras-chave automáticas a partir do conteúdo
@@ -207,8 +168,7 @@ def generate_keywords_from_content(artigo):
     # Palavras-chave baseadas nas tags e título
     keywords = []
     
-    if artigo.tags:
-        keywords.extend(artigo.get_tags_list())
+    keywords.extend(artigo.get_tags_list())
     
     # Adicionar palavras do título
     title_words = [word.lower() for word in artigo.titulo.split() if len(word) > 3]
@@ -226,35 +186,25 @@ def generate_keywords_from_content(artigo):
 
 def get_related_articles(artigo, limit=3):
     """
-    Busca artigos relacionados baseado nas tags
-    """
-    if not artigo.tags:
-        # Se não há tags, buscar artigos recentes
-        return Artigo.objects.filter(
-            publicado=True,
-            data_publicacao__lte=timezone.now()
-        ).exclude(id=artigo.id).order_by('-data_publicacao')[:limit]
+    Busca artigos relacionados
     
-    # Buscar por tags similares
-    tags = artigo.get_tags_list()
-    related = Artigo.objects.filter(
+    Lê a lista pré-calculada (tags em comum + TF-IDF, ver
+    artigos/related.py) e completa com os artigos mais recentes
+    """
+    publicados = Artigo.objects.cards().filter(
         publicado=True,
         data_publicacao__lte=timezone.now()
     ).exclude(id=artigo.id)
     
-    # Filtrar por tags
-    for tag in tags:
-        related = related.filter(tags__icontains=tag)
-    
-    related_articles = list(related[:limit])
+    related_articles = list(
+        publicados.filter(relacionado_em__artigo=artigo)
+        .order_by('relacionado_em__posicao')[:limit]
+    )
     
-    # Se não há artigos suficientes com tags similares, completar com artigos recentes
+    # Se não há artigos suficientes na lista, completar com artigos recentes
     if len(related_articles) < limit:
-        recent = Artigo.objects.filter(
-            publicado=True,
-            data_publicacao__lte=timezone.now()
-        ).exclude(
-            id__in=[art.id for art in related_articles] + [artigo.id]
+        recent = publicados.exclude(
+            id__in=[art.id for art in related_articles]
         ).order_by('-data_publicacao')[:limit - len(related_articles)]
         
         related_articles.extend(list(recent))
@@ -262,26 +212,17 @@ def get_related_articles(artigo, limit=3):
     return related_articles
 
 
-def get_previous_article(artigo):
+def get_tag_counts():
     """
-    Busca o artigo anterior (mais antigo)
+    Tags com o número de artigos publicados, em uma única consulta
     """
-    return Artigo.objects.filter(
-        publicado=True,
-        data_publicacao__lte=timezone.now(),
-        data_publicacao__lt=artigo.data_publicacao
-    ).order_by('-data_publicacao').first()
-
-
-def get_next_article(artigo):
-    """
-    Busca o próximo artigo (mais recente)
-    """
-    return Artigo.objects.filter(
-        publicado=True,
-        data_publicacao__lte=timezone.now(),
-        data_publicacao__gt=artigo.data_publicacao
-    ).order_by('data_publicacao').first()
+    publicados = Q(
+        artigos__publicado=True,
+        artigos__data_publicacao__lte=timezone.now()
+    )
+    return Tag.objects.annotate(
+        num_artigos=Count('artigos', filter=publicados)
+    ).filter(num_artigos__gt=0).order_by('-num_artigos', 'nome')
 
 
 def artigos_por_tag(request, tag):
@@ -290,24 +231,35 @@ def artigos_por_tag(request, tag):
     URL: /blog/tag/<tag>/
     """
     
-    # Busca artigos que contenham a tag
-    artigos = Artigo.objects.filter(
-        publicado=True,
-        data_publicacao__lte=timezone.now(),
-        tags__icontains=tag
-    ).order_by('-data_publicacao')
+    # URLs antigas usavam o nome da tag ("/blog/tag/avaliação/")
+    tag_obj = Tag.objects.filter(slug=tag).first()
+    if tag_obj is None:
+        tag_obj = get_object_or_404(Tag, slug=slugify(tag))
+        return redirect(tag_obj, permanent=True)
+    
+    # Artigos da tag: percorre o índice dos publicados já na ordem da data
+    # e confere a tag pela chave única (artigo, tag) da tabela M2M; um join
+    # partindo da tag obrigaria a ordenar o resultado inteiro
+    da_tag = Artigo.tags.through.objects.filter(artigo=OuterRef('pk'), tag=tag_obj)
+    artigos = Artigo.objects.cards().filter(Exists(da_tag), publicado=True)
     
-    # Paginação
-    paginator = Paginator(artigos, 6)
+    # SEO e tags de todos os artigos da página em uma consulta cada
+    artigos = prefetch_seo(artigos).prefetch_related('tags')
+    
+    # Paginação por chave; o paginator aplica a data de publicação
+    # (ver artigos/pagination.py)
+    paginator = KeysetPaginator(artigos, 6, name=f'tag:{tag_obj.pk}')
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     context = {
         'page_obj': page_obj,
         'artigos': page_obj.object_list,
-        'tag': tag,
-        'titulo_pagina': f'Artigos sobre {tag} - Blog Prisma Avaliações',
-        'meta_description': f'Artigos sobre {tag} no blog da Prisma Avaliações Imobiliárias.',
+        'tag': tag_obj.nome,
+        'tag_obj': tag_obj,
+        'tags_populares': get_tag_counts(),
+        'titulo_pagina': f'Artigos sobre {tag_obj.nome} - Blog Prisma Avaliações',
+        'meta_description': f'Artigos sobre {tag_obj.nome} no blog da Prisma Avaliações Imobiliárias.',
     }
     
     return render(request, 'artigos/lista_artigos.html', context)
@@ -323,14 +275,13 @@ def buscar_artigos(request):
     artigos = []
     
     if busca and len(busca) >= 3:
-        artigos = Artigo.objects.filter(
+        artigos = Artigo.objects.cards().filter(
             publicado=True,
             data_publicacao__lte=timezone.now()
-        ).filter(
-            Q(titulo__icontains=busca) |
-            Q(resumo__icontains=busca) |
-            Q(tags__icontains=busca)
-        ).order_by('-data_publicacao')[:10]
+        ).order_by('-data_publicacao')
+        campos = ('titulo', 'resumo', 'tags__nome')
+        artigos = cached_search(artigos, busca, fields=campos)
+        artigos = attach_snippets(artigos[:10], busca, fields=campos)
     
     context = {
         'artigos': artigos,
@@ -339,3 +290,27 @@ def buscar_artigos(request):
     }
     
     return render(request, 'artigos/buscar_artigos.html', context)
+
+
+def sugestoes_busca(request):
+    """
+    Sugestões da busca enquanto o usuário digita (JSON)
+    URL: /blog/buscar/sugestoes/?q=
+
+    Respondidas do índice de prefixos em memória (artigos/typeahead.py),
+    sem consulta ao banco quando o índice está em dia.
+    """
+    busca = request.GET.get('q', '').strip()[:100]
+    return JsonResponse({'q': busca, **suggest(busca)})
+
+
+def estatisticas_busca(request):
+    """
+    Estatísticas do cache de resultados da busca (JSON, só equipe)
+    URL: /blog/buscar/estatisticas/
+
+    O cache é por processo: os números são do worker que respondeu.
+    """
+    if not request.user.is_staff:
+        return HttpResponse('Unauthorized', status=401)
+    return JsonResponse({'pid': os.getpid(), **result_cache.stats()})
@@ -66,6 +66,11 @@ fi
 echo "9. EXECUTANDO MIGRAÇÕES:"
 python manage.py makemigrations
 python manage.py migrate
+python manage.py createcachetable
+# Conteúdo renderizado dos artigos (vazio até aqui depois da migração 0005)
+python manage.py processar_artigos
+# Artigos relacionados (tabela vazia até aqui depois da migração que a cria)
+python manage.py calcular_relacionados
 
 echo "10. COLETANDO ARQUIVOS ESTÁTICOS:"
 python manage.py collectstatic --noinput
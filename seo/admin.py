@@ -6,7 +6,7 @@ from django.contrib.contenttypes.admin import GenericTabularInline
 from django.utils.safestring import mark_safe
 from django.urls import reverse
 from django.utils.html import format_html
-from .models import SEOMeta, SEOConfig
+from .models import SEOMeta, SEOConfig, IndexNowURL, SitemapPing
 
 
 class SEOMetaInline(GenericTabularInline):
@@ -160,7 +160,8 @@ class SEOConfigAdmin(admin.ModelAdmin):
                 'google_tag_manager_id', 
                 'google_search_console_id', 
                 'bing_webmaster_id', 
-                'facebook_pixel_id'
+                'facebook_pixel_id',
+                'indexnow_key'
             ),
             'classes': ('collapse', 'wide')
         }),
@@ -203,6 +204,33 @@ class SEOConfigAdmin(admin.ModelAdmin):
         return super().changelist_view(request, extra_context)
 
 
+@admin.register(IndexNowURL)
+class IndexNowURLAdmin(admin.ModelAdmin):
+    """
+    Admin para acompanhar a fila de envio IndexNow
+    """
+    list_display = ['url', 'attempts', 'last_error', 'updated_at']
+    search_fields = ['url']
+    readonly_fields = ['url', 'attempts', 'last_error', 'created_at', 'updated_at']
+    
+    def has_add_permission(self, request):
+        """URLs entram na fila automaticamente ao salvar artigos"""
+        return False
+
+
+@admin.register(SitemapPing)
+class SitemapPingAdmin(admin.ModelAdmin):
+    """
+    Admin para acompanhar os pings do sitemap pendentes
+    """
+    list_display = ['sitemap_url', 'attempts', 'last_error', 'created_at']
+    readonly_fields = ['sitemap_url', 'attempts', 'last_error', 'created_at', 'updated_at']
+    
+    def has_add_permission(self, request):
+        """Pings entram na fila ao publicar artigos ou pelo ping manual"""
+        return False
+
+
 # Registrar o inline para uso em outros apps
 # Exemplo de uso em outros admins:
 # 
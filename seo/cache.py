@@ -0,0 +1,131 @@
+"""
+Cache da configuração SEO e do fragmento <head> renderizado
+
+A configuração global (SEOConfig) é lida em praticamente todo template.
+Cada worker guarda uma cópia em memória, validada por um carimbo de versão
+no cache compartilhado. Salvar ou excluir a configuração troca o carimbo
+(ver seo/signals.py) e todos os workers recarregam na próxima leitura.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils.http import urlencode
+
+from Prisma_avaliacoes.middleware import get_template_version
+
+
+CONFIG_VERSION_KEY = 'seo:config:version'
+
+# Intervalo (segundos) em que o carimbo lido do cache compartilhado é
+# reaproveitado no worker. Uma página chama várias tags de SEO; sem isso
+# cada uma faria uma ida ao cache só para conferir a versão.
+CONFIG_VERSION_CHECK_INTERVAL = 1.0
+
+# (versão, configuração) - tupla única para troca atômica entre threads
+_local_config = (None, None)
+
+# (versão, momento da leitura)
+_local_version = (None, 0.0)
+
+
+def get_config_version():
+    """Retorna o carimbo de versão atual da configuração SEO"""
+    global _local_version
+    version, checked_at = _local_version
+    now = time.monotonic()
+    if version is not None and now - checked_at < CONFIG_VERSION_CHECK_INTERVAL:
+        return version
+
+    version = cache.get(CONFIG_VERSION_KEY)
+    if version is None:
+        # add() não sobrescreve um carimbo criado por outro worker
+        cache.add(CONFIG_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CONFIG_VERSION_KEY)
+    _local_version = (version, now)
+    return version
+
+
+def bump_config_version():
+    """Invalida a configuração SEO em todos os workers"""
+    global _local_config, _local_version
+    version = time.time_ns()
+    cache.set(CONFIG_VERSION_KEY, version, None)
+    _local_config = (None, None)
+    _local_version = (version, time.monotonic())
+    return version
+
+
+def get_cached_config():
+    """
+    Retorna a configuração SEO mantida em memória no worker
+
+    Só consulta o banco quando o carimbo de versão mudou.
+    """
+    global _local_config
+    from .models import SEOConfig
+
+    version = get_config_version()
+    cached_version, config = _local_config
+    # Sem carimbo (ex.: DummyCache) não há como validar a cópia local
+    if config is not None and version is not None and cached_version == version:
+        return config
+
+    config = SEOConfig.get_config()
+    _local_config = (version, config)
+    return config
+
+
+# Fragmento <head> renderizado por {% render_seo %}
+SEO_HEAD_TIMEOUT = 60 * 60 * 24
+
+# Parâmetros que mudam o conteúdo da página e ficam no canonical; os
+# demais (utm_*, fbclid, ...) são descartados
+CANONICAL_QUERY_PARAMS = ('page',)
+
+
+def canonical_url(request):
+    """
+    URL canônica padrão da requisição: esquema, host e caminho, mais só
+    os parâmetros de CANONICAL_QUERY_PARAMS (ex.: ?page=2)
+    """
+    params = [
+        (name, request.GET[name]) for name in CANONICAL_QUERY_PARAMS
+        if request.GET.get(name)
+    ]
+    path = request.path
+    if params:
+        path += '?' + urlencode(params)
+    return request.build_absolute_uri(path)
+
+
+def seo_head_cache_key(request, obj=None, seo_meta=None):
+    """
+    Chave do fragmento de meta tags
+
+    Combina tipo de conteúdo, pk, datas de atualização do objeto e do
+    SEO Meta, a versão da configuração e a dos templates (um deploy que
+    muda o template das meta tags não serve o fragmento antigo). Qualquer
+    alteração gera uma chave nova, então não é preciso apagar entradas
+    antigas (elas expiram).
+    A URL canônica entra na chave porque o canonical padrão é ela; outros
+    parâmetros da query string não criam entradas novas.
+    """
+    from django.contrib.contenttypes.models import ContentType
+
+    if obj is not None and obj.pk is not None:
+        content_type = ContentType.objects.get_for_model(obj)
+        obj_updated = getattr(obj, 'data_atualizacao', None) or getattr(obj, 'updated_at', None)
+        parts = [
+            content_type.pk,
+            obj.pk,
+            obj_updated.timestamp() if obj_updated else '',
+            seo_meta.updated_at.timestamp() if seo_meta else '',
+        ]
+    else:
+        parts = ['-', '-', '', '']
+
+    parts.append(get_config_version())
+    parts.append(get_template_version())
+    parts.append(hashlib.md5(canonical_url(request).encode()).hexdigest())
+    return 'seo:head:' + ':'.join(str(part) for part in parts)
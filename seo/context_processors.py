@@ -1,6 +1,8 @@
 """
 Context processors para SEO
 """
+from django.utils.functional import SimpleLazyObject, lazy
+
 from .models import SEOConfig
 
 
@@ -11,13 +13,19 @@ def seo_context(request):
     Adiciona:
     - SITE_NAME
     - SITE_DOMAIN  
+    - SITE_URL
     - seo_config (configuração completa)
+    
+    Os valores são preguiçosos: a configuração só é carregada quando um
+    template lê algum deles, e é reaproveitada no resto da requisição.
+    Páginas que não usam SEO (admin, área do cliente, redirects) não
+    consultam o banco.
     """
-    config = SEOConfig.get_config()
+    config = SimpleLazyObject(SEOConfig.get_cached)
     
     return {
-        'SITE_NAME': config.site_name,
-        'SITE_DOMAIN': config.site_domain,
-        'SITE_URL': config.get_full_domain(),
+        'SITE_NAME': lazy(lambda: config.site_name, str)(),
+        'SITE_DOMAIN': lazy(lambda: config.site_domain, str)(),
+        'SITE_URL': lazy(lambda: config.get_full_domain(), str)(),
         'seo_config': config,
     }
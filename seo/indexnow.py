@@ -0,0 +1,124 @@
+"""
+Envio de URLs alteradas via IndexNow
+
+Artigos criados, alterados, despublicados ou excluídos têm a URL colocada
+na fila (IndexNowURL, sem duplicatas). flush_indexnow_queue() envia a fila
+em lotes com um POST por lote; URLs enviadas saem da fila e as que falharam
+ficam registradas para a próxima execução.
+
+Execução periódica (cron): python manage.py flush_indexnow
+"""
+import json
+import urllib.error
+import urllib.request
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import SEOConfig, IndexNowURL
+
+
+DEFAULT_INDEXNOW_ENDPOINT = 'https://api.indexnow.org/indexnow'
+
+# O protocolo aceita até 10.000 URLs por POST
+INDEXNOW_BATCH_SIZE = 1000
+INDEXNOW_TIMEOUT = 30
+INDEXNOW_MAX_ATTEMPTS = 10
+
+
+def get_indexnow_endpoint():
+    """Endpoint IndexNow (settings.SEO_INDEXNOW_ENDPOINT sobrescreve o padrão)"""
+    return getattr(settings, 'SEO_INDEXNOW_ENDPOINT', DEFAULT_INDEXNOW_ENDPOINT)
+
+
+def indexnow_enabled():
+    """IndexNow fica ativo quando há chave na configuração SEO"""
+    try:
+        return bool(SEOConfig.get_cached().indexnow_key)
+    except Exception:
+        return False
+
+
+def enqueue_urls(urls):
+    """Coloca URLs na fila (URLs já na fila voltam a zero tentativas)"""
+    for url in dict.fromkeys(urls):
+        IndexNowURL.objects.update_or_create(
+            url=url,
+            defaults={'attempts': 0, 'last_error': ''},
+        )
+
+
+def submit_batch(urls, config, endpoint=None, timeout=INDEXNOW_TIMEOUT):
+    """
+    Envia um lote de URLs em um único POST
+
+    Retorna (sucesso, mensagem). 200 e 202 são sucesso.
+    """
+    host = urlsplit(config.get_full_domain()).netloc
+    payload = {
+        'host': host,
+        'key': config.indexnow_key,
+        'keyLocation': f'{config.get_full_domain()}/{config.indexnow_key}.txt',
+        'urlList': list(urls),
+    }
+    request = urllib.request.Request(
+        endpoint or get_indexnow_endpoint(),
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json; charset=utf-8'},
+        method='POST',
+    )
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            if response.getcode() in (200, 202):
+                return True, f'{len(payload["urlList"])} URL(s) enviada(s)'
+            return False, f'Resposta inesperada: {response.getcode()}'
+    except urllib.error.HTTPError as e:
+        return False, f'Erro HTTP: {e.code} - {e.reason}'
+    except urllib.error.URLError as e:
+        return False, f'Erro de URL: {e.reason}'
+    except Exception as e:
+        return False, f'Erro inesperado: {str(e)}'
+
+
+def flush_indexnow_queue(batch_size=INDEXNOW_BATCH_SIZE, max_attempts=INDEXNOW_MAX_ATTEMPTS,
+                         endpoint=None):
+    """
+    Envia a fila em lotes
+
+    Retorna {'sent', 'failed', 'batches'}. URLs com max_attempts falhas
+    ficam na fila (visíveis no admin) mas não são mais enviadas.
+    """
+    stats = {'sent': 0, 'failed': 0, 'batches': 0}
+    config = SEOConfig.get_cached()
+    if not config.indexnow_key:
+        return stats
+
+    started = timezone.now()
+    pending = IndexNowURL.objects.filter(attempts__lt=max_attempts).order_by('pk')
+    last_pk = 0
+
+    while True:
+        batch = list(pending.filter(pk__gt=last_pk).values_list('pk', 'url')[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1][0]
+        pks = [pk for pk, _ in batch]
+        stats['batches'] += 1
+
+        success, message = submit_batch([url for _, url in batch], config, endpoint)
+        if success:
+            # URLs enfileiradas de novo durante o envio continuam na fila
+            IndexNowURL.objects.filter(pk__in=pks, updated_at__lte=started).delete()
+            stats['sent'] += len(batch)
+        else:
+            IndexNowURL.objects.filter(pk__in=pks).update(
+                attempts=F('attempts') + 1,
+                last_error=message,
+                updated_at=timezone.now(),
+            )
+            stats['failed'] += len(batch)
+
+    return stats
@@ -0,0 +1,97 @@
+"""
+Benchmark do sitemap: lista de modelos (ArtigosSitemap) x streaming paginado
+"""
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from artigos.models import Artigo
+from seo.models import SEOConfig
+from seo.sitemaps import (
+    ArtigosSitemap, sitemap_sections, iter_sitemap_index, iter_sitemap_page,
+)
+
+
+class Command(BaseCommand):
+    help = 'Mede tempo e memória do sitemap com artigos gerados (revertidos no final)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--artigos',
+            type=int,
+            default=50000,
+            help='Quantidade de artigos gerados para o teste (padrão: 50000)',
+        )
+
+    def handle(self, *args, **options):
+        total = options['artigos']
+
+        self.stdout.write(self.style.SUCCESS(f'⏱️ Benchmark do sitemap com {total} artigos'))
+
+        with transaction.atomic():
+            self.gerar_artigos(total)
+
+            resultados = [
+                ('ArtigosSitemap.items()', self.medir(self.sitemap_antigo)),
+                ('Index + páginas (streaming)', self.medir(self.sitemap_streaming)),
+            ]
+
+            # Nada do que foi gerado fica no banco
+            transaction.set_rollback(True)
+
+        self.stdout.write('')
+        for nome, (urls, segundos, pico) in resultados:
+            self.stdout.write(
+                f'   {nome:<30} {urls:>7} URLs  {segundos:8.2f} s  pico {pico / 1024 / 1024:8.2f} MB'
+            )
+
+    def gerar_artigos(self, total):
+        agora = timezone.now()
+        lote = []
+        for i in range(total):
+            lote.append(Artigo(
+                titulo=f'Artigo de benchmark {i}',
+                slug=f'benchmark-sitemap-{i}',
+                autor='Benchmark',
+                resumo='Resumo do artigo de benchmark',
+                conteudo='<p>Conteúdo</p>' * 200,
+                publicado=True,
+                data_publicacao=agora,
+            ))
+            if len(lote) == 2000:
+                Artigo.objects.bulk_create(lote)
+                lote = []
+        if lote:
+            Artigo.objects.bulk_create(lote)
+
+    def medir(self, funcao):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        urls = funcao()
+        segundos = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return urls, segundos, pico
+
+    def sitemap_antigo(self):
+        sitemap = ArtigosSitemap()
+        items = sitemap.items()
+        for item in items:
+            sitemap.location(item)
+            sitemap.lastmod(item)
+        return len(items)
+
+    def sitemap_streaming(self):
+        config = SEOConfig.get_cached()
+        base_url = config.get_full_domain()
+        urls = 0
+        for _ in iter_sitemap_index(base_url):
+            pass
+        for name, section in sitemap_sections.items():
+            for page, _ in section.pages():
+                for chunk in iter_sitemap_page(name, page, base_url, config):
+                    urls += chunk.startswith('<url>')
+        return urls
@@ -0,0 +1,60 @@
+"""
+Micro-benchmark dos snippets de rastreamento (antes x depois do registro)
+"""
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from seo.models import SEOConfig
+from seo.snippets import SNIPPETS, get_snippet, render_snippets
+
+
+class Command(BaseCommand):
+    help = 'Compara o custo por renderização dos snippets de rastreamento'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iteracoes',
+            type=int,
+            default=2000,
+            help='Número de renderizações simuladas (padrão: 2000)',
+        )
+
+    def handle(self, *args, **options):
+        iteracoes = options['iteracoes']
+        nomes = list(SNIPPETS)
+
+        self.stdout.write(self.style.SUCCESS('⏱️ Benchmark dos snippets de rastreamento'))
+        self.stdout.write(f'   Snippets por renderização: {len(nomes)}')
+        self.stdout.write(f'   Iterações: {iteracoes}')
+
+        def antes():
+            # Comportamento anterior: cada tag buscava a configuração no
+            # banco e montava o HTML com f-strings
+            for nome in nomes:
+                config = SEOConfig.get_config()
+                SNIPPETS[nome](config)
+
+        def sem_banco():
+            # Apenas a montagem do HTML, com a configuração já em memória
+            render_snippets(config)
+
+        def depois():
+            for nome in nomes:
+                get_snippet(nome)
+
+        config = SEOConfig.get_cached()
+        get_snippet(nomes[0])  # Aquecer o registro
+
+        resultados = [
+            ('Antes (consulta + f-strings)', timeit.timeit(antes, number=iteracoes)),
+            ('Só f-strings (config em memória)', timeit.timeit(sem_banco, number=iteracoes)),
+            ('Depois (registro por versão)', timeit.timeit(depois, number=iteracoes)),
+        ]
+
+        base = resultados[0][1]
+        self.stdout.write('')
+        for nome, total in resultados:
+            por_render = total / iteracoes * 1_000_000
+            ganho = base / total if total else float('inf')
+            self.stdout.write(f'   {nome:<34} {por_render:10.1f} µs/render   {ganho:8.1f}x')
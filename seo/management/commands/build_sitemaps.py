@@ -0,0 +1,51 @@
+"""
+Management command para gerar os sitemaps estáticos em disco
+"""
+from django.core.management.base import BaseCommand
+
+from seo.indexnow import indexnow_enabled, enqueue_urls
+from seo.models import SEOConfig
+from seo.static_sitemaps import get_sitemap_root, scheduled_since_last_build, write_all_sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Gera sitemap.xml e as páginas do sitemap em disco para o Nginx servir'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--agendados',
+            action='store_true',
+            help='Só regera se algum artigo agendado foi publicado desde a última geração (cron)',
+        )
+
+    def handle(self, *args, **options):
+        agendados = []
+        if options['agendados']:
+            agendados = scheduled_since_last_build()
+            if not agendados:
+                self.stdout.write('Nenhum artigo agendado publicado desde a última geração')
+                return
+
+        self.stdout.write(f'Gerando sitemaps em: {get_sitemap_root()}')
+
+        written = write_all_sitemaps()
+
+        for path in written:
+            self.stdout.write(f'   ✅ {path.name}')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {len(written)} arquivo(s) gerado(s)'))
+
+        # Agendados não passam por nenhum save na hora em que entram no ar:
+        # o post_save do artigo não os colocou na fila IndexNow
+        if agendados and indexnow_enabled():
+            base_url = SEOConfig.get_cached().get_full_domain()
+            enqueue_urls([base_url + artigo.get_absolute_url() for artigo in agendados])
+            self.stdout.write(f'   📨 {len(agendados)} artigo(s) agendado(s) na fila IndexNow')
+        self.stdout.write(
+            'Salvar ou publicar um artigo regrava apenas a página correspondente.'
+        )
+
+
+# Uso do comando:
+# python manage.py build_sitemaps
+# python manage.py build_sitemaps --agendados  # cron, ver config/crontab
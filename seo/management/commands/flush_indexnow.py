@@ -0,0 +1,50 @@
+"""
+Management command para enviar a fila IndexNow em lotes
+"""
+from django.core.management.base import BaseCommand
+
+from seo.indexnow import (
+    flush_indexnow_queue, indexnow_enabled, INDEXNOW_BATCH_SIZE, INDEXNOW_MAX_ATTEMPTS,
+)
+from seo.models import IndexNowURL
+
+
+class Command(BaseCommand):
+    help = 'Envia as URLs da fila IndexNow em lotes'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=INDEXNOW_BATCH_SIZE,
+            help=f'URLs por POST (padrão: {INDEXNOW_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=INDEXNOW_MAX_ATTEMPTS,
+            help=f'Ignorar URLs que já falharam esse número de vezes (padrão: {INDEXNOW_MAX_ATTEMPTS})',
+        )
+    
+    def handle(self, *args, **options):
+        if not indexnow_enabled():
+            self.stdout.write('IndexNow desativado (configure a chave em Configurações SEO)')
+            return
+        
+        self.stdout.write(f'URLs na fila: {IndexNowURL.objects.count()}')
+        
+        stats = flush_indexnow_queue(
+            batch_size=options['batch_size'],
+            max_attempts=options['max_attempts'],
+        )
+        
+        if stats['sent']:
+            self.stdout.write(self.style.SUCCESS(f'✓ {stats["sent"]} URL(s) enviada(s)'))
+        if stats['failed']:
+            self.stdout.write(self.style.ERROR(f'✗ {stats["failed"]} URL(s) falharam e ficam para nova tentativa'))
+        self.stdout.write(f'Lotes enviados: {stats["batches"]}')
+
+
+# Uso do comando (cron a cada 10 minutos, por exemplo):
+# */10 * * * * cd /var/www/Prisma_Avaliacoes && venv/bin/python manage.py flush_indexnow
+# python manage.py flush_indexnow --batch-size=500
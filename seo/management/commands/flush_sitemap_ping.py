@@ -0,0 +1,45 @@
+"""
+Management command para enviar os pings do sitemap pendentes
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from seo.models import SitemapPing
+from seo.ping import flush_pending_pings, PING_DEBOUNCE, PING_MAX_ATTEMPTS
+
+
+class Command(BaseCommand):
+    help = 'Envia os pings do sitemap pendentes há mais que a janela de debounce'
+
+    def add_arguments(self, parser):
+        debounce = getattr(settings, 'SEO_PING_DEBOUNCE', PING_DEBOUNCE)
+        parser.add_argument(
+            '--debounce',
+            type=float,
+            default=debounce,
+            help=f'Só envia pedidos com mais de N segundos (padrão: {debounce}; 0 envia todos)',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=PING_MAX_ATTEMPTS,
+            help=f'Ignorar pings que já falharam esse número de vezes (padrão: {PING_MAX_ATTEMPTS})',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Pings pendentes: {SitemapPing.objects.count()}')
+
+        stats = flush_pending_pings(
+            debounce=options['debounce'],
+            max_attempts=options['max_attempts'],
+        )
+
+        if stats['sent']:
+            self.stdout.write(self.style.SUCCESS(f'✓ {stats["sent"]} ping(s) enviado(s)'))
+        if stats['failed']:
+            self.stdout.write(self.style.ERROR(f'✗ {stats["failed"]} ping(s) falharam e ficam para nova tentativa'))
+
+
+# Uso do comando (cron a cada 5 minutos, por exemplo):
+# */5 * * * * cd /var/www/Prisma_Avaliacoes && venv/bin/python manage.py flush_sitemap_ping
+# python manage.py flush_sitemap_ping --debounce=0
@@ -2,10 +2,8 @@
 Management command para fazer ping do sitemap nos mecanismos de busca
 """
 from django.core.management.base import BaseCommand
-from django.conf import settings
-import urllib.request
-import urllib.parse
 from seo.models import SEOConfig
+from seo.ping import ping_all, PING_TIMEOUT, PING_RETRIES
 
 
 class Command(BaseCommand):
@@ -27,6 +25,18 @@ class Command(BaseCommand):
             action='store_true',
             help='Fazer ping apenas no Bing',
         )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=PING_TIMEOUT,
+            help=f'Timeout por tentativa em segundos (padrão: {PING_TIMEOUT})',
+        )
+        parser.add_argument(
+            '--retries',
+            type=int,
+            default=PING_RETRIES,
+            help=f'Novas tentativas em erros temporários (padrão: {PING_RETRIES})',
+        )
     
     def handle(self, *args, **options):
         config = SEOConfig.get_config()
@@ -39,17 +49,19 @@ class Command(BaseCommand):
         
         self.stdout.write(f'Fazendo ping do sitemap: {sitemap_url}')
         
-        results = []
-        
-        # Google
-        if not options['bing_only']:
-            google_result = self.ping_google(sitemap_url)
-            results.append(('Google', google_result))
+        engines = None
+        if options['google_only']:
+            engines = ['Google']
+        elif options['bing_only']:
+            engines = ['Bing']
         
-        # Bing
-        if not options['google_only']:
-            bing_result = self.ping_bing(sitemap_url)
-            results.append(('Bing', bing_result))
+        # Pings em paralelo, com timeout e novas tentativas por endpoint
+        results = ping_all(
+            sitemap_url,
+            engines=engines,
+            timeout=options['timeout'],
+            retries=options['retries'],
+        )
         
         # Resultados
         self.stdout.write('\n' + '='*50)
@@ -59,82 +71,14 @@ class Command(BaseCommand):
         for engine, result in results:
             if result['success']:
                 self.stdout.write(
-                    self.style.SUCCESS(f'✓ {engine}: {result["message"]}')
+                    self.style.SUCCESS(f'✓ {engine}: {result["message"]} ({result["attempts"]} tentativa(s))')
                 )
             else:
                 self.stdout.write(
-                    self.style.ERROR(f'✗ {engine}: {result["message"]}')
+                    self.style.ERROR(f'✗ {engine}: {result["message"]} ({result["attempts"]} tentativa(s))')
                 )
         
         self.stdout.write('\n' + '='*50)
-    
-    def ping_google(self, sitemap_url):
-        """Faz ping no Google"""
-        try:
-            encoded_url = urllib.parse.quote(sitemap_url, safe='')
-            ping_url = f'https://www.google.com/ping?sitemap={encoded_url}'
-            
-            with urllib.request.urlopen(ping_url, timeout=30) as response:
-                if response.getcode() == 200:
-                    return {
-                        'success': True,
-                        'message': 'Ping enviado com sucesso!'
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'message': f'Resposta inesperada: {response.getcode()}'
-                    }
-        
-        except urllib.error.HTTPError as e:
-            return {
-                'success': False,
-                'message': f'Erro HTTP: {e.code} - {e.reason}'
-            }
-        except urllib.error.URLError as e:
-            return {
-                'success': False,
-                'message': f'Erro de URL: {e.reason}'
-            }
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Erro inesperado: {str(e)}'
-            }
-    
-    def ping_bing(self, sitemap_url):
-        """Faz ping no Bing"""
-        try:
-            encoded_url = urllib.parse.quote(sitemap_url, safe='')
-            ping_url = f'https://www.bing.com/ping?sitemap={encoded_url}'
-            
-            with urllib.request.urlopen(ping_url, timeout=30) as response:
-                if response.getcode() == 200:
-                    return {
-                        'success': True,
-                        'message': 'Ping enviado com sucesso!'
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'message': f'Resposta inesperada: {response.getcode()}'
-                    }
-        
-        except urllib.error.HTTPError as e:
-            return {
-                'success': False,
-                'message': f'Erro HTTP: {e.code} - {e.reason}'
-            }
-        except urllib.error.URLError as e:
-            return {
-                'success': False,
-                'message': f'Erro de URL: {e.reason}'
-            }
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Erro inesperado: {str(e)}'
-            }
 
 
 # Uso do comando:
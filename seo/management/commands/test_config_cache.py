@@ -0,0 +1,64 @@
+"""
+Comando para verificar a invalidação da configuração SEO em cache
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import TestCase
+
+from seo.cache import bump_config_version, get_config_version, get_cached_config
+from seo.models import SEOConfig
+
+
+class Command(BaseCommand):
+    help = 'Verifica que o carimbo da configuração SEO só muda depois do commit'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('🔍 Testando o cache da configuração SEO'))
+        self.errors = 0
+
+        # Tudo é revertido no final
+        with transaction.atomic():
+            config = get_cached_config()
+            antes = get_config_version()
+
+            with TestCase.captureOnCommitCallbacks(execute=False) as callbacks:
+                config.site_name = f'{config.site_name} (teste)'
+                config.save()
+                self.verificar(
+                    get_config_version() == antes,
+                    'Carimbo não muda antes do commit'
+                )
+            self.verificar(bool(callbacks), f'Invalidação agendada para o commit ({len(callbacks)} callback(s))')
+
+            for callback in callbacks:
+                callback()
+            self.verificar(get_config_version() != antes, 'Carimbo muda depois do commit')
+            self.verificar(
+                get_cached_config().site_name == config.site_name,
+                'Configuração recarregada com o carimbo novo'
+            )
+
+            antes = get_config_version()
+            with TestCase.captureOnCommitCallbacks(execute=True):
+                SEOConfig.objects.get(pk=config.pk).delete()
+                self.verificar(get_config_version() == antes, 'Excluir não troca o carimbo antes do commit')
+            self.verificar(get_config_version() != antes, 'Excluir troca o carimbo no commit')
+            transaction.set_rollback(True)
+
+        # A configuração de teste foi revertida: descartar a cópia dela
+        bump_config_version()
+
+        if self.errors:
+            raise CommandError(f'{self.errors} verificação(ões) falharam')
+        self.stdout.write(self.style.SUCCESS('✅ Cache da configuração SEO invalidado depois do commit'))
+
+    def verificar(self, ok, mensagem):
+        if ok:
+            self.stdout.write(f'   ✅ {mensagem}')
+        else:
+            self.errors += 1
+            self.stdout.write(f'   ❌ {mensagem}')
+
+
+# Uso do comando:
+# python manage.py test_config_cache
@@ -0,0 +1,135 @@
+"""
+Comando para testar a fila IndexNow contra um servidor HTTP local
+"""
+import json
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from artigos.models import Artigo
+
+from seo.cache import bump_config_version
+from seo.indexnow import enqueue_urls, flush_indexnow_queue
+from seo.models import IndexNowURL, SEOConfig
+from seo.static_sitemaps import get_sitemap_root, write_all_sitemaps
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Simula o endpoint IndexNow: guarda os POSTs e responde server.status"""
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.server.posts.append(json.loads(self.rfile.read(length)))
+        self.send_response(self.server.status)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Testa deduplicação, envio em lotes e novas tentativas da fila IndexNow'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('🔍 Testando fila IndexNow (servidor local)'))
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        server.posts = []
+        server.status = 200
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        endpoint = f'http://127.0.0.1:{server.server_address[1]}/indexnow'
+
+        self.errors = 0
+        try:
+            # Tudo é revertido no final; a fila real não é alterada
+            with transaction.atomic():
+                self.testar(server, endpoint)
+                transaction.set_rollback(True)
+        finally:
+            # A configuração em memória ainda tem a chave de teste
+            bump_config_version()
+            server.shutdown()
+            server.server_close()
+
+        if self.errors:
+            raise CommandError(f'{self.errors} verificação(ões) falharam')
+        self.stdout.write(self.style.SUCCESS('✅ Fila IndexNow funcionando corretamente!'))
+
+    def verificar(self, ok, mensagem):
+        if ok:
+            self.stdout.write(f'   ✅ {mensagem}')
+        else:
+            self.errors += 1
+            self.stdout.write(f'   ❌ {mensagem}')
+
+    def testar(self, server, endpoint):
+        config = SEOConfig.get_config()
+        config.indexnow_key = 'chave-de-teste-123'
+        config.save()
+        base = config.get_full_domain()
+
+        IndexNowURL.objects.all().delete()
+        urls = [f'{base}/blog/artigo-{i}/' for i in range(25)]
+        enqueue_urls(urls + urls[:10])
+        self.verificar(IndexNowURL.objects.count() == 25, '35 pedidos com repetição viraram 25 URLs na fila')
+
+        # Falha: nada sai da fila, tentativas e erro registrados
+        server.status = 503
+        stats = flush_indexnow_queue(batch_size=10, endpoint=endpoint)
+        self.verificar(
+            stats['failed'] == 25 and IndexNowURL.objects.filter(attempts=1).count() == 25,
+            'Falha mantém as 25 URLs na fila com 1 tentativa'
+        )
+        self.verificar(
+            IndexNowURL.objects.exclude(last_error='').count() == 25,
+            'Erro registrado em cada URL'
+        )
+
+        # Sucesso: 3 POSTs (10 + 10 + 5) e fila vazia
+        server.posts.clear()
+        server.status = 202
+        stats = flush_indexnow_queue(batch_size=10, endpoint=endpoint)
+        tamanhos = [len(post['urlList']) for post in server.posts]
+        self.verificar(tamanhos == [10, 10, 5], f'Envio em lotes: {tamanhos}')
+        self.verificar(not IndexNowURL.objects.exists(), 'Fila vazia após envio com sucesso')
+        self.verificar(
+            all(post['key'] == config.indexnow_key and post['keyLocation'].endswith('.txt') for post in server.posts),
+            'Payload com key e keyLocation'
+        )
+
+        self.testar_agendado(base)
+
+    def testar_agendado(self, base):
+        """Artigo agendado só entra na fila quando o cron o vê no ar"""
+        IndexNowURL.objects.all().delete()
+        agora = timezone.now()
+
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            artigo = Artigo.objects.create(
+                titulo='Artigo agendado IndexNow', autor='Teste', resumo='Resumo',
+                conteudo='Conteúdo', publicado=True,
+                data_publicacao=agora + timedelta(hours=1),
+            )
+        url = base + artigo.get_absolute_url()
+        self.verificar(not IndexNowURL.objects.filter(url=url).exists(), 'Agendado fora da fila antes da data')
+
+        with tempfile.TemporaryDirectory() as root, override_settings(SEO_SITEMAP_ROOT=root):
+            write_all_sitemaps()
+            index = get_sitemap_root() / 'sitemap.xml'
+            gerado = (agora - timedelta(hours=1)).timestamp()
+            os.utime(index, (gerado, gerado))
+
+            # Chegou a data de publicação (sem nenhum save)
+            Artigo.objects.filter(pk=artigo.pk).update(data_publicacao=agora - timedelta(minutes=1))
+            call_command('build_sitemaps', agendados=True, stdout=StringIO())
+
+        self.verificar(IndexNowURL.objects.filter(url=url).exists(), 'build_sitemaps --agendados coloca o agendado na fila')
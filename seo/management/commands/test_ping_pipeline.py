@@ -0,0 +1,164 @@
+"""
+Comando para testar o ping do sitemap contra um servidor HTTP local
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+
+from seo import ping
+from seo.models import SitemapPing
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Simula um mecanismo de busca
+
+    /lento  -> responde 200 depois de server.delay segundos
+    /falha  -> 503 nas primeiras server.failures chamadas, depois 200
+    /recusa -> sempre 400 (não deve ser repetido)
+    """
+
+    def do_GET(self):
+        server = self.server
+        path = self.path.split('?')[0]
+        with server.lock:
+            server.hits[path] = server.hits.get(path, 0) + 1
+            hits = server.hits[path]
+
+        if path == '/lento':
+            time.sleep(server.delay)
+            status = 200
+        elif path == '/falha':
+            status = 503 if hits <= server.failures else 200
+        else:
+            status = 400
+
+        self.send_response(status)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Testa paralelismo, novas tentativas e a fila com debounce do ping do sitemap'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('🔍 Testando ping do sitemap (servidor local)'))
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        server.lock = threading.Lock()
+        server.hits = {}
+        server.delay = 0.5
+        server.failures = 2
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+
+        self.errors = 0
+        try:
+            self.testar_paralelismo(server, base)
+            self.testar_novas_tentativas(server, base)
+            self.testar_debounce(server, base)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        if self.errors:
+            raise CommandError(f'{self.errors} verificação(ões) falharam')
+        self.stdout.write(self.style.SUCCESS('✅ Ping do sitemap funcionando corretamente!'))
+
+    def verificar(self, ok, mensagem):
+        if ok:
+            self.stdout.write(f'   ✅ {mensagem}')
+        else:
+            self.errors += 1
+            self.stdout.write(f'   ❌ {mensagem}')
+
+    def testar_paralelismo(self, server, base):
+        endpoints = {f'Lento {i}': f'{base}/lento?sitemap={{sitemap}}' for i in range(3)}
+        with override_settings(SEO_PING_ENDPOINTS=endpoints):
+            inicio = time.perf_counter()
+            results = ping.ping_all('https://exemplo.com/sitemap.xml', retries=0)
+            duracao = time.perf_counter() - inicio
+
+        self.verificar(all(r['success'] for _, r in results), 'Todos os endpoints responderam 200')
+        self.verificar(
+            duracao < server.delay * 2,
+            f'3 endpoints de {server.delay}s em {duracao:.2f}s (paralelo)'
+        )
+
+    def testar_novas_tentativas(self, server, base):
+        endpoints = {
+            'Falha': f'{base}/falha?sitemap={{sitemap}}',
+            'Recusa': f'{base}/recusa?sitemap={{sitemap}}',
+        }
+        with override_settings(SEO_PING_ENDPOINTS=endpoints):
+            results = dict(ping.ping_all('https://exemplo.com/sitemap.xml', retries=3, backoff=0.05))
+
+        self.verificar(
+            results['Falha']['success'] and results['Falha']['attempts'] == server.failures + 1,
+            f'503 repetido com backoff até o sucesso ({results["Falha"]["attempts"]} tentativas)'
+        )
+        self.verificar(
+            not results['Recusa']['success'] and results['Recusa']['attempts'] == 1,
+            'Erro 400 não é repetido'
+        )
+
+    def testar_debounce(self, server, base):
+        endpoints = {'Lento': f'{base}/lento?sitemap={{sitemap}}'}
+        server.delay = 0
+        server.hits['/lento'] = 0
+        sitemap_url = 'https://exemplo.com/sitemap.xml'
+
+        # Os pedidos ficam no banco: tudo é revertido no final
+        with transaction.atomic(), override_settings(SEO_PING_ENDPOINTS=endpoints):
+            SitemapPing.objects.filter(sitemap_url=sitemap_url).delete()
+            agendados = [ping.schedule_ping(sitemap_url) for _ in range(5)]
+            self.verificar(agendados.count(True) == 1, 'Rajada de 5 pedidos registrou um único ping')
+
+            stats = ping.flush_pending_pings(debounce=60)
+            self.verificar(
+                stats['sent'] == 0 and server.hits['/lento'] == 0,
+                'Ping não é enviado antes da janela de debounce'
+            )
+
+            stats = ping.flush_pending_pings(debounce=0)
+            self.verificar(server.hits['/lento'] == 1, f'Servidor recebeu {server.hits["/lento"]} ping(s)')
+            self.verificar(
+                stats['sent'] == 1 and not SitemapPing.objects.filter(sitemap_url=sitemap_url).exists(),
+                'Ping enviado sai da fila'
+            )
+            transaction.set_rollback(True)
+
+        # Pedido novo enquanto o ping está em andamento
+        ping_all = ping.ping_all
+
+        def publicar_durante_envio(url, **options):
+            ping.schedule_ping(url)
+            return ping_all(url, **options)
+
+        with transaction.atomic(), override_settings(SEO_PING_ENDPOINTS=endpoints):
+            ping.schedule_ping(sitemap_url)
+            with mock.patch.object(ping, 'ping_all', publicar_durante_envio):
+                stats = ping.flush_pending_pings(debounce=0)
+            self.verificar(
+                stats['sent'] == 1 and SitemapPing.objects.filter(sitemap_url=sitemap_url).exists(),
+                'Pedido feito durante o envio continua na fila'
+            )
+            transaction.set_rollback(True)
+
+        recusa = {'Recusa': f'{base}/recusa?sitemap={{sitemap}}'}
+        with transaction.atomic(), override_settings(SEO_PING_ENDPOINTS=recusa):
+            ping.schedule_ping(sitemap_url)
+            stats = ping.flush_pending_pings(debounce=0)
+            pendente = SitemapPing.objects.filter(sitemap_url=sitemap_url).first()
+            self.verificar(
+                stats['failed'] == 1 and pendente is not None and pendente.attempts == 1,
+                'Ping recusado fica na fila com o erro para nova tentativa'
+            )
+            transaction.set_rollback(True)
@@ -0,0 +1,74 @@
+"""
+Comando para verificar que páginas sem SEO não consultam as tabelas de SEO
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from seo.cache import bump_config_version
+
+
+class Command(BaseCommand):
+    help = 'Verifica que admin e área do cliente não fazem consultas de SEO'
+
+    # Páginas que passam pelo context processor mas não usam dados SEO
+    urls = [
+        '/admin/login/',
+        '/area-cliente/login/',
+        '/area-cliente/dashboard/',  # Redirect para o login
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--username',
+            type=str,
+            help='Usuário staff existente para testar também o painel do admin',
+        )
+        parser.add_argument(
+            '--host',
+            type=str,
+            default='localhost',
+            help='Host usado nas requisições (deve estar em ALLOWED_HOSTS)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('🔍 Testando consultas de SEO'))
+
+        client = Client(HTTP_HOST=options['host'])
+        urls = list(self.urls)
+
+        if options['username']:
+            User = get_user_model()
+            try:
+                user = User.objects.get(username=options['username'], is_staff=True)
+            except User.DoesNotExist:
+                raise CommandError(f'Usuário staff "{options["username"]}" não encontrado')
+            client.force_login(user)
+            urls.append('/admin/')
+
+        total_errors = 0
+
+        for url in urls:
+            # Descartar a configuração em memória para que qualquer leitura
+            # da configuração apareça como consulta
+            bump_config_version()
+
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+
+            seo_queries = [q['sql'] for q in queries if '"seo_' in q['sql']]
+
+            if seo_queries:
+                total_errors += 1
+                self.stdout.write(f'   ❌ {url} ({response.status_code}): {len(seo_queries)} consulta(s) SEO')
+                for sql in seo_queries:
+                    self.stdout.write(f'     - {sql}')
+            else:
+                self.stdout.write(f'   ✅ {url} ({response.status_code}): nenhuma consulta SEO')
+
+        if total_errors:
+            raise CommandError(f'{total_errors} página(s) consultaram dados SEO sem usá-los')
+
+        self.stdout.write(self.style.SUCCESS('✅ Nenhuma consulta SEO desnecessária'))
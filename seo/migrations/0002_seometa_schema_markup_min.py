@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:48
+
+import json
+
+from django.db import migrations, models
+
+
+def minify_json_ld(value):
+    """Cópia de seo.models.minify_json_ld no estado desta migração"""
+    data = json.loads(value)
+    if not isinstance(data, (dict, list)):
+        raise ValueError("JSON-LD deve ser um objeto ou uma lista")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+
+
+def preencher_schema_markup_min(apps, schema_editor):
+    """Minifica o JSON-LD dos SEO Metas existentes"""
+    SEOMeta = apps.get_model("seo", "SEOMeta")
+    for seo_meta in SEOMeta.objects.exclude(schema_markup="").only("id", "schema_markup"):
+        try:
+            minified = minify_json_ld(seo_meta.schema_markup)
+        except ValueError:
+            continue
+        SEOMeta.objects.filter(pk=seo_meta.pk).update(schema_markup_min=minified)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("seo", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="seometa",
+            name="schema_markup_min",
+            field=models.TextField(
+                blank=True,
+                editable=False,
+                help_text="JSON-LD validado e minificado no save (usado na renderização)",
+                verbose_name="Schema Markup minificado",
+            ),
+        ),
+        migrations.RunPython(preencher_schema_markup_min, migrations.RunPython.noop),
+    ]
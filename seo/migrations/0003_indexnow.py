@@ -0,0 +1,69 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:54
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("seo", "0002_seometa_schema_markup_min"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndexNowURL",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "url",
+                    models.URLField(max_length=500, unique=True, verbose_name="URL"),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="Tentativas"),
+                ),
+                (
+                    "last_error",
+                    models.TextField(blank=True, verbose_name="Último erro"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Criado em"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Atualizado em"),
+                ),
+            ],
+            options={
+                "verbose_name": "URL na fila IndexNow",
+                "verbose_name_plural": "Fila IndexNow",
+                "ordering": ["created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="seoconfig",
+            name="indexnow_key",
+            field=models.CharField(
+                blank=True,
+                help_text="Chave para enviar URLs novas/alteradas via IndexNow (Bing, Yandex...). Vazio desativa.",
+                max_length=128,
+                validators=[
+                    django.core.validators.RegexValidator(
+                        "^[a-zA-Z0-9-]{8,128}$",
+                        "Use de 8 a 128 letras, números ou hífens.",
+                    )
+                ],
+                verbose_name="Chave IndexNow",
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("seo", "0003_indexnow"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SitemapPing",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sitemap_url",
+                    models.URLField(
+                        max_length=500, unique=True, verbose_name="URL do sitemap"
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="Tentativas"),
+                ),
+                (
+                    "last_error",
+                    models.TextField(blank=True, verbose_name="Último erro"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Pedido em"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Atualizado em"),
+                ),
+            ],
+            options={
+                "verbose_name": "Ping do sitemap pendente",
+                "verbose_name_plural": "Pings do sitemap pendentes",
+                "ordering": ["created_at"],
+            },
+        ),
+    ]
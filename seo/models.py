@@ -7,11 +7,32 @@ from django.db import models
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.urls import reverse
-from django.core.validators import MaxLengthValidator
+from django.core.validators import MaxLengthValidator, RegexValidator
 from django.utils.safestring import mark_safe
 import json
 
 
+def dumps_json_ld(data):
+    """
+    Serializa dados JSON-LD de forma compacta, prontos para ir em <script>
+
+    O '</' é escapado para que o conteúdo não feche a tag antes da hora.
+    """
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+
+def minify_json_ld(value):
+    """
+    Valida e minifica um texto JSON-LD
+
+    Levanta ValueError se o JSON for inválido ou não for objeto/lista.
+    """
+    data = json.loads(value)
+    if not isinstance(data, (dict, list)):
+        raise ValueError('JSON-LD deve ser um objeto ou uma lista')
+    return dumps_json_ld(data)
+
+
 class SEOMeta(models.Model):
     """
     Modelo para armazenar metadados SEO para qualquer objeto do Django
@@ -146,6 +167,13 @@ class SEOMeta(models.Model):
         help_text='Código JSON-LD para dados estruturados Schema.org'
     )
     
+    schema_markup_min = models.TextField(
+        'Schema Markup minificado',
+        blank=True,
+        editable=False,
+        help_text='JSON-LD validado e minificado no save (usado na renderização)'
+    )
+    
     # Controle
     created_at = models.DateTimeField('Criado em', auto_now_add=True)
     updated_at = models.DateTimeField('Atualizado em', auto_now=True)
@@ -199,16 +227,11 @@ class SEOMeta(models.Model):
         return ', '.join(robots)
     
     def get_schema_markup_safe(self):
-        """Retorna o schema markup como HTML seguro"""
-        if not self.schema_markup:
+        """Retorna o schema markup como HTML seguro (já validado no save)"""
+        if not self.schema_markup_min:
             return ''
         
-        try:
-            # Valida se é JSON válido
-            json.loads(self.schema_markup)
-            return mark_safe(f'<script type="application/ld+json">{self.schema_markup}</script>')
-        except json.JSONDecodeError:
-            return ''
+        return mark_safe(f'<script type="application/ld+json">{self.schema_markup_min}</script>')
     
     def clean(self):
         """Validação customizada"""
@@ -217,11 +240,27 @@ class SEOMeta(models.Model):
         # Validar JSON-LD se fornecido
         if self.schema_markup:
             try:
-                json.loads(self.schema_markup)
+                minify_json_ld(self.schema_markup)
             except json.JSONDecodeError:
                 raise ValidationError({
                     'schema_markup': 'JSON inválido. Verifique a sintaxe.'
                 })
+            except ValueError as e:
+                raise ValidationError({'schema_markup': str(e)})
+    
+    def save(self, *args, **kwargs):
+        # Validar e minificar o JSON-LD uma única vez, fora da renderização
+        try:
+            self.schema_markup_min = minify_json_ld(self.schema_markup) if self.schema_markup else ''
+        except ValueError:
+            # JSONDecodeError é subclasse de ValueError; markup inválido não é renderizado
+            self.schema_markup_min = ''
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'schema_markup' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'schema_markup_min'}
+        
+        super().save(*args, **kwargs)
 
 
 class SEOConfig(models.Model):
@@ -300,6 +339,14 @@ class SEOConfig(models.Model):
         help_text='ID do Facebook Pixel'
     )
     
+    indexnow_key = models.CharField(
+        'Chave IndexNow',
+        max_length=128,
+        blank=True,
+        validators=[RegexValidator(r'^[a-zA-Z0-9-]{8,128}$', 'Use de 8 a 128 letras, números ou hífens.')],
+        help_text='Chave para enviar URLs novas/alteradas via IndexNow (Bing, Yandex...). Vazio desativa.'
+    )
+    
     # Schema.org Organization
     organization_name = models.CharField(
         'Nome da Organização',
@@ -368,6 +415,7 @@ class SEOConfig(models.Model):
         # Garantir que só existe uma configuração
         if not self.pk and SEOConfig.objects.exists():
             raise ValueError('Só pode existir uma configuração SEO')
+        self.__dict__.pop('_organization_schema', None)
         super().save(*args, **kwargs)
     
     @classmethod
@@ -385,12 +433,29 @@ class SEOConfig(models.Model):
         )
         return config
     
+    @classmethod
+    def get_cached(cls):
+        """Retorna a configuração SEO em cache (sem consulta enquanto não mudar)"""
+        from .cache import get_cached_config
+        return get_cached_config()
+    
     def get_full_domain(self, protocol='https'):
         """Retorna o domínio completo com protocolo"""
         return f'{protocol}://{self.site_domain}'
     
     def get_organization_schema(self):
-        """Retorna o schema da organização em JSON-LD"""
+        """
+        Retorna o schema da organização em JSON-LD
+        
+        Calculado uma vez por instância; como a configuração fica em cache
+        por versão (SEOConfig.get_cached), o JSON é gerado uma vez por versão.
+        """
+        if '_organization_schema' not in self.__dict__:
+            self.__dict__['_organization_schema'] = self._build_organization_schema()
+        return self.__dict__['_organization_schema']
+    
+    def _build_organization_schema(self):
+        """Monta o script JSON-LD da organização"""
         schema = {
             "@context": "https://schema.org",
             "@type": "RealEstateAgent",
@@ -414,4 +479,52 @@ class SEOConfig(models.Model):
         if self.organization_address:
             schema["address"] = self.organization_address
         
-        return mark_safe(f'<script type="application/ld+json">{json.dumps(schema, ensure_ascii=False, indent=2)}</script>')
+        return mark_safe(f'<script type="application/ld+json">{dumps_json_ld(schema)}</script>')
+
+
+class IndexNowURL(models.Model):
+    """
+    Fila de URLs a enviar via IndexNow
+    
+    Cada URL aparece uma vez (url única); enfileirar de novo só atualiza o
+    registro. As URLs saem da fila quando o envio em lote dá certo; em caso
+    de falha ficam com o erro e o número de tentativas para nova tentativa.
+    """
+    url = models.URLField('URL', max_length=500, unique=True)
+    attempts = models.PositiveIntegerField('Tentativas', default=0)
+    last_error = models.TextField('Último erro', blank=True)
+    created_at = models.DateTimeField('Criado em', auto_now_add=True)
+    updated_at = models.DateTimeField('Atualizado em', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'URL na fila IndexNow'
+        verbose_name_plural = 'Fila IndexNow'
+        ordering = ['created_at']
+    
+    def __str__(self):
+        return self.url
+
+
+class SitemapPing(models.Model):
+    """
+    Ping do sitemap pendente
+    
+    Um registro por sitemap: pedidos feitos enquanto ele existe não criam
+    outro, então uma rajada de publicações vira um único ping. O comando
+    flush_sitemap_ping envia os pendentes há mais que a janela de debounce
+    e remove os que deram certo; falhas ficam com o erro e o número de
+    tentativas.
+    """
+    sitemap_url = models.URLField('URL do sitemap', max_length=500, unique=True)
+    attempts = models.PositiveIntegerField('Tentativas', default=0)
+    last_error = models.TextField('Último erro', blank=True)
+    created_at = models.DateTimeField('Pedido em', auto_now_add=True)
+    updated_at = models.DateTimeField('Atualizado em', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Ping do sitemap pendente'
+        verbose_name_plural = 'Pings do sitemap pendentes'
+        ordering = ['created_at']
+    
+    def __str__(self):
+        return self.sitemap_url
@@ -0,0 +1,196 @@
+"""
+Ping do sitemap para os mecanismos de busca
+
+Os pings são enviados em paralelo (um thread por mecanismo), com timeout
+por endpoint e novas tentativas com backoff exponencial. schedule_ping()
+registra o pedido no banco (SitemapPing, sem duplicatas) e
+flush_pending_pings() envia os pendentes depois da janela de debounce.
+
+Execução periódica (cron): python manage.py flush_sitemap_ping
+"""
+import logging
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+# {nome: url com {sitemap} no lugar da URL do sitemap}
+DEFAULT_PING_ENDPOINTS = {
+    'Google': 'https://www.google.com/ping?sitemap={sitemap}',
+    'Bing': 'https://www.bing.com/ping?sitemap={sitemap}',
+}
+
+PING_TIMEOUT = 10
+PING_RETRIES = 3
+PING_BACKOFF = 1.0
+PING_DEBOUNCE = 60
+PING_MAX_ATTEMPTS = 5
+
+# Respostas que valem nova tentativa (erros temporários)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def get_ping_endpoints():
+    """Endpoints de ping (settings.SEO_PING_ENDPOINTS sobrescreve o padrão)"""
+    return getattr(settings, 'SEO_PING_ENDPOINTS', DEFAULT_PING_ENDPOINTS)
+
+
+def get_sitemap_url():
+    """URL pública do sitemap index"""
+    from .models import SEOConfig
+    return f'{SEOConfig.get_cached().get_full_domain()}/sitemap.xml'
+
+
+def ping_endpoint(url_template, sitemap_url, timeout=PING_TIMEOUT,
+                  retries=PING_RETRIES, backoff=PING_BACKOFF):
+    """
+    Faz o ping em um endpoint, com novas tentativas
+
+    Retorna {'success', 'message', 'attempts'}. Erros 4xx (exceto 429) não
+    são repetidos; falhas de rede, timeouts, 429 e 5xx esperam
+    backoff * 2^n segundos antes da próxima tentativa.
+    """
+    ping_url = url_template.format(sitemap=urllib.parse.quote(sitemap_url, safe=''))
+    result = {'success': False, 'message': '', 'attempts': 0}
+
+    for attempt in range(retries + 1):
+        result['attempts'] = attempt + 1
+        retry = True
+        try:
+            with urllib.request.urlopen(ping_url, timeout=timeout) as response:
+                if response.getcode() == 200:
+                    result.update(success=True, message='Ping enviado com sucesso!')
+                    return result
+                result['message'] = f'Resposta inesperada: {response.getcode()}'
+        except urllib.error.HTTPError as e:
+            result['message'] = f'Erro HTTP: {e.code} - {e.reason}'
+            retry = e.code in RETRY_STATUS
+        except urllib.error.URLError as e:
+            result['message'] = f'Erro de URL: {e.reason}'
+        except Exception as e:
+            result['message'] = f'Erro inesperado: {str(e)}'
+
+        if not retry or attempt == retries:
+            break
+        time.sleep(backoff * (2 ** attempt))
+
+    return result
+
+
+def ping_all(sitemap_url=None, engines=None, timeout=PING_TIMEOUT,
+             retries=PING_RETRIES, backoff=PING_BACKOFF):
+    """
+    Faz o ping em todos os endpoints em paralelo
+
+    Retorna [(nome, resultado)] na ordem dos endpoints.
+    """
+    sitemap_url = sitemap_url or get_sitemap_url()
+    endpoints = get_ping_endpoints()
+    if engines:
+        endpoints = {name: url for name, url in endpoints.items() if name in engines}
+    if not endpoints:
+        return []
+
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+        futures = [
+            (name, executor.submit(ping_endpoint, url, sitemap_url, timeout, retries, backoff))
+            for name, url in endpoints.items()
+        ]
+        return [(name, future.result()) for name, future in futures]
+
+
+def schedule_ping(sitemap_url=None):
+    """
+    Registra um ping pendente do sitemap (enviado por flush_pending_pings)
+
+    Pedidos feitos enquanto já existe um ping pendente são ignorados: uma
+    rajada de publicações vira um único ping, enviado depois da janela de
+    debounce com o sitemap já atualizado. O pedido fica no banco, então
+    sobrevive a reinícios dos workers. Um pedido ignorado ainda marca o
+    registro (updated_at): se chegou durante um envio, o envio não o apaga.
+    Retorna True se um novo ping foi registrado.
+    """
+    from .models import SitemapPing
+
+    pending, created = SitemapPing.objects.get_or_create(sitemap_url=sitemap_url or get_sitemap_url())
+    if not created:
+        SitemapPing.objects.filter(pk=pending.pk).update(updated_at=timezone.now())
+    return created
+
+
+def flush_pending_pings(debounce=None, max_attempts=PING_MAX_ATTEMPTS, **ping_options):
+    """
+    Envia os pings pendentes há mais de `debounce` segundos
+
+    Retorna {'sent', 'failed'}. O registro sai da fila quando todos os
+    mecanismos aceitam o ping, a menos que um novo pedido tenha chegado
+    durante o envio (o sitemap pode ter mudado depois do ping); com
+    max_attempts falhas ele fica na fila (visível no admin) mas não é
+    mais enviado.
+    """
+    from .models import SitemapPing
+
+    if debounce is None:
+        debounce = getattr(settings, 'SEO_PING_DEBOUNCE', PING_DEBOUNCE)
+
+    stats = {'sent': 0, 'failed': 0}
+    started = timezone.now()
+    pending = SitemapPing.objects.filter(
+        attempts__lt=max_attempts,
+        created_at__lte=started - timedelta(seconds=debounce),
+    )
+    for pk, sitemap_url in pending.values_list('pk', 'sitemap_url'):
+        results = ping_all(sitemap_url, **ping_options)
+        failures = [f'{engine}: {result["message"]}' for engine, result in results if not result['success']]
+        for engine, result in results:
+            if result['success']:
+                logger.info('Ping do sitemap (%s): %s', engine, result['message'])
+            else:
+                logger.warning('Ping do sitemap (%s) falhou: %s', engine, result['message'])
+
+        if failures:
+            SitemapPing.objects.filter(pk=pk).update(
+                attempts=F('attempts') + 1,
+                last_error='\n'.join(failures),
+                updated_at=timezone.now(),
+            )
+            stats['failed'] += 1
+        else:
+            # Como na fila IndexNow: um pedido novo no meio do envio fica
+            SitemapPing.objects.filter(pk=pk, updated_at__lte=started).delete()
+            stats['sent'] += 1
+
+    return stats
+
+
+def _flush_now():
+    try:
+        flush_pending_pings(debounce=0)
+    except Exception:
+        logger.exception('Erro ao fazer ping do sitemap')
+    finally:
+        # O thread não passa pelo ciclo de requisição do Django
+        connection.close()
+
+
+def flush_pending_pings_in_background():
+    """
+    Envia os pings pendentes agora, sem esperar o debounce, em um thread
+
+    Para o ping manual; se o worker reiniciar antes, o pedido continua no
+    banco e o cron envia.
+    """
+    thread = threading.Thread(target=_flush_now, daemon=True)
+    thread.start()
+    return thread
@@ -1 +1,181 @@
-# Signals para SEO - placeholder para não gerar erro de importação
+"""
+Signals para SEO
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.urls import reverse
+from django.utils import timezone
+
+from artigos.images import variants_updated
+
+from .cache import bump_config_version
+from .models import SEOConfig, SEOMeta
+from .indexnow import indexnow_enabled, enqueue_urls
+from .ping import schedule_ping
+from .static_sitemaps import static_sitemaps_enabled, rebuild_artigo_sitemap, write_all_sitemaps
+
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=SEOConfig)
+@receiver(post_delete, sender=SEOConfig)
+def invalidar_cache_config(sender, raw=False, **kwargs):
+    """
+    Descarta a configuração SEO em memória de todos os workers (depois do
+    commit, para outro worker não recarregar e guardar a linha antiga com
+    o carimbo novo)
+    """
+    if raw:
+        return
+    transaction.on_commit(bump_config_version)
+
+
+@receiver(post_save, sender=SEOConfig)
+@receiver(post_delete, sender=SEOConfig)
+def regravar_sitemaps_config(sender, **kwargs):
+    """
+    Regrava todos os sitemaps estáticos (domínio e padrões de changefreq
+    e prioridade vêm da configuração)
+    """
+    if not static_sitemaps_enabled():
+        return
+    
+    def rebuild():
+        try:
+            write_all_sitemaps()
+        except Exception:
+            logger.exception('Erro ao regravar os sitemaps após mudar a configuração SEO')
+    
+    transaction.on_commit(rebuild)
+
+
+def ping_on_publish_enabled():
+    """Ping automático ao publicar (settings.SEO_PING_ON_PUBLISH, padrão: fora do DEBUG)"""
+    return getattr(settings, 'SEO_PING_ON_PUBLISH', not settings.DEBUG)
+
+
+@receiver(pre_save, sender='artigos.Artigo')
+def guardar_estado_anterior(sender, instance, **kwargs):
+    """Guarda publicado/slug anteriores (sitemap, ping e IndexNow comparam)"""
+    previous = None
+    if instance.pk and (static_sitemaps_enabled() or ping_on_publish_enabled() or indexnow_enabled()):
+        previous = sender.objects.filter(pk=instance.pk).values('publicado', 'slug').first()
+    instance._seo_previous_state = previous
+
+
+@receiver(post_save, sender='artigos.Artigo')
+@receiver(post_delete, sender='artigos.Artigo')
+def atualizar_sitemap_artigo(sender, instance, **kwargs):
+    """
+    Regrava a página do sitemap estático que contém o artigo
+    
+    Só age se os sitemaps estáticos já foram gerados (build_sitemaps) e se
+    o artigo está ou estava publicado (publicação, despublicação, troca de
+    slug ou nova data de atualização).
+    """
+    if not static_sitemaps_enabled():
+        return
+    
+    previous = getattr(instance, '_seo_previous_state', None)
+    was_published = bool(previous and previous['publicado'])
+    if not (instance.publicado or was_published):
+        return
+    
+    regravar_sitemap_artigo(instance.pk)
+
+
+def regravar_sitemap_artigo(pk):
+    """Regrava a página do sitemap do artigo depois do commit"""
+    def rebuild():
+        try:
+            rebuild_artigo_sitemap(pk)
+        except Exception:
+            # Uma falha no sitemap não pode impedir o salvamento do artigo
+            logger.exception('Erro ao regravar sitemap do artigo %s', pk)
+    
+    transaction.on_commit(rebuild)
+
+
+@receiver(post_save, sender=SEOMeta)
+@receiver(post_delete, sender=SEOMeta)
+def atualizar_sitemap_seo_meta(sender, instance, raw=False, **kwargs):
+    """
+    Marcar ou desmarcar noindex tira ou põe o artigo no sitemap sem
+    nenhum save do próprio artigo
+    """
+    if raw or not static_sitemaps_enabled():
+        return
+    content_type = ContentType.objects.get_for_id(instance.content_type_id)
+    if (content_type.app_label, content_type.model) != ('artigos', 'artigo'):
+        return
+    regravar_sitemap_artigo(instance.object_id)
+
+
+@receiver(variants_updated)
+def atualizar_sitemap_variantes(sender, pk, **kwargs):
+    """process_artigo grava a nova data_atualizacao (lastmod) com update()"""
+    if static_sitemaps_enabled():
+        regravar_sitemap_artigo(pk)
+
+
+@receiver(post_save, sender='artigos.Artigo')
+def agendar_ping_publicacao(sender, instance, created, **kwargs):
+    """
+    Agenda o ping do sitemap quando um artigo é publicado ou despublicado
+    
+    schedule_ping() registra o pedido no banco e agrupa uma rajada de
+    publicações em um único ping (enviado por flush_sitemap_ping).
+    """
+    if not ping_on_publish_enabled():
+        return
+    
+    previous = getattr(instance, '_seo_previous_state', None)
+    was_published = bool(previous and previous['publicado'])
+    if instance.publicado == was_published:
+        return
+    
+    def agendar():
+        try:
+            schedule_ping()
+        except Exception:
+            logger.exception('Erro ao agendar ping do sitemap')
+    
+    transaction.on_commit(agendar)
+
+
+@receiver(post_save, sender='artigos.Artigo')
+@receiver(post_delete, sender='artigos.Artigo')
+def enfileirar_indexnow(sender, instance, **kwargs):
+    """
+    Coloca na fila IndexNow as URLs do artigo que mudaram
+    
+    URL atual quando publicado; URL antiga quando foi despublicado, excluído
+    ou teve o slug trocado (para os buscadores verem o 404).
+    """
+    if not indexnow_enabled():
+        return
+    
+    deleted = kwargs.get('signal') is post_delete
+    previous = getattr(instance, '_seo_previous_state', None)
+    base_url = SEOConfig.get_cached().get_full_domain()
+    
+    # Agendados entram na fila quando chega a data (build_sitemaps --agendados)
+    live = instance.publicado and not (
+        instance.data_publicacao and instance.data_publicacao > timezone.now()
+    )
+    
+    urls = []
+    if live and instance.slug:
+        urls.append(base_url + instance.get_absolute_url())
+    if previous and previous['publicado'] and previous['slug']:
+        if deleted or not instance.publicado or previous['slug'] != instance.slug:
+            urls.append(base_url + reverse('artigos:detalhe', kwargs={'slug': previous['slug']}))
+    
+    if urls:
+        transaction.on_commit(lambda: enqueue_urls(urls))
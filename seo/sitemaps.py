@@ -4,7 +4,12 @@ Sitemaps para SEO
 from django.contrib.sitemaps import Sitemap
 from django.urls import reverse
 from django.apps import apps
+from django.db.models import Count, Max
+from django.utils import timezone
+from xml.sax.saxutils import escape
+import hashlib
 from .models import SEOConfig
+from .utils import prefetch_seo, get_seo_meta, SEO_PREFETCH_ATTR
 
 
 class StaticPagesSitemap(Sitemap):
@@ -16,7 +21,7 @@ class StaticPagesSitemap(Sitemap):
     def get_config(self):
         """Obter configuração SEO"""
         try:
-            return SEOConfig.get_config()
+            return SEOConfig.get_cached()
         except:
             return None
     
@@ -81,9 +86,16 @@ class ArtigosSitemap(Sitemap):
                 slug__exact=''
             ).order_by('-data_publicacao')
             
+            # SEO de todos os artigos em uma única consulta
+            artigos = prefetch_seo(artigos)
+            
             # Validar que cada artigo tem get_absolute_url funcionando
             valid_artigos = []
             for artigo in artigos:
+                # Artigos marcados como noindex não entram no sitemap
+                seo_meta = get_seo_meta(artigo)
+                if seo_meta and seo_meta.noindex:
+                    continue
                 try:
                     url = artigo.get_absolute_url()
                     if url and url != '/' and '/blog/' in url:
@@ -113,7 +125,7 @@ class ArtigosSitemap(Sitemap):
     def changefreq(self, obj):
         """Frequência de mudança baseada na configuração"""
         try:
-            config = SEOConfig.get_config()
+            config = SEOConfig.get_cached()
             return config.sitemap_changefreq
         except:
             return 'weekly'
@@ -121,7 +133,7 @@ class ArtigosSitemap(Sitemap):
     def priority(self, obj):
         """Prioridade baseada na configuração"""
         try:
-            config = SEOConfig.get_config()
+            config = SEOConfig.get_cached()
             return float(config.sitemap_priority)
         except:
             return 0.8
@@ -140,10 +152,14 @@ class SEOSitemap(Sitemap):
         from .models import SEOMeta
         
         seo_objects = []
-        for seo_meta in SEOMeta.objects.filter(noindex=False):
+        # Objetos vinculados carregados em lote (uma consulta por tipo)
+        seo_metas = SEOMeta.objects.filter(noindex=False).prefetch_related('content_object')
+        for seo_meta in seo_metas:
             try:
                 obj = seo_meta.content_object
                 if obj and hasattr(obj, 'get_absolute_url'):
+                    # Guardar o SEO no objeto para lastmod() não consultar de novo
+                    setattr(obj, SEO_PREFETCH_ATTR, [seo_meta])
                     # Verificar se a URL é válida antes de adicionar
                     url = obj.get_absolute_url()
                     if url and url != '/':
@@ -156,18 +172,10 @@ class SEOSitemap(Sitemap):
     
     def lastmod(self, obj):
         """Data da última modificação do SEO"""
-        from .models import SEOMeta
-        from django.contrib.contenttypes.models import ContentType
-        
-        try:
-            content_type = ContentType.objects.get_for_model(obj)
-            seo_meta = SEOMeta.objects.get(
-                content_type=content_type,
-                object_id=obj.pk
-            )
+        seo_meta = get_seo_meta(obj)
+        if seo_meta is not None:
             return seo_meta.updated_at
-        except SEOMeta.DoesNotExist:
-            return getattr(obj, 'updated_at', getattr(obj, 'data_atualizacao', None))
+        return getattr(obj, 'updated_at', getattr(obj, 'data_atualizacao', None))
     
     def location(self, obj):
         """URL do objeto"""
@@ -179,7 +187,7 @@ class SEOSitemap(Sitemap):
     def changefreq(self, obj):
         """Frequência baseada na configuração"""
         try:
-            config = SEOConfig.get_config()
+            config = SEOConfig.get_cached()
             return config.sitemap_changefreq
         except:
             return 'weekly'
@@ -187,7 +195,7 @@ class SEOSitemap(Sitemap):
     def priority(self, obj):
         """Prioridade baseada na configuração"""
         try:
-            config = SEOConfig.get_config()
+            config = SEOConfig.get_cached()
             return float(config.sitemap_priority)
         except:
             return 0.7
@@ -200,3 +208,198 @@ sitemaps = {
     'artigos': ArtigosSitemap,
     # 'seo': SEOSitemap,  # Temporariamente desabilitado
 }
+
+
+# =============================================================================
+# SITEMAP INDEX EM STREAMING
+# =============================================================================
+#
+# Os sitemaps acima criam instâncias de modelo para cada URL. As seções
+# abaixo geram o XML direto de iteradores values_list(), em páginas de no
+# máximo SITEMAP_PAGE_SIZE URLs, listadas em um sitemap index. A memória
+# fica constante independente do número de artigos.
+#
+# As páginas de artigos são faixas fixas de ID (página 1 = IDs 1 a 5000,
+# página 2 = 5001 a 10000...). Assim um artigo sempre cai na mesma página e
+# só ela precisa ser regerada quando ele muda.
+
+SITEMAP_PAGE_SIZE = 5000
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def _format_lastmod(value):
+    """Data no formato W3C usado nos sitemaps (Y-m-d)"""
+    if value is None:
+        return ''
+    return value.date().isoformat() if hasattr(value, 'date') else value.isoformat()
+
+
+def _url_entry(location, lastmod=None, changefreq=None, priority=None):
+    """Bloco <url> de um sitemap"""
+    parts = [f'<url><loc>{escape(location)}</loc>']
+    if lastmod:
+        parts.append(f'<lastmod>{_format_lastmod(lastmod)}</lastmod>')
+    if changefreq:
+        parts.append(f'<changefreq>{changefreq}</changefreq>')
+    if priority is not None:
+        parts.append(f'<priority>{priority}</priority>')
+    parts.append('</url>\n')
+    return ''.join(parts)
+
+
+class StaticSection:
+    """Páginas estáticas (cabem sempre em uma única página)"""
+    name = 'static'
+    
+    items = [
+        {'url_name': 'Prisma_avaliacoes:home', 'priority': 1.0},
+        {'url_name': 'artigos:lista', 'priority': 0.9},
+    ]
+    
+    def pages(self):
+        """Retorna [(página, lastmod)]"""
+        return [(1, None)]
+    
+    def has_page(self, page):
+        return page == 1
+    
+    def urls(self, page, config):
+        """Gera (location, lastmod, changefreq, priority) da página"""
+        if page != 1:
+            return
+        for item in self.items:
+            try:
+                location = reverse(item['url_name'])
+            except Exception:
+                continue
+            yield location, None, config.sitemap_changefreq, item['priority']
+
+
+class ArtigosSection:
+    """Artigos publicados, paginados por faixa de ID"""
+    name = 'artigos'
+    
+    def queryset(self):
+        Artigo = apps.get_model('artigos', 'Artigo')
+        return Artigo.objects.filter(
+            publicado=True,
+            data_publicacao__lte=timezone.now(),
+        ).exclude(
+            slug=''
+        ).exclude(
+            seo_meta__noindex=True
+        )
+    
+    @staticmethod
+    def page_for_pk(pk):
+        """Página do sitemap onde o artigo com esse ID aparece"""
+        return (pk - 1) // SITEMAP_PAGE_SIZE + 1
+    
+    def pages(self):
+        """
+        Retorna [(página, lastmod)] das páginas que têm artigos
+        
+        Percorre apenas (id, data_atualizacao) em streaming. Sem ORDER BY
+        o banco lê só os publicados pelo índice parcial (ordenar por id
+        obrigaria a varrer a tabela); as páginas são ordenadas no final.
+        """
+        pages = {}
+        rows = self.queryset().order_by().values_list(
+            'pk', 'data_atualizacao'
+        ).iterator(chunk_size=2000)
+        
+        for pk, updated in rows:
+            page = self.page_for_pk(pk)
+            if page not in pages:
+                pages[page] = updated
+            elif updated and (pages[page] is None or updated > pages[page]):
+                pages[page] = updated
+        
+        return sorted(pages.items())
+    
+    def _page_rows(self, page):
+        return self.queryset().filter(
+            pk__gt=(page - 1) * SITEMAP_PAGE_SIZE,
+            pk__lte=page * SITEMAP_PAGE_SIZE,
+        )
+    
+    def has_page(self, page):
+        """A página tem artigos (as mesmas que pages() lista no index)"""
+        return self._page_rows(page).exists()
+    
+    def urls(self, page, config):
+        """Gera (location, lastmod, changefreq, priority) da página"""
+        # Resolver a URL uma vez e só trocar o slug em cada artigo
+        pattern = reverse('artigos:detalhe', kwargs={'slug': '__slug__'})
+        changefreq = config.sitemap_changefreq
+        priority = float(config.sitemap_priority)
+        
+        rows = self._page_rows(page).order_by('pk').values_list(
+            'slug', 'data_atualizacao'
+        ).iterator(chunk_size=2000)
+        
+        for slug, updated in rows:
+            yield pattern.replace('__slug__', slug), updated, changefreq, priority
+
+
+sitemap_sections = {
+    'static': StaticSection(),
+    'artigos': ArtigosSection(),
+}
+
+
+def sitemap_page_path(section, page):
+    """Caminho público de uma página do sitemap"""
+    return f'/sitemap-{section}-{page}.xml'
+
+
+def get_sitemap_pages():
+    """Retorna {seção: [(página, lastmod)]} de todas as seções"""
+    return {name: section.pages() for name, section in sitemap_sections.items()}
+
+
+def iter_sitemap_index(base_url, pages=None):
+    """Gera o XML do sitemap index em pedaços"""
+    if pages is None:
+        pages = get_sitemap_pages()
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for name, section_pages in pages.items():
+        for page, lastmod in section_pages:
+            entry = f'<sitemap><loc>{escape(base_url + sitemap_page_path(name, page))}</loc>'
+            if lastmod:
+                entry += f'<lastmod>{_format_lastmod(lastmod)}</lastmod>'
+            yield entry + '</sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+def iter_sitemap_page(section, page, base_url, config):
+    """Gera o XML de uma página do sitemap em pedaços"""
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+    for location, lastmod, changefreq, priority in sitemap_sections[section].urls(page, config):
+        yield _url_entry(base_url + location, lastmod, changefreq, priority)
+    yield '</urlset>\n'
+
+
+def get_sitemap_validators():
+    """
+    Retorna (etag, last_modified) dos sitemaps com uma única agregação
+    
+    Combina a última atualização e publicação dos artigos, o total de
+    artigos listados (pega exclusões e publicações agendadas) e a data da
+    configuração SEO (domínio, changefreq, prioridade).
+    """
+    stats = ArtigosSection().queryset().aggregate(
+        updated=Max('data_atualizacao'),
+        published=Max('data_publicacao'),
+        total=Count('pk'),
+    )
+    config = SEOConfig.get_cached()
+    
+    dates = [date for date in (stats['updated'], stats['published'], config.updated_at) if date]
+    last_modified = max(dates) if dates else None
+    
+    parts = [stats['total'], stats['updated'], stats['published'], config.updated_at]
+    etag = hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+    
+    return etag, last_modified
@@ -0,0 +1,186 @@
+"""
+Registro de snippets de rastreamento (Analytics, GTM, Pixel, verificação)
+
+Cada snippet é gerado por uma função registrada com @snippet a partir da
+configuração SEO. Todos são renderizados juntos, uma vez por versão da
+configuração, e ficam em memória no worker; as template tags apenas
+consultam o dicionário.
+"""
+from django.utils.safestring import mark_safe
+
+from .cache import get_config_version
+from .models import SEOConfig
+
+
+SNIPPETS = {}
+
+# Snippet não registrado (uma instância só, sem criar a cada chamada)
+EMPTY_SNIPPET = mark_safe('')
+
+# (versão, {nome: html}) - tupla única para troca atômica entre threads
+_rendered = (None, {})
+
+
+def snippet(name):
+    """Registra uma função que gera o HTML de um snippet"""
+    def decorator(func):
+        SNIPPETS[name] = func
+        return func
+    return decorator
+
+
+def render_snippets(config):
+    """Renderiza todos os snippets registrados para a configuração (já seguros)"""
+    rendered = {}
+    for name, builder in SNIPPETS.items():
+        rendered[name] = mark_safe(builder(config) if config else '')
+    return rendered
+
+
+def _render(version):
+    global _rendered
+    try:
+        config = SEOConfig.get_cached()
+    except Exception:
+        # Fallback se não houver configuração (ex.: tabela ainda não criada)
+        config = None
+    rendered = render_snippets(config)
+    _rendered = (version, rendered)
+    return rendered
+
+
+def get_snippet(name):
+    """
+    Retorna o HTML de um snippet para a configuração atual
+
+    Só renderiza de novo quando o carimbo de versão da configuração muda;
+    fora isso é uma consulta ao dicionário.
+    """
+    version = get_config_version()
+    cached_version, rendered = _rendered
+    if version is None or cached_version != version:
+        rendered = _render(version)
+    return rendered.get(name, EMPTY_SNIPPET)
+
+
+@snippet('google_analytics')
+def google_analytics(config):
+    """Google Analytics 4 (G-) ou Universal Analytics (legado)"""
+    if not config.google_analytics_id:
+        return ''
+
+    if config.google_analytics_id.startswith('G-'):
+        # Google Analytics 4
+        return f'''
+        <!-- Google Analytics 4 -->
+        <script async src="https://www.googletagmanager.com/gtag/js?id={config.google_analytics_id}"></script>
+        <script>
+            window.dataLayer = window.dataLayer || [];
+            function gtag(){{dataLayer.push(arguments);}}
+            gtag('js', new Date());
+            gtag('config', '{config.google_analytics_id}');
+        </script>
+        '''
+
+    # Universal Analytics (legado)
+    return f'''
+        <!-- Google Analytics Universal -->
+        <script async src="https://www.google-analytics.com/analytics.js"></script>
+        <script>
+            (function(i,s,o,g,r,a,m){{i['GoogleAnalyticsObject']=r;i[r]=i[r]||function(){{
+            (i[r].q=i[r].q||[]).push(arguments)}},i[r].l=1*new Date();a=s.createElement(o),
+            m=s.getElementsByTagName(o)[0];a.async=1;a.src=g;m.parentNode.insertBefore(a,m)
+            }})(window,document,'script','https://www.google-analytics.com/analytics.js','ga');
+            ga('create', '{config.google_analytics_id}', 'auto');
+            ga('send', 'pageview');
+        </script>
+        '''
+
+
+@snippet('google_tag_manager_head')
+def google_tag_manager_head(config):
+    """Google Tag Manager - código para <head>"""
+    if not config.google_tag_manager_id:
+        return ''
+
+    return f'''
+    <!-- Google Tag Manager -->
+    <script>(function(w,d,s,l,i){{w[l]=w[l]||[];w[l].push({{'gtm.start':
+    new Date().getTime(),event:'gtm.js'}});var f=d.getElementsByTagName(s)[0],
+    j=d.createElement(s),dl=l!='dataLayer'?'&l='+l:'';j.async=true;j.src=
+    'https://www.googletagmanager.com/gtm.js?id='+i+dl;f.parentNode.insertBefore(j,f);
+    }})(window,document,'script','dataLayer','{config.google_tag_manager_id}');</script>
+    <!-- End Google Tag Manager -->
+    '''
+
+
+@snippet('google_tag_manager_body')
+def google_tag_manager_body(config):
+    """Google Tag Manager - código para <body>"""
+    if not config.google_tag_manager_id:
+        return ''
+
+    return f'''
+    <!-- Google Tag Manager (noscript) -->
+    <noscript><iframe src="https://www.googletagmanager.com/ns.html?id={config.google_tag_manager_id}"
+    height="0" width="0" style="display:none;visibility:hidden"></iframe></noscript>
+    <!-- End Google Tag Manager (noscript) -->
+    '''
+
+
+@snippet('facebook_pixel')
+def facebook_pixel(config):
+    """Facebook Pixel"""
+    if not config.facebook_pixel_id:
+        return ''
+
+    return f'''
+    <!-- Facebook Pixel -->
+    <script>
+    !function(f,b,e,v,n,t,s)
+    {{if(f.fbq)return;n=f.fbq=function(){{n.callMethod?
+    n.callMethod.apply(n,arguments):n.queue.push(arguments)}};
+    if(!f._fbq)f._fbq=n;n.push=n;n.loaded=!0;n.version='2.0';
+    n.queue=[];t=b.createElement(e);t.async=!0;
+    t.src=v;s=b.getElementsByTagName(e)[0];
+    s.parentNode.insertBefore(t,s)}}(window,document,'script',
+    'https://connect.facebook.net/en_US/fbevents.js');
+    fbq('init', '{config.facebook_pixel_id}');
+    fbq('track', 'PageView');
+    </script>
+    <noscript>
+    <img height="1" width="1"
+    src="https://www.facebook.com/tr?id={config.facebook_pixel_id}&ev=PageView&noscript=1"/>
+    </noscript>
+    <!-- End Facebook Pixel -->
+    '''
+
+
+@snippet('site_verification_tags')
+def site_verification_tags(config):
+    """Meta tags de verificação (Search Console e Bing)"""
+    tags = []
+
+    if config.google_search_console_id:
+        tags.append(f'<meta name="google-site-verification" content="{config.google_search_console_id}">')
+
+    if config.bing_webmaster_id:
+        tags.append(f'<meta name="msvalidate.01" content="{config.bing_webmaster_id}">')
+
+    return '\n'.join(tags)
+
+
+@snippet('seo_meta_tags')
+def seo_meta_tags(config):
+    """Meta tags básicas do site"""
+    return f'''
+        <meta name="description" content="{config.site_description}">
+        <meta name="keywords" content="{config.default_keywords}">
+        <meta name="author" content="{config.organization_name}">
+        '''
+
+
+@snippet('organization_schema')
+def organization_schema(config):
+    """Schema.org da organização (JSON-LD)"""
+    return config.get_organization_schema()
@@ -0,0 +1,131 @@
+"""
+Sitemaps pré-gerados em disco
+
+O mesmo XML das views de sitemap (seo/sitemaps.py) é gravado em arquivos
+para o Nginx servir direto, sem passar pelo Django. A gravação é atômica
+(arquivo temporário + os.replace), então um crawler nunca lê um arquivo
+pela metade.
+
+Geração completa: python manage.py build_sitemaps
+Depois disso, salvar um artigo regrava apenas a página que o contém e o
+index, e salvar a configuração SEO regrava tudo (ver seo/signals.py).
+Artigos agendados entram sem nenhum save: o cron roda
+build_sitemaps --agendados, que só regera quando algum foi publicado
+desde a última gravação (ver config/crontab).
+"""
+import os
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import SEOConfig
+from .sitemaps import (
+    ArtigosSection, sitemap_page_path, get_sitemap_pages,
+    iter_sitemap_index, iter_sitemap_page,
+)
+
+
+def get_sitemap_root():
+    """Diretório dos arquivos (settings.SEO_SITEMAP_ROOT ou BASE_DIR/sitemaps)"""
+    return Path(getattr(settings, 'SEO_SITEMAP_ROOT', settings.BASE_DIR / 'sitemaps'))
+
+
+def static_sitemaps_enabled():
+    """Os arquivos só são mantidos depois da primeira geração completa"""
+    return (get_sitemap_root() / 'sitemap.xml').exists()
+
+
+def scheduled_since_last_build():
+    """
+    Artigos agendados que chegaram à data de publicação depois da última
+    gravação do index (e ainda não estão nos arquivos)
+    """
+    from artigos.models import Artigo
+
+    index = get_sitemap_root() / 'sitemap.xml'
+    if not index.exists():
+        return []
+    written_at = datetime.fromtimestamp(index.stat().st_mtime, tz=dt_timezone.utc)
+    return list(Artigo.objects.filter(
+        publicado=True,
+        data_publicacao__gt=written_at,
+        data_publicacao__lte=timezone.now(),
+    ).exclude(slug='').only('pk', 'slug'))
+
+
+def _write_atomic(path, chunks):
+    """Grava os pedaços em um temporário e troca pelo arquivo final"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-', suffix='.xml')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp:
+            for chunk in chunks:
+                tmp.write(chunk)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _page_file(section, page):
+    return get_sitemap_root() / sitemap_page_path(section, page).lstrip('/')
+
+
+def write_sitemap_index():
+    """Regrava sitemap.xml e retorna {seção: [páginas]} listadas nele"""
+    config = SEOConfig.get_cached()
+    pages = get_sitemap_pages()
+    _write_atomic(get_sitemap_root() / 'sitemap.xml', iter_sitemap_index(config.get_full_domain(), pages))
+    return {name: [page for page, _ in section_pages] for name, section_pages in pages.items()}
+
+
+def write_sitemap_page(section, page):
+    """Regrava uma página do sitemap"""
+    config = SEOConfig.get_cached()
+    path = _page_file(section, page)
+    _write_atomic(path, iter_sitemap_page(section, page, config.get_full_domain(), config))
+    return path
+
+
+def write_all_sitemaps():
+    """
+    Gera o index e todas as páginas, removendo páginas que saíram do index
+
+    Retorna a lista de arquivos gravados.
+    """
+    root = get_sitemap_root()
+    written = []
+    pages = write_sitemap_index()
+    written.append(root / 'sitemap.xml')
+
+    for section, section_pages in pages.items():
+        for page in section_pages:
+            written.append(write_sitemap_page(section, page))
+
+    # Remover páginas antigas que não estão mais no index
+    for path in root.glob('sitemap-*.xml'):
+        if path not in written:
+            path.unlink()
+
+    return written
+
+
+def rebuild_artigo_sitemap(pk):
+    """
+    Regrava somente a página de artigos que contém o artigo e o index
+
+    Se a página ficou vazia (último artigo da faixa despublicado), o
+    arquivo é removido e o index deixa de listá-la.
+    """
+    page = ArtigosSection.page_for_pk(pk)
+    pages = write_sitemap_index()
+    path = _page_file('artigos', page)
+
+    if page in pages['artigos']:
+        write_sitemap_page('artigos', page)
+    elif path.exists():
+        path.unlink()
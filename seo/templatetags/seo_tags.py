@@ -2,36 +2,59 @@
 Template tags para SEO
 """
 from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
 from django.utils.safestring import mark_safe
-from django.contrib.contenttypes.models import ContentType
 from django.conf import settings
-import json
+from functools import lru_cache
 
-from ..models import SEOMeta, SEOConfig
+from ..cache import canonical_url, seo_head_cache_key, SEO_HEAD_TIMEOUT
+from ..models import SEOMeta, SEOConfig, dumps_json_ld
+from ..snippets import get_snippet
+from ..utils import get_seo_meta
 
 register = template.Library()
 
 
-@register.inclusion_tag('seo/meta_tags.html', takes_context=True)
+@register.simple_tag(takes_context=True)
 def render_seo(context, obj=None):
     """
     Template tag principal para renderizar todas as meta tags SEO
     
     Uso: {% render_seo object %}
+    
+    O fragmento renderizado fica em cache; a chave muda quando o objeto,
+    o SEO Meta ou a configuração SEO são alterados.
     """
     request = context['request']
     try:
-        seo_config = SEOConfig.get_config()
+        seo_config = SEOConfig.get_cached()
     except:
         # Fallback se não houver configuração
         seo_config = None
     
+    seo_meta = get_seo_meta(obj) if obj else None
+    
+    cache_key = seo_head_cache_key(request, obj, seo_meta)
+    html = cache.get(cache_key)
+    if html is None:
+        html = render_to_string(
+            'seo/meta_tags.html',
+            _build_seo_context(request, obj, seo_config, seo_meta)
+        )
+        cache.set(cache_key, html, SEO_HEAD_TIMEOUT)
+    
+    return mark_safe(html)
+
+
+def _build_seo_context(request, obj, seo_config, seo_meta):
+    """Monta o contexto do template seo/meta_tags.html"""
     # Dados padrão
     seo_data = {
         'title': seo_config.site_name if seo_config else 'Prisma Avaliações Imobiliárias',
         'description': seo_config.site_description if seo_config else 'Avaliações imobiliárias profissionais',
         'keywords': seo_config.default_keywords if seo_config else 'avaliação imobiliária',
-        'canonical_url': request.build_absolute_uri(),
+        'canonical_url': canonical_url(request),
         'robots': 'index, follow',
         'og_title': seo_config.site_name if seo_config else 'Prisma Avaliações Imobiliárias',
         'og_description': seo_config.site_description if seo_config else 'Avaliações imobiliárias profissionais',
@@ -52,18 +75,15 @@ def render_seo(context, obj=None):
     # Se objeto fornecido, buscar SEO específico
     if obj:
         try:
-            content_type = ContentType.objects.get_for_model(obj)
-            seo_meta = SEOMeta.objects.get(
-                content_type=content_type,
-                object_id=obj.pk
-            )
+            if seo_meta is None:
+                raise SEOMeta.DoesNotExist
             
             # Sobrescrever com dados específicos
             seo_data.update({
                 'title': seo_meta.get_title(),
                 'description': seo_meta.get_description(),
                 'keywords': seo_meta.keywords or seo_data['keywords'],
-                'canonical_url': seo_meta.canonical_url or request.build_absolute_uri(),
+                'canonical_url': seo_meta.canonical_url or canonical_url(request),
                 'robots': seo_meta.get_robots_content(),
                 'og_title': seo_meta.get_og_title(),
                 'og_description': seo_meta.get_og_description(),
@@ -129,36 +149,7 @@ def google_analytics():
     
     Uso: {% google_analytics %}
     """
-    config = SEOConfig.get_config()
-    if not config.google_analytics_id:
-        return ''
-    
-    if config.google_analytics_id.startswith('G-'):
-        # Google Analytics 4
-        return mark_safe(f'''
-        <!-- Google Analytics 4 -->
-        <script async src="https://www.googletagmanager.com/gtag/js?id={config.google_analytics_id}"></script>
-        <script>
-            window.dataLayer = window.dataLayer || [];
-            function gtag(){{dataLayer.push(arguments);}}
-            gtag('js', new Date());
-            gtag('config', '{config.google_analytics_id}');
-        </script>
-        ''')
-    else:
-        # Universal Analytics (legado)
-        return mark_safe(f'''
-        <!-- Google Analytics Universal -->
-        <script async src="https://www.google-analytics.com/analytics.js"></script>
-        <script>
-            (function(i,s,o,g,r,a,m){{i['GoogleAnalyticsObject']=r;i[r]=i[r]||function(){{
-            (i[r].q=i[r].q||[]).push(arguments)}},i[r].l=1*new Date();a=s.createElement(o),
-            m=s.getElementsByTagName(o)[0];a.async=1;a.src=g;m.parentNode.insertBefore(a,m)
-            }})(window,document,'script','https://www.google-analytics.com/analytics.js','ga');
-            ga('create', '{config.google_analytics_id}', 'auto');
-            ga('send', 'pageview');
-        </script>
-        ''')
+    return get_snippet('google_analytics')
 
 
 @register.simple_tag
@@ -168,19 +159,7 @@ def google_tag_manager_head():
     
     Uso: {% google_tag_manager_head %}
     """
-    config = SEOConfig.get_config()
-    if not config.google_tag_manager_id:
-        return ''
-    
-    return mark_safe(f'''
-    <!-- Google Tag Manager -->
-    <script>(function(w,d,s,l,i){{w[l]=w[l]||[];w[l].push({{'gtm.start':
-    new Date().getTime(),event:'gtm.js'}});var f=d.getElementsByTagName(s)[0],
-    j=d.createElement(s),dl=l!='dataLayer'?'&l='+l:'';j.async=true;j.src=
-    'https://www.googletagmanager.com/gtm.js?id='+i+dl;f.parentNode.insertBefore(j,f);
-    }})(window,document,'script','dataLayer','{config.google_tag_manager_id}');</script>
-    <!-- End Google Tag Manager -->
-    ''')
+    return get_snippet('google_tag_manager_head')
 
 
 @register.simple_tag
@@ -190,16 +169,7 @@ def google_tag_manager_body():
     
     Uso: {% google_tag_manager_body %}
     """
-    config = SEOConfig.get_config()
-    if not config.google_tag_manager_id:
-        return ''
-    
-    return mark_safe(f'''
-    <!-- Google Tag Manager (noscript) -->
-    <noscript><iframe src="https://www.googletagmanager.com/ns.html?id={config.google_tag_manager_id}"
-    height="0" width="0" style="display:none;visibility:hidden"></iframe></noscript>
-    <!-- End Google Tag Manager (noscript) -->
-    ''')
+    return get_snippet('google_tag_manager_body')
 
 
 @register.simple_tag
@@ -209,30 +179,7 @@ def facebook_pixel():
     
     Uso: {% facebook_pixel %}
     """
-    config = SEOConfig.get_config()
-    if not config.facebook_pixel_id:
-        return ''
-    
-    return mark_safe(f'''
-    <!-- Facebook Pixel -->
-    <script>
-    !function(f,b,e,v,n,t,s)
-    {{if(f.fbq)return;n=f.fbq=function(){{n.callMethod?
-    n.callMethod.apply(n,arguments):n.queue.push(arguments)}};
-    if(!f._fbq)f._fbq=n;n.push=n;n.loaded=!0;n.version='2.0';
-    n.queue=[];t=b.createElement(e);t.async=!0;
-    t.src=v;s=b.getElementsByTagName(e)[0];
-    s.parentNode.insertBefore(t,s)}}(window,document,'script',
-    'https://connect.facebook.net/en_US/fbevents.js');
-    fbq('init', '{config.facebook_pixel_id}');
-    fbq('track', 'PageView');
-    </script>
-    <noscript>
-    <img height="1" width="1" 
-    src="https://www.facebook.com/tr?id={config.facebook_pixel_id}&ev=PageView&noscript=1"/>
-    </noscript>
-    <!-- End Facebook Pixel -->
-    ''')
+    return get_snippet('facebook_pixel')
 
 
 @register.simple_tag
@@ -242,8 +189,7 @@ def organization_schema():
     
     Uso: {% organization_schema %}
     """
-    config = SEOConfig.get_config()
-    return config.get_organization_schema()
+    return get_snippet('organization_schema')
 
 
 @register.simple_tag
@@ -263,13 +209,20 @@ def breadcrumb_schema(breadcrumbs):
     if not breadcrumbs:
         return ''
     
+    key = tuple((str(breadcrumb['name']), str(breadcrumb['url'])) for breadcrumb in breadcrumbs)
+    return mark_safe(_breadcrumb_json_ld(key))
+
+
+@lru_cache(maxsize=256)
+def _breadcrumb_json_ld(breadcrumbs):
+    """Script JSON-LD do breadcrumb (memorizado por sequência de itens)"""
     items = []
-    for position, breadcrumb in enumerate(breadcrumbs, 1):
+    for position, (name, url) in enumerate(breadcrumbs, 1):
         items.append({
             "@type": "ListItem",
             "position": position,
-            "name": breadcrumb['name'],
-            "item": breadcrumb['url']
+            "name": name,
+            "item": url
         })
     
     schema = {
@@ -278,7 +231,7 @@ def breadcrumb_schema(breadcrumbs):
         "itemListElement": items
     }
     
-    return mark_safe(f'<script type="application/ld+json">{json.dumps(schema, ensure_ascii=False)}</script>')
+    return f'<script type="application/ld+json">{dumps_json_ld(schema)}</script>'
 
 
 @register.filter
@@ -292,11 +245,7 @@ def seo_exists(obj):
         return False
     
     try:
-        content_type = ContentType.objects.get_for_model(obj)
-        return SEOMeta.objects.filter(
-            content_type=content_type,
-            object_id=obj.pk
-        ).exists()
+        return get_seo_meta(obj) is not None
     except:
         return False
 
@@ -319,95 +268,26 @@ def site_verification_tags():
     
     Uso: {% site_verification_tags %}
     """
-    config = SEOConfig.get_config()
-    tags = []
-    
-    if config.google_search_console_id:
-        tags.append(f'<meta name="google-site-verification" content="{config.google_search_console_id}">')
-    
-    if config.bing_webmaster_id:
-        tags.append(f'<meta name="msvalidate.01" content="{config.bing_webmaster_id}">')
-    
-    return mark_safe('\n'.join(tags))
+    return get_snippet('site_verification_tags')
 
 
 # Template tags adicionais que podem ser chamados
 @register.simple_tag
 def seo_meta_tags():
     """Template tag simplificado para meta tags básicas"""
-    try:
-        config = SEOConfig.get_config()
-        return mark_safe(f'''
-        <meta name="description" content="{config.site_description}">
-        <meta name="keywords" content="{config.default_keywords}">
-        <meta name="author" content="{config.organization_name}">
-        ''')
-    except:
-        return mark_safe('')
+    return get_snippet('seo_meta_tags')
 
 
 @register.simple_tag
 def schema_org_data():
     """Template tag para dados estruturados Schema.org"""
-    try:
-        config = SEOConfig.get_config()
-        schema = config.get_organization_schema()
-        return mark_safe(f'<script type="application/ld+json">{schema}</script>')
-    except:
-        return mark_safe('')
-
-
-@register.simple_tag
-def google_analytics():
-    """Template tag para Google Analytics"""
-    try:
-        config = SEOConfig.get_config()
-        if config.google_analytics_id:
-            return mark_safe(f'''
-            <script async src="https://www.googletagmanager.com/gtag/js?id={config.google_analytics_id}"></script>
-            <script>
-              window.dataLayer = window.dataLayer || [];
-              function gtag(){{dataLayer.push(arguments);}}
-              gtag('js', new Date());
-              gtag('config', '{config.google_analytics_id}');
-            </script>
-            ''')
-    except:
-        pass
-    return mark_safe('')
+    return get_snippet('organization_schema')
 
 
 @register.simple_tag
 def google_tag_manager():
-    """Template tag para Google Tag Manager"""
-    try:
-        config = SEOConfig.get_config()
-        if config.google_tag_manager_id:
-            return mark_safe(f'''
-            <script>(function(w,d,s,l,i){{w[l]=w[l]||[];w[l].push({{'gtm.start':
-            new Date().getTime(),event:'gtm.js'}});var f=d.getElementsByTagName(s)[0],
-            j=d.createElement(s),dl=l!='dataLayer'?'&l='+l:'';j.async=true;j.src=
-            'https://www.googletagmanager.com/gtm.js?id='+i+dl;f.parentNode.insertBefore(j,f);
-            }})(window,document,'script','dataLayer','{config.google_tag_manager_id}');</script>
-            ''')
-    except:
-        pass
-    return mark_safe('')
-
-
-@register.simple_tag
-def google_tag_manager_body():
-    """Template tag para Google Tag Manager (body)"""
-    try:
-        config = SEOConfig.get_config()
-        if config.google_tag_manager_id:
-            return mark_safe(f'''
-            <noscript><iframe src="https://www.googletagmanager.com/ns.html?id={config.google_tag_manager_id}"
-            height="0" width="0" style="display:none;visibility:hidden"></iframe></noscript>
-            ''')
-    except:
-        pass
-    return mark_safe('')
+    """Template tag para Google Tag Manager (alias de google_tag_manager_head)"""
+    return get_snippet('google_tag_manager_head')
 
 
 @register.inclusion_tag('seo/seo_head.html', takes_context=True)
@@ -421,7 +301,7 @@ def render_seo_meta(context, obj=None, include_json_ld=True):
     
     # Obter configuração global
     try:
-        seo_config = SEOConfig.get_config()
+        seo_config = SEOConfig.get_cached()
     except:
         seo_config = None
     
@@ -429,11 +309,7 @@ def render_seo_meta(context, obj=None, include_json_ld=True):
     seo_meta = None
     if obj:
         try:
-            content_type = ContentType.objects.get_for_model(obj)
-            seo_meta = SEOMeta.objects.filter(
-                content_type=content_type,
-                object_id=obj.pk
-            ).first()
+            seo_meta = get_seo_meta(obj)
         except:
             pass
     
@@ -453,7 +329,7 @@ def get_seo_config():
     Uso: {% get_seo_config as config %}
     """
     try:
-        return SEOConfig.get_config()
+        return SEOConfig.get_cached()
     except:
         return None
 
@@ -469,7 +345,7 @@ def render_json_ld(context, obj=None):
     
     # Obter configuração global
     try:
-        seo_config = SEOConfig.get_config()
+        seo_config = SEOConfig.get_cached()
     except:
         seo_config = None
     
@@ -477,11 +353,7 @@ def render_json_ld(context, obj=None):
     seo_meta = None
     if obj:
         try:
-            content_type = ContentType.objects.get_for_model(obj)
-            seo_meta = SEOMeta.objects.filter(
-                content_type=content_type,
-                object_id=obj.pk
-            ).first()
+            seo_meta = get_seo_meta(obj)
         except:
             pass
     
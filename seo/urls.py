@@ -7,7 +7,10 @@ from . import views
 app_name = 'seo'
 
 urlpatterns = [
+    path('sitemap.xml', views.sitemap_index, name='sitemap_index'),
+    path('sitemap-<slug:section>-<int:page>.xml', views.sitemap_page, name='sitemap_page'),
     path('robots.txt', views.robots_txt, name='robots_txt'),
     path('ads.txt', views.ads_txt, name='ads_txt'),
     path('admin/ping-sitemap/', views.sitemap_ping_view, name='ping_sitemap'),
+    path('<slug:key>.txt', views.indexnow_key_file, name='indexnow_key'),
 ]
@@ -0,0 +1,72 @@
+"""
+Utilitários para buscar SEOMeta de objetos
+"""
+from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Prefetch
+
+from .models import SEOMeta
+
+
+# Atributo onde prefetch_seo() guarda a lista com o SEOMeta do objeto
+SEO_PREFETCH_ATTR = '_seo_meta_prefetched'
+
+
+def get_seo_relation_name(model):
+    """Retorna o nome da GenericRelation do modelo para SEOMeta (ou None)"""
+    for field in model._meta.private_fields:
+        if isinstance(field, GenericRelation) and field.related_model is SEOMeta:
+            return field.name
+    return None
+
+
+def prefetch_seo(queryset):
+    """
+    Busca o SEOMeta de todos os objetos do queryset em uma única consulta
+
+    Uso: artigos = prefetch_seo(Artigo.objects.filter(publicado=True))
+
+    Requer uma GenericRelation para SEOMeta no modelo; caso contrário o
+    queryset é retornado sem alterações.
+    """
+    relation_name = get_seo_relation_name(queryset.model)
+    if relation_name is None:
+        return queryset
+
+    # No máximo um SEOMeta por objeto: a ordenação padrão (-updated_at)
+    # só faria o banco ordenar o resultado
+    return queryset.prefetch_related(
+        Prefetch(relation_name, queryset=SEOMeta.objects.order_by(), to_attr=SEO_PREFETCH_ATTR)
+    )
+
+
+def get_seo_meta(obj):
+    """
+    Retorna o SEOMeta do objeto (ou None)
+
+    Usa os dados de prefetch_seo() quando disponíveis e só consulta o
+    banco para objetos que não passaram pelo prefetch.
+    """
+    if not obj or obj.pk is None:
+        return None
+
+    prefetched = getattr(obj, SEO_PREFETCH_ATTR, None)
+    if prefetched is not None:
+        seo_meta = prefetched[0] if prefetched else None
+    else:
+        content_type = ContentType.objects.get_for_model(obj)
+        seo_meta = SEOMeta.objects.filter(
+            content_type=content_type,
+            object_id=obj.pk
+        ).first()
+        # Guardar no objeto para as próximas tags da mesma página
+        try:
+            setattr(obj, SEO_PREFETCH_ATTR, [seo_meta] if seo_meta else [])
+        except AttributeError:
+            pass
+
+    if seo_meta is not None:
+        # Evitar nova consulta ao acessar seo_meta.content_object
+        SEOMeta._meta.get_field('content_object').set_cached_value(seo_meta, obj)
+
+    return seo_meta
@@ -1,21 +1,51 @@
 """
 Views para SEO
 """
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse, Http404
 from django.template.loader import render_to_string
 from django.views.decorators.cache import cache_page
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, condition
 from django.conf import settings
 from .models import SEOConfig
+from .sitemaps import (
+    sitemap_sections, iter_sitemap_index, iter_sitemap_page, get_sitemap_validators,
+)
 
 
-@cache_page(60 * 60 * 24)  # Cache por 24 horas
-@require_http_methods(["GET"])
+def _sitemap_validators(request):
+    """Calcula os validadores uma vez por requisição (ETag e Last-Modified)"""
+    if not hasattr(request, '_sitemap_validators'):
+        request._sitemap_validators = get_sitemap_validators()
+    return request._sitemap_validators
+
+
+def _sitemap_etag(request, *args, **kwargs):
+    return _sitemap_validators(request)[0]
+
+
+def _sitemap_last_modified(request, *args, **kwargs):
+    return _sitemap_validators(request)[1]
+
+
+def _config_etag(request, *args, **kwargs):
+    config = SEOConfig.get_cached()
+    return f'{config.pk}-{config.updated_at.timestamp() if config.updated_at else 0}'
+
+
+def _config_last_modified(request, *args, **kwargs):
+    return SEOConfig.get_cached().updated_at
+
+
+# Sem cache_page: a configuração já fica em memória (SEOConfig.get_cached)
+# e troca de domínio aparece na hora. Crawlers que já têm o arquivo
+# recebem 304 sem renderização.
+@require_http_methods(["GET", "HEAD"])
+@condition(etag_func=_config_etag, last_modified_func=_config_last_modified)
 def robots_txt(request):
     """
     View para gerar robots.txt dinamicamente
     """
-    config = SEOConfig.get_config()
+    config = SEOConfig.get_cached()
     
     # Conteúdo do robots.txt
     content = f"""User-agent: *
@@ -55,6 +85,49 @@ Allow: /
     return HttpResponse(content, content_type='text/plain')
 
 
+@require_http_methods(["GET", "HEAD"])
+@condition(etag_func=_sitemap_etag, last_modified_func=_sitemap_last_modified)
+def sitemap_index(request):
+    """
+    Sitemap index com links para as páginas de cada seção
+    """
+    config = SEOConfig.get_cached()
+    return StreamingHttpResponse(
+        iter_sitemap_index(config.get_full_domain()),
+        content_type='application/xml'
+    )
+
+
+@require_http_methods(["GET", "HEAD"])
+@condition(etag_func=_sitemap_etag, last_modified_func=_sitemap_last_modified)
+def sitemap_page(request, section, page):
+    """
+    Página de uma seção do sitemap (XML gerado em streaming)
+    
+    Páginas fora do index (além da última ou sem artigos) são 404, não um
+    urlset vazio.
+    """
+    if section not in sitemap_sections or page < 1 or not sitemap_sections[section].has_page(page):
+        raise Http404('Sitemap não encontrado')
+    
+    config = SEOConfig.get_cached()
+    return StreamingHttpResponse(
+        iter_sitemap_page(section, page, config.get_full_domain(), config),
+        content_type='application/xml'
+    )
+
+
+@require_http_methods(["GET", "HEAD"])
+def indexnow_key_file(request, key):
+    """
+    Arquivo de verificação da chave IndexNow (/<chave>.txt)
+    """
+    config = SEOConfig.get_cached()
+    if not config.indexnow_key or key != config.indexnow_key:
+        raise Http404('Chave não encontrada')
+    return HttpResponse(config.indexnow_key, content_type='text/plain')
+
+
 @cache_page(60 * 60)  # Cache por 1 hora
 @require_http_methods(["GET"])
 def ads_txt(request):
@@ -74,14 +147,18 @@ def ads_txt(request):
 def sitemap_ping_view(request):
     """
     View para ping manual dos search engines
+    
+    O ping roda em segundo plano; a resposta volta na hora. O pedido fica
+    registrado no banco até ser enviado.
     """
     if not request.user.is_staff:
         return HttpResponse('Unauthorized', status=401)
     
-    from django.core.management import call_command
+    from .ping import flush_pending_pings_in_background, schedule_ping
     
     try:
-        call_command('ping_search_engines')
-        return HttpResponse('Sitemap ping enviado com sucesso!')
+        schedule_ping()
+        flush_pending_pings_in_background()
+        return HttpResponse('Ping do sitemap agendado!', status=202)
     except Exception as e:
-        return HttpResponse(f'Erro ao enviar ping: {str(e)}', status=500)
+        return HttpResponse(f'Erro ao agendar ping: {str(e)}', status=500)
@@ -70,6 +70,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Por último: guarda a resposta da view (ver Prisma_avaliacoes/middleware.py)
+    "Prisma_avaliacoes.middleware.PageCacheMiddleware",
 ]
 
 ROOT_URLCONF = "setup.urls"
@@ -139,6 +141,32 @@ except Exception as e:
     }
 
 
+# Cache compartilhado entre os workers do gunicorn: os carimbos de versão
+# (configuração SEO, páginas, busca, sugestões) só invalidam todos os
+# processos se estiverem no mesmo lugar - o LocMemCache padrão é um por
+# processo. Com REDIS_URL usa o Redis (pacote redis); sem ele, uma tabela
+# no próprio banco (python manage.py createcachetable).
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+            'OPTIONS': {
+                'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=10000, cast=int),
+            },
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -297,3 +325,11 @@ JAZZMIN_UI_TWEAKS = {
 
 # Site ID para sitemaps e framework django.contrib.sites
 SITE_ID = 1
+
+# =============================================================================
+# CACHE DE PÁGINAS
+# =============================================================================
+
+# Landing page e blog em cache para visitantes anônimos, invalidado ao
+# salvar artigos e SEO (ver Prisma_avaliacoes/middleware.py)
+PAGE_CACHE_ENABLED = config('PAGE_CACHE_ENABLED', default=not DEBUG, cast=bool)
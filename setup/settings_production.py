@@ -56,6 +56,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Por último: guarda a resposta da view (ver Prisma_avaliacoes/middleware.py)
+    "Prisma_avaliacoes.middleware.PageCacheMiddleware",
 ]
 
 ROOT_URLCONF = "setup.urls"
@@ -89,6 +91,33 @@ DATABASES = {
     }
 }
 
+# =============================================================================
+# CACHE
+# =============================================================================
+
+# Compartilhado entre os workers do gunicorn (ver setup/settings.py):
+# Redis se REDIS_URL estiver definido, senão a tabela django_cache do banco
+# (python manage.py createcachetable)
+REDIS_URL = os.environ.get('REDIS_URL', '')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+            },
+        }
+    }
+
 # =============================================================================
 # PASSWORD VALIDATION
 # =============================================================================
@@ -28,11 +28,6 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib.sitemaps.views import sitemap
-
-# Importar sitemaps do SEO - Temporariamente usando sitemap simples
-# from seo.sitemaps import sitemaps
-from simple_sitemap import sitemaps_simple as sitemaps
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -41,8 +36,7 @@ urlpatterns = [
     path("area-cliente/", include("area_cliente.urls")),  # Área do cliente
     
     # SEO URLs
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
-    path('', include('seo.urls')),  # Inclui robots.txt, ads.txt, etc.
+    path('', include('seo.urls')),  # Inclui sitemap.xml, robots.txt, ads.txt, etc.
 ]
 
 # Servir arquivos de media em desenvolvimento
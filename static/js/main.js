@@ -290,6 +290,117 @@ _Enviado através do site da Prisma Avaliações Imobiliárias_
         }
     }
     
+    // ========================================================================
+    // Sugestões da busca do blog
+    // ========================================================================
+    
+    function setupSearchSuggestions() {
+        // Campos com data-sugestoes-url (listagem e busca do blog)
+        document.querySelectorAll('input[data-sugestoes-url]').forEach(input => {
+            const url = input.dataset.sugestoesUrl;
+            const cache = new Map();
+            let controller = null;
+            let active = -1;
+            
+            const menu = document.createElement('div');
+            menu.className = 'dropdown-menu w-100 shadow';
+            menu.setAttribute('role', 'listbox');
+            const group = input.closest('.input-group') || input.parentElement;
+            group.classList.add('position-relative');
+            menu.style.top = '100%';
+            menu.style.left = '0';
+            group.appendChild(menu);
+            
+            function items() {
+                return Array.from(menu.querySelectorAll('.dropdown-item'));
+            }
+            
+            function hide() {
+                menu.classList.remove('show');
+                active = -1;
+            }
+            
+            function addItem(text, href, icon) {
+                const link = document.createElement('a');
+                link.className = 'dropdown-item text-wrap';
+                link.href = href;
+                link.setAttribute('role', 'option');
+                const i = document.createElement('i');
+                i.className = `fas ${icon} me-2 text-muted`;
+                link.appendChild(i);
+                link.appendChild(document.createTextNode(text));
+                menu.appendChild(link);
+            }
+            
+            function render(data) {
+                menu.innerHTML = '';
+                active = -1;
+                data.artigos.forEach(artigo => addItem(artigo.titulo, artigo.url, 'fa-file-alt'));
+                if (data.artigos.length && data.tags.length) {
+                    const divider = document.createElement('hr');
+                    divider.className = 'dropdown-divider';
+                    menu.appendChild(divider);
+                }
+                data.tags.forEach(tag => addItem(tag.nome, tag.url, 'fa-tag'));
+                menu.classList.toggle('show', data.artigos.length + data.tags.length > 0);
+            }
+            
+            const fetchSuggestions = debounce(function(query) {
+                if (cache.has(query)) {
+                    render(cache.get(query));
+                    return;
+                }
+                // Cancela a requisição anterior: só a última resposta importa
+                if (controller) {
+                    controller.abort();
+                }
+                controller = new AbortController();
+                fetch(`${url}?q=${encodeURIComponent(query)}`, {
+                    signal: controller.signal,
+                    headers: {'Accept': 'application/json'}
+                })
+                    .then(response => response.ok ? response.json() : Promise.reject(response.status))
+                    .then(data => {
+                        cache.set(query, data);
+                        if (input.value.trim() === query) {
+                            render(data);
+                        }
+                    })
+                    .catch(() => {});
+            }, 150);
+            
+            input.addEventListener('input', () => {
+                const query = input.value.trim();
+                if (query.length < 2) {
+                    hide();
+                    return;
+                }
+                fetchSuggestions(query);
+            });
+            
+            input.addEventListener('keydown', event => {
+                const links = items();
+                if (!menu.classList.contains('show') || !links.length) {
+                    return;
+                }
+                if (event.key === 'ArrowDown' || event.key === 'ArrowUp') {
+                    event.preventDefault();
+                    const step = event.key === 'ArrowDown' ? 1 : -1;
+                    active = (active + step + links.length) % links.length;
+                    links.forEach((link, index) => link.classList.toggle('active', index === active));
+                } else if (event.key === 'Enter' && active >= 0) {
+                    event.preventDefault();
+                    window.location.href = links[active].href;
+                } else if (event.key === 'Escape') {
+                    hide();
+                }
+            });
+            
+            // Atraso para o clique na sugestão acontecer antes de fechar
+            input.addEventListener('blur', () => setTimeout(hide, 150));
+        });
+    }
+    
     // ========================================================================
     // Performance e otimizações
     // ========================================================================
@@ -329,6 +440,7 @@ _Enviado através do site da Prisma Avaliações Imobiliárias_
         setupContactForm();
         setupPhoneMask();
         setupTooltips();
+        setupSearchSuggestions();
         
         // Event listeners otimizados
         window.addEventListener('scroll', throttle(handleNavbarScroll, 100));